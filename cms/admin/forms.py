@@ -687,7 +687,7 @@ class ChangePageForm(BasePageContentForm):
             managed=not bool(page_overwrite_url),
         )
         page._update_url_path_recursive(self._language)
-        page.clear_cache(menu=True)
+        page.clear_cache(language=self._language, menu=True)
 
         if page.application_urls and "slug" in self.changed_data:
             # Connects the apphook restart handler to the request finished signal
@@ -1,4 +1,6 @@
+import hashlib
 import re
+import time
 
 from cms.utils.conf import get_cms_setting
 
@@ -70,6 +72,104 @@ def invalidate_cms_page_cache():
     _set_cache_version(version + 1)
 
 
+def get_page_cache_tag(page_id):
+    """
+    Returns the page cache tag for the page with the given id.
+    """
+    return f'page:{page_id}'
+
+
+def get_placeholder_cache_tag(placeholder_id):
+    """
+    Returns the page cache tag for the placeholder with the given id.
+    """
+    return f'placeholder:{placeholder_id}'
+
+
+def get_site_cache_tag(site_id, lang=None):
+    """
+    Returns the page cache tag for the given site or, if «lang» is given,
+    for the (site x lang) pair.
+    """
+    if lang:
+        return f'site:{site_id}:lang:{lang}'
+    return f'site:{site_id}'
+
+
+def _get_page_cache_tag_key(tag):
+    prefix = get_cms_setting("CACHE_PREFIX")
+    key = f'{prefix}_PAGE_CACHE_TAG:{tag}'
+    # See _get_placeholder_cache_version_key() for the reasoning behind 200.
+    if len(key) > 200:
+        key = f'{prefix}_PAGE_CACHE_TAG:{hashlib.sha1(key.encode("utf-8")).hexdigest()}'
+    return key
+
+
+def _get_page_cache_tag_versions(tags, timeout=None):
+    """
+    Returns a dictionary mapping the version key of every tag in «tags» (and
+    the global page cache version key) to its current version. Missing
+    versions are created.
+
+    The result is meant to be stored alongside a cache entry and checked with
+    _page_cache_tag_versions_are_current() on reads. Versions created by
+    another process in the meantime are returned as None, so the entry is
+    never considered current.
+    """
+    from django.core.cache import cache
+
+    keys = [CMS_PAGE_CACHE_VERSION_KEY] + [_get_page_cache_tag_key(tag) for tag in sorted(set(tags))]
+    versions = cache.get_many(keys)
+    new_version = int(time.time() * 1000000)
+
+    # See note in invalidate_cms_page_cache(). Every tag version has to
+    # outlive the entries written against it.
+    duration = max(get_cms_setting('CACHE_DURATIONS')['content'], timeout or 0)
+
+    for key in keys:
+        if key in versions:
+            if cache.touch(key, duration):
+                continue
+            # The version has expired since it was read.
+        elif key == CMS_PAGE_CACHE_VERSION_KEY:
+            # Mirrors _get_cache_version()
+            versions[key] = 1
+        else:
+            versions[key] = new_version
+
+        if not cache.add(key, versions[key], duration):
+            # Another process has created or invalidated the version since.
+            versions[key] = None
+    return versions
+
+
+def _page_cache_tag_versions_are_current(tag_versions):
+    """
+    Returns True if none of the tags (nor the global page cache version)
+    recorded in «tag_versions» has been invalidated since it was recorded.
+    """
+    from django.core.cache import cache
+
+    current = cache.get_many(list(tag_versions))
+    return current == tag_versions
+
+
+def invalidate_cms_page_cache_tags(tags):
+    """
+    Invalidates only the cached pages that depend on any of the given tags.
+    """
+    from django.core.cache import cache
+
+    # Same strategy as for the placeholder cache: the version of each tag is
+    # replaced and all entries recorded against the old version become
+    # inaccessible and are left to expire naturally.
+    version = int(time.time() * 1000000)
+    cache.set_many(
+        {_get_page_cache_tag_key(tag): version for tag in tags},
+        get_cms_setting('CACHE_DURATIONS')['content'],
+    )
+
+
 CLEAN_KEY_PATTERN = re.compile(r'[^a-zA-Z0-9_-]')
 
 
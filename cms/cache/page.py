@@ -1,58 +1,393 @@
+import gzip
 import hashlib
+import re
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
 from django.utils.cache import (
     add_never_cache_headers,
+    cc_delim_re,
+    get_conditional_response,
+    patch_cache_control,
     patch_response_headers,
     patch_vary_headers,
+    set_response_etag,
 )
-from django.utils.encoding import iri_to_uri
+from django.utils.encoding import escape_uri_path, iri_to_uri
+from django.utils.http import http_date, parse_http_date_safe, urlencode
+from django.utils.text import compress_string
 from django.utils.timezone import now
 
-from cms.cache import _get_cache_key, _get_cache_version, _set_cache_version
+from cms.cache import (
+    _get_cache_key,
+    _get_cache_version,
+    _get_page_cache_tag_versions,
+    _page_cache_tag_versions_are_current,
+    _set_cache_version,
+    get_page_cache_tag,
+    get_site_cache_tag,
+)
 from cms.constants import EXPIRE_NOW, MAX_EXPIRATION_TTL
 from cms.toolbar.utils import get_toolbar_from_request
+from cms.utils.compat import DJANGO_2_2, DJANGO_3_0, DJANGO_3_1
 from cms.utils.compat.response import get_response_headers
 from cms.utils.conf import get_cms_setting
-from cms.utils.helpers import get_timezone_name
+from cms.utils.helpers import get_header_name, get_timezone_name
+from cms.utils.i18n import force_language
+
+try:
+    # brotli is optional
+    import brotli
+except ImportError:
+    brotli = None
+
+IDENTITY = 'identity'
+
+# Bodies smaller than this are not worth compressing (same as GZipMiddleware)
+MIN_COMPRESS_LENGTH = 200
+
+
+def _get_page_cache_query_string(request):
+    """
+    Returns the query string of the request reduced to the parameters
+    relevant for the page cache (see CMS_PAGE_CACHE_QUERY_PARAMS),
+    in canonical order.
+    """
+    config = get_cms_setting('PAGE_CACHE_QUERY_PARAMS')
+    policy = config.get('policy', 'all')
+    params = set(config.get('params', []))
+
+    if policy == 'ignore':
+        return ''
+    elif policy == 'allow':
+        is_relevant = params.__contains__
+    elif policy == 'deny':
+        def is_relevant(param):
+            return param not in params
+    elif policy == 'all':
+        def is_relevant(param):
+            return True
+    else:
+        raise ImproperlyConfigured(
+            "CMS_PAGE_CACHE_QUERY_PARAMS['policy'] must be one of "
+            "'all', 'ignore', 'allow' or 'deny', got %r" % policy
+        )
+    # Parameters are sorted by name. The order of multiple
+    # values for the same parameter is significant.
+    query = [
+        (param, values) for param, values in sorted(request.GET.lists())
+        if is_relevant(param)
+    ]
+    return urlencode(query, doseq=True)
 
 
 def _page_cache_key(request):
+    path = escape_uri_path(request.path)
+    query_string = _get_page_cache_query_string(request)
+
+    if query_string:
+        path += '?' + query_string
+
     # sha1 key of current path
     cache_key = "%s:%d:%s" % (
         get_cms_setting("CACHE_PREFIX"),
         settings.SITE_ID,
-        hashlib.sha1(iri_to_uri(request.get_full_path()).encode('utf-8')).hexdigest()
+        hashlib.sha1(iri_to_uri(path).encode('utf-8')).hexdigest()
     )
     if settings.USE_TZ:
         cache_key += '.%s' % get_timezone_name()
     return cache_key
 
 
+def _page_cache_variant_key(request, vary_on_list):
+    """
+    Returns the key of the page cache entry for the variant of the current
+    path selected by the values of the request headers in «vary_on_list».
+    """
+    header_values = '|'.join(
+        '%s:%s' % (header, request.META.get(get_header_name(header)) or '_')
+        for header in vary_on_list
+    )
+    return '%s|%s' % (
+        _page_cache_key(request),
+        hashlib.sha1(header_values.encode('utf-8')).hexdigest(),
+    )
+
+
+def _get_response_vary_on_list(response):
+    if not response.has_header('Vary'):
+        return []
+    headers = {header.strip().lower() for header in cc_delim_re.split(response['Vary'])}
+    return sorted(header for header in headers if header)
+
+
+def _get_page_cache_encodings():
+    """
+    Returns the content encodings page cache entries are stored in,
+    in order of preference. Brotli is skipped if it's not installed.
+    """
+    encodings = []
+
+    for encoding in get_cms_setting('PAGE_CACHE_ENCODINGS'):
+        if encoding not in ('gzip', 'br'):
+            raise ImproperlyConfigured(
+                "CMS_PAGE_CACHE_ENCODINGS only supports 'gzip' and 'br', got %r" % encoding
+            )
+        if encoding == 'br' and brotli is None:
+            continue
+        encodings.append(encoding)
+    return encodings
+
+
+def _encode_page_content(response):
+    """
+    Returns a dictionary mapping content encodings to the encoded
+    response content.
+    """
+    content = response.content
+    bodies = {}
+
+    if len(content) >= MIN_COMPRESS_LENGTH and not response.has_header('Content-Encoding'):
+        for encoding in _get_page_cache_encodings():
+            if encoding == 'gzip':
+                bodies[encoding] = compress_string(content)
+            else:
+                bodies[encoding] = brotli.compress(content)
+
+    if not bodies or get_cms_setting('PAGE_CACHE_STORE_IDENTITY'):
+        bodies[IDENTITY] = content
+    return bodies
+
+
+def _decode_page_content(bodies):
+    if IDENTITY in bodies:
+        return bodies[IDENTITY]
+    if 'gzip' in bodies:
+        return gzip.decompress(bodies['gzip'])
+    return brotli.decompress(bodies['br'])
+
+
+def _get_accepted_encodings(request):
+    accepted = set()
+
+    for bit in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = bit.partition(';')
+        encoding = encoding.strip().lower()
+
+        if not encoding:
+            continue
+
+        quality = 1.0
+        param, _, value = params.partition('=')
+
+        if param.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+
+        if quality > 0:
+            accepted.add(encoding)
+    return accepted
+
+
+def _select_page_content(request, bodies):
+    """
+    Returns a (content_encoding, content) tuple with the stored body
+    best matching the request's Accept-Encoding header.
+    content_encoding is None for uncompressed content.
+    """
+    accepted = _get_accepted_encodings(request)
+
+    for encoding in _get_page_cache_encodings():
+        if encoding in bodies and (encoding in accepted or '*' in accepted):
+            return encoding, bodies[encoding]
+    return None, _decode_page_content(bodies)
+
+
+def _page_cache_lock_key(request):
+    return _page_cache_key(request) + ':lock'
+
+
+def _page_cache_stats_key(name):
+    return f'{get_cms_setting("CACHE_PREFIX")}_PAGE_CACHE_STATS:{name}'
+
+
+def _increment_page_cache_stat(name):
+    from django.core.cache import cache
+
+    key = _page_cache_stats_key(name)
+
+    # The stats should survive as long as possible.
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # The key expired or got evicted between add() and incr()
+            cache.add(key, 1, None)
+
+
+def get_page_cache_stats():
+    """
+    Returns a dictionary with the number of expired page cache entries that
+    were re-rendered by a single worker ("revalidated") and the number of
+    requests that were served the stale entry in the meantime ("coalesced").
+    """
+    from django.core.cache import cache
+
+    names = ('revalidated', 'coalesced')
+    stats = cache.get_many([_page_cache_stats_key(name) for name in names])
+    return {name: stats.get(_page_cache_stats_key(name), 0) for name in names}
+
+
+def _acquire_page_cache_lock(request):
+    """
+    Returns True if the current request is the only one allowed to re-render
+    the page for the expired cache entry.
+    """
+    from django.core.cache import cache
+
+    lock_key = _page_cache_lock_key(request)
+
+    if cache.add(lock_key, 1, get_cms_setting('PAGE_CACHE_LOCK_TIMEOUT')):
+        request._cms_page_cache_lock = lock_key
+        return True
+    return False
+
+
+def _release_page_cache_lock(request):
+    from django.core.cache import cache
+
+    lock_key = getattr(request, '_cms_page_cache_lock', None)
+
+    if lock_key:
+        cache.delete(lock_key)
+        request._cms_page_cache_lock = None
+
+
+def get_page_cache_hole_markers(key):
+    """
+    Returns the (start, end) markers surrounding the content of the page
+    cache hole «key» in a rendered page.
+    """
+    return '<!--cms-hole:%s-->' % key, '<!--/cms-hole:%s-->' % key
+
+
+def _punch_page_cache_holes(content, holes):
+    """
+    Returns a (content, shell, holes) tuple: the rendered content without the
+    hole markers, the page shell to be cached where the content of every hole
+    is replaced by its start marker and the holes left in the shell.
+    """
+    shell = content
+    for hole in holes:
+        start, end = (marker.encode() for marker in get_page_cache_hole_markers(hole['key']))
+        hole_re = re.compile(re.escape(start) + b'.*?' + re.escape(end), re.DOTALL)
+        shell = hole_re.sub(start, shell, count=1)
+        content = content.replace(start, b'', 1).replace(end, b'', 1)
+    # Holes nested in another hole are rendered along with it.
+    holes = [
+        hole for hole in holes
+        if get_page_cache_hole_markers(hole['key'])[0].encode() in shell
+    ]
+    return content, shell, holes
+
+
+def _fill_page_cache_holes(request, shell, holes):
+    """
+    Renders the placeholders left out of a cached page for the current
+    request and returns the complete content.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    from django.template import Context, Engine
+
+    from cms.models import Page, Placeholder
+    from cms.plugin_rendering import ContentRenderer
+
+    if not hasattr(request, 'user'):
+        # Hits served by the PageCacheMiddleware skip the authentication
+        # middleware, but the page cache only ever serves anonymous users.
+        request.user = AnonymousUser()
+
+    placeholders = Placeholder.objects.in_bulk({hole['placeholder'] for hole in holes})
+    page_ids = {hole['page'] for hole in holes} | {hole['current_page'] for hole in holes}
+    pages = Page.objects.in_bulk(page_ids - {None})
+
+    if not getattr(request, 'current_page', None):
+        request.current_page = pages.get(holes[0]['current_page'])
+
+    renderer = ContentRenderer(request)
+    context = Context({'request': request, 'cms_content_renderer': renderer})
+
+    for processor in Engine.get_default().template_context_processors:
+        context.update(processor(request))
+
+    content = shell
+    for hole in holes:
+        placeholder = placeholders.get(hole['placeholder'])
+
+        if placeholder is None:
+            rendered = ''
+        else:
+            with force_language(hole['language']):
+                rendered = renderer.render_placeholder(
+                    placeholder,
+                    context=context,
+                    language=hole['language'],
+                    page=pages.get(hole['page']),
+                    use_cache=True,
+                    width=hole['width'],
+                )
+        start = get_page_cache_hole_markers(hole['key'])[0].encode()
+        content = content.replace(start, rendered.encode(settings.DEFAULT_CHARSET), 1)
+    return content
+
+
 def set_page_cache(response):
+    try:
+        return _set_page_cache(response)
+    finally:
+        # Whether the response was cached or not, other requests
+        # should no longer wait for it.
+        _release_page_cache_lock(response._request)
+
+
+def _set_page_cache(response):
     from django.core.cache import cache
 
     request = response._request
     toolbar = get_toolbar_from_request(request)
     is_authenticated = request.user.is_authenticated
+    renderer = toolbar.content_renderer
+    holes = renderer.get_page_cache_holes()
+
+    if holes:
+        # Uncacheable placeholders have been marked while rendering the
+        # page, take them out of the content to be cached.
+        response.content, shell, holes = _punch_page_cache_holes(response.content, holes)
 
     if is_authenticated or toolbar._cache_disabled or not get_cms_setting("PAGE_CACHE"):
         add_never_cache_headers(response)
         return response
 
     # This *must* be TZ-aware
-    timestamp = now()
+    timestamp = renderer.response_timestamp
 
-    placeholders = toolbar.content_renderer.get_rendered_placeholders()
+    hole_placeholders = {hole['placeholder'] for hole in holes}
+    placeholders = [
+        ph for ph in renderer.get_rendered_placeholders()
+        if ph.pk not in hole_placeholders
+    ]
     # Checks if there's a plugin using the legacy "cache = False"
     placeholder_ttl_list = []
     vary_cache_on_set = set()
     for ph in placeholders:
         # get_cache_expiration() always returns:
         #     EXPIRE_NOW <= int <= MAX_EXPIRATION_IN_SECONDS
-        ttl = ph.get_cache_expiration(request, timestamp)
-        vary_cache_on = ph.get_vary_cache_on(request)
+        ttl = renderer.get_placeholder_cache_expiration(ph)
+        vary_cache_on = renderer.get_placeholder_vary_cache_on(ph)
 
         placeholder_ttl_list.append(ttl)
         if ttl and vary_cache_on:
@@ -76,29 +411,216 @@ def set_page_cache(response):
             patch_response_headers(response, cache_timeout=ttl)
             patch_vary_headers(response, sorted(vary_cache_on_set))
 
-            version = _get_cache_version()
+            vary_on_list = _get_response_vary_on_list(response)
+
+            if '*' in vary_on_list:
+                # Every request is a different variant
+                return response
+
+            # Validators for conditional requests. The cached content is
+            # known to be unchanged for as long as the entry is valid,
+            # unless parts of it are rendered for every request.
+            if not holes and not response.has_header('ETag'):
+                set_response_etag(response)
+            if not holes and not response.has_header('Last-Modified'):
+                response['Last-Modified'] = http_date(timestamp.timestamp())
+
+            # The entry is only valid as long as none of the objects it was
+            # rendered from (page, placeholders, referenced pages, site) has
+            # been invalidated. This includes the global page cache version.
+            # Keep entries around for the stale-while-revalidate grace window.
+            timeout = ttl + get_cms_setting('PAGE_CACHE_STALE_TTL')
+            tag_versions = _get_page_cache_tag_versions(
+                renderer.get_page_cache_tags(),
+                timeout=timeout,
+            )
             # We also store the absolute expiration timestamp to avoid
             # recomputing it on cache-reads.
             expires_datetime = timestamp + timedelta(seconds=ttl)
             response_headers = get_response_headers(response)
-            cache.set(
-                _page_cache_key(request),
-                (
-                    response.content,
-                    response_headers,
-                    expires_datetime,
-                ),
-                ttl,
-                version=version
+            # The list of vary headers is stored under the path key, the
+            # response under a key including the values of those headers.
+            # Pages with holes are spliced together on every hit, so there's
+            # no point in storing them pre-compressed.
+            entry = (
+                {IDENTITY: shell} if holes else _encode_page_content(response),
+                response_headers,
+                expires_datetime,
+                tag_versions,
+                holes,
             )
-            # See note in invalidate_cms_page_cache()
-            _set_cache_version(version)
+            cache.set_many(
+                {
+                    _page_cache_key(request): vary_on_list,
+                    _page_cache_variant_key(request, vary_on_list): entry,
+                },
+                timeout,
+            )
+
+            if holes:
+                add_never_cache_headers(response)
     return response
 
 
-def get_page_cache(request):
+def _get_valid_page_cache_entry(request):
+    """
+    Returns the (bodies, headers, expires_datetime, holes) tuple stored for
+    the current request, or None if there's no entry or it has been invalidated.
+    Expired entries kept for the grace window are returned as well.
+    """
     from django.core.cache import cache
-    return cache.get(_page_cache_key(request), version=_get_cache_version())
+
+    vary_on_list = cache.get(_page_cache_key(request))
+
+    if vary_on_list is None:
+        return None
+
+    cached = cache.get(_page_cache_variant_key(request, vary_on_list))
+
+    if cached is None:
+        return None
+
+    bodies, headers, expires_datetime, tag_versions, holes = cached
+
+    if not _page_cache_tag_versions_are_current(tag_versions):
+        return None
+    return bodies, headers, expires_datetime, holes
+
+
+def is_page_cache_fresh(request):
+    """
+    Returns True if the page cache holds a valid, unexpired entry for the
+    current request. Unlike get_page_cache() this never takes part in the
+    stale-while-revalidate bookkeeping.
+    """
+    cached = _get_valid_page_cache_entry(request)
+    return cached is not None and cached[2] > now()
+
+
+def _get_page_cache_entry(request):
+    """
+    Returns a (bodies, headers, expires_datetime, holes) tuple for the current
+    request or None if there's no valid entry in the cache.
+
+    If CMS_PAGE_CACHE_STALE_TTL is set, an expired entry is still returned
+    within the grace window, unless the current request is the one chosen to
+    re-render the page (in which case None is returned).
+    """
+    cached = _get_valid_page_cache_entry(request)
+
+    if cached is None:
+        return None
+
+    if cached[2] <= now():
+        # The entry is only still in the cache because of the grace window.
+        if getattr(request, '_cms_page_cache_lock', None):
+            # This request already chose to re-render the page, e.g. in the
+            # PageCacheMiddleware before reaching the details view.
+            return None
+
+        if _acquire_page_cache_lock(request):
+            _increment_page_cache_stat('revalidated')
+            return None
+        _increment_page_cache_stat('coalesced')
+    return cached
+
+
+def get_page_cache(request):
+    """
+    Returns a (content, headers, expires_datetime) tuple for the current
+    request or None if there's no valid entry in the cache.
+    """
+    cached = _get_page_cache_entry(request)
+
+    if cached is None:
+        return None
+
+    bodies, headers, expires_datetime, holes = cached
+    content = _decode_page_content(bodies)
+
+    if holes:
+        content = _fill_page_cache_holes(request, content, holes)
+    return content, headers, expires_datetime
+
+
+def _get_encoded_page_cache(request):
+    cached = _get_page_cache_entry(request)
+
+    if cached is None:
+        return None
+
+    bodies, headers, expires_datetime, holes = cached
+
+    if holes:
+        content_encoding = None
+        content = _fill_page_cache_holes(request, _decode_page_content(bodies), holes)
+    else:
+        content_encoding, content = _select_page_content(request, bodies)
+    return content, headers, expires_datetime, content_encoding, bool(holes)
+
+
+def get_encoded_page_cache(request):
+    """
+    Same as get_page_cache() but returns a
+    (content, headers, expires_datetime, content_encoding) tuple where
+    content is encoded according to the request's Accept-Encoding header
+    if possible (see CMS_PAGE_CACHE_ENCODINGS).
+    """
+    cached = _get_encoded_page_cache(request)
+
+    if cached is None:
+        return None
+    return cached[:4]
+
+
+def get_page_cache_response(request, timestamp=None):
+    """
+    Returns the response for the current request built from the page cache,
+    a 304 Not Modified response for matching conditional requests or None if
+    there's no valid entry in the cache.
+    """
+    cache_content = _get_encoded_page_cache(request)
+
+    if cache_content is None:
+        return None
+
+    content, headers, expires_datetime, content_encoding, has_holes = cache_content
+    response = HttpResponse(content)
+    if DJANGO_2_2 or DJANGO_3_0 or DJANGO_3_1:
+        response._headers = headers
+    else:
+        #  for django3.2 and above. response.headers replaces response._headers in earlier versions of django
+        response.headers = headers
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+        response['Content-Length'] = str(len(content))
+        # Same as GZipMiddleware: the encoded content is not
+        # byte-for-byte identical to the content the ETag was
+        # computed from.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+    if get_cms_setting('PAGE_CACHE_ENCODINGS'):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if has_holes:
+        # Parts of the page have been rendered for this request only.
+        add_never_cache_headers(response)
+    else:
+        # Recalculate the max-age header for this cached response.
+        # Stale responses (see CMS_PAGE_CACHE_STALE_TTL) must not be
+        # cached downstream.
+        max_age = max(0, int(
+            (expires_datetime - (timestamp or now())).total_seconds() + 0.5))
+        patch_cache_control(response, max_age=max_age)
+    # Answer conditional requests with a 304 Not Modified
+    response = get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified', '')),
+        response=response,
+    )
+    response.xframe_options_exempt = True
+    return response
 
 
 def get_xframe_cache(page):
@@ -118,15 +640,31 @@ def _page_url_key(page_lookup, lang, site_id):
     return _get_cache_key('page_url', page_lookup, lang, site_id) + '_type:absolute_url'
 
 
-def set_page_url_cache(page_lookup, lang, site_id, url):
+def set_page_url_cache(page_lookup, lang, site_id, url, page_id=None):
     from django.core.cache import cache
+
+    # Page urls change when a page or any of its ancestors is changed or moved,
+    # all of which invalidate the site tag, or the site and language tag if
+    # only one language of the page has changed.
+    tags = [get_site_cache_tag(site_id), get_site_cache_tag(site_id, lang)]
+
+    if page_id:
+        tags.append(get_page_cache_tag(page_id))
     cache.set(_page_url_key(page_lookup, lang, site_id),
-              url,
-              get_cms_setting('CACHE_DURATIONS')['content'], version=_get_cache_version())
-    _set_cache_version(_get_cache_version())
+              (url, _get_page_cache_tag_versions(tags)),
+              get_cms_setting('CACHE_DURATIONS')['content'])
 
 
 def get_page_url_cache(page_lookup, lang, site_id):
     from django.core.cache import cache
-    return cache.get(_page_url_key(page_lookup, lang, site_id),
-                     version=_get_cache_version())
+
+    cached = cache.get(_page_url_key(page_lookup, lang, site_id))
+
+    if cached is None:
+        return None
+
+    url, tag_versions = cached
+
+    if not _page_cache_tag_versions_are_current(tag_versions):
+        return None
+    return url
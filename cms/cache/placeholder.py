@@ -62,9 +62,10 @@ def _get_placeholder_cache_version(placeholder, lang, site_id):
     if cached:
         version, vary_on_list = cached
     else:
+        # Nothing can have been cached under a new version, it's only
+        # stored along with the first content written.
         version = int(time.time() * 1000000)
         vary_on_list = []
-        _set_placeholder_cache_version(placeholder, lang, site_id, version, vary_on_list)
     return version, vary_on_list
 
 
@@ -94,10 +95,7 @@ def _get_placeholder_cache_key(placeholder, lang, site_id, request, soft=False):
     read from the cache. If instead the key retrieval is to support a cache
     write, let «soft» be False.
     """
-    prefix = get_cms_setting('CACHE_PREFIX')
     version, vary_on_list = _get_placeholder_cache_version(placeholder, lang, site_id)
-    tz = get_timezone_name()
-    main_key = f"{prefix}|render_placeholder|id:{placeholder.pk}|lang:{lang}|site:{site_id}|tz:{tz}|v:{version}"
 
     if not soft:
         # We are about to write to the cache, so we want to get the latest
@@ -110,6 +108,18 @@ def _get_placeholder_cache_key(placeholder, lang, site_id, request, soft=False):
         # Update the main placeholder cache version
         _set_placeholder_cache_version(
             placeholder, lang, site_id, version, vary_on_list, duration)
+    return _get_placeholder_cache_content_key(
+        placeholder, lang, site_id, request, version=version, vary_on_list=vary_on_list)
+
+
+def _get_placeholder_cache_content_key(placeholder, lang, site_id, request, *, version, vary_on_list):
+    """
+    Returns the cache key for the given placeholder's content under the
+    given «version» and vary-on header-names list.
+    """
+    prefix = get_cms_setting('CACHE_PREFIX')
+    tz = get_timezone_name()
+    main_key = f"{prefix}|render_placeholder|id:{placeholder.pk}|lang:{lang}|site:{site_id}|tz:{tz}|v:{version}"
 
     sub_key_list = []
     for key in vary_on_list:
@@ -135,23 +145,34 @@ def _get_placeholder_cache_key(placeholder, lang, site_id, request, soft=False):
     return cache_key
 
 
-def set_placeholder_cache(placeholder, lang, site_id, content, request):
+def set_placeholder_cache(placeholder, lang, site_id, content, request, *, vary_on_list=None, ttl=None):
     """
     Sets the (correct) placeholder cache with the rendered placeholder.
+
+    «vary_on_list» and «ttl» default to the placeholder's get_vary_cache_on()
+    and get_cache_expiration(), pass them in if they're known already.
+    The version and the content are written in a single cache operation.
     """
     from django.core.cache import cache
 
-    key = _get_placeholder_cache_key(placeholder, lang, site_id, request)
+    if vary_on_list is None:
+        vary_on_list = placeholder.get_vary_cache_on(request)
 
-    duration = min(
-        get_cms_setting('CACHE_DURATIONS')['content'],
-        placeholder.get_cache_expiration(request, now())
-    )
-    cache.set(key, content, duration)
-    # "touch" the cache-version, so that it stays as fresh as this content.
-    version, vary_on_list = _get_placeholder_cache_version(placeholder, lang, site_id)
-    _set_placeholder_cache_version(
-        placeholder, lang, site_id, version, vary_on_list, duration=duration
+    if ttl is None:
+        ttl = placeholder.get_cache_expiration(request, now())
+
+    duration = min(get_cms_setting('CACHE_DURATIONS')['content'], ttl)
+    version, _ = _get_placeholder_cache_version(placeholder, lang, site_id)
+    # The version is stored with the current vary-on header-names and
+    # "touched", so that it stays as fresh as this content.
+    cache.set_many(
+        {
+            _get_placeholder_cache_version_key(placeholder, lang, site_id): (version, vary_on_list),
+            _get_placeholder_cache_content_key(
+                placeholder, lang, site_id, request, version=version, vary_on_list=vary_on_list
+            ): content,
+        },
+        duration,
     )
 
 
@@ -167,6 +188,41 @@ def get_placeholder_cache(placeholder, lang, site_id, request):
     return content
 
 
+def get_placeholder_caches(placeholders, lang, site_id, request):
+    """
+    Same as get_placeholder_cache() for several placeholders at once, using
+    one cache round-trip for the versions and one for the content.
+
+    Returns a dictionary mapping the pk of every placeholder found in the
+    cache to its content.
+    """
+    from django.core.cache import cache
+
+    version_keys = {
+        placeholder.pk: _get_placeholder_cache_version_key(placeholder, lang, site_id)
+        for placeholder in placeholders
+    }
+    versions = cache.get_many(version_keys.values())
+    content_keys = {}
+
+    for placeholder in placeholders:
+        cached = versions.get(version_keys[placeholder.pk])
+
+        if not cached:
+            # Without a version there can't be any content.
+            continue
+
+        version, vary_on_list = cached
+        content_keys[placeholder.pk] = _get_placeholder_cache_content_key(
+            placeholder, lang, site_id, request, version=version, vary_on_list=vary_on_list)
+
+    if not content_keys:
+        return {}
+
+    contents = cache.get_many(content_keys.values())
+    return {pk: contents[key] for pk, key in content_keys.items() if key in contents}
+
+
 def clear_placeholder_cache(placeholder, lang, site_id):
     """
     Invalidates all existing cache entries for (placeholder x lang x site_id).
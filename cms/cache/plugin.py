@@ -0,0 +1,206 @@
+"""
+This module manages the per-plugin fragment cache, used for plugins with
+``cache_fragment = True``. The cache key includes the pk, position and change
+date of the plugin and of all its children, so editing, moving or deleting a
+plugin or one of its children simply makes the old entries inaccessible. It
+also includes a version per (placeholder x lang x site_id), which is replaced
+whenever the cache of the placeholder is cleared. Those cache entries will
+simply expire and will be purged according to the policy of the cache backend
+in-use.
+
+The cache key also includes the values of the request headers returned by
+the plugin's get_vary_cache_on().
+"""
+import hashlib
+import time
+import warnings
+from datetime import datetime, timedelta
+
+from django.utils.encoding import force_str
+
+from cms.utils.conf import get_cms_setting
+from cms.utils.helpers import get_header_name, get_timezone_name
+
+
+def get_plugin_cache_expiration(plugin, instance, placeholder, request, response_timestamp):
+    """
+    Returns the number of seconds (from «response_timestamp») the content of
+    «instance» can be cached according to plugin.get_cache_expiration(), or
+    None if the plugin doesn't provide any hint.
+    """
+    plugin_expiration = plugin.get_cache_expiration(request, instance, placeholder)
+
+    # The plugin_expiration should only ever be either: None, a TZ-
+    # aware datetime, a timedelta, or an integer.
+    if plugin_expiration is None:
+        return None
+
+    if isinstance(plugin_expiration, (datetime, timedelta)):
+        if isinstance(plugin_expiration, datetime):
+            # We need to convert this to a TTL against the
+            # response timestamp.
+            try:
+                delta = plugin_expiration - response_timestamp
+            except TypeError:
+                # Attempting to take the difference of a naive datetime
+                # and a TZ-aware one results in a TypeError. Ignore
+                # this plugin.
+                warnings.warn(
+                    'Plugin %(plugin_class)s (%(pk)d) returned a naive '
+                    'datetime : %(value)s for get_cache_expiration(), '
+                    'ignoring.' % {
+                        'plugin_class': plugin.__class__.__name__,
+                        'pk': instance.pk,
+                        'value': force_str(plugin_expiration),
+                    })
+                return None
+        else:
+            # Its already a timedelta instance...
+            delta = plugin_expiration
+        return int(delta.total_seconds() + 0.5)
+
+    # must be an int-like value
+    try:
+        return int(plugin_expiration)
+    except ValueError:
+        # Looks like it was not very int-ish. Ignore this plugin.
+        warnings.warn(
+            'Plugin %(plugin_class)s (%(pk)d) returned '
+            'unexpected value %(value)s for '
+            'get_cache_expiration(), ignoring.' % {
+                'plugin_class': plugin.__class__.__name__,
+                'pk': instance.pk,
+                'value': force_str(plugin_expiration),
+            })
+        return None
+
+
+def get_plugin_vary_cache_on(plugin, instance, placeholder, request):
+    """
+    Returns the lower-cased header-names returned by
+    plugin.get_vary_cache_on() as a list.
+    """
+    vary_on = plugin.get_vary_cache_on(request, instance, placeholder)
+
+    if not vary_on:
+        # None, or an empty iterable
+        return []
+
+    if isinstance(vary_on, str):
+        return [vary_on.lower()]
+
+    try:
+        return [vary_on_item.lower() for vary_on_item in iter(vary_on)]
+    except TypeError:
+        warnings.warn(
+            'Plugin %(plugin_class)s (%(pk)d) returned '
+            'unexpected value %(value)s for '
+            'get_vary_cache_on(), ignoring.' % {
+                'plugin_class': plugin.__class__.__name__,
+                'pk': instance.pk,
+                'value': force_str(vary_on),
+            })
+        return []
+
+
+def _get_plugin_tree(instance):
+    """
+    Returns the (pk, position, change date, children) tree of «instance» and
+    its children, as far as they have been loaded for rendering.
+    """
+    children = getattr(instance, 'child_plugin_instances', None) or []
+    return (
+        instance.pk,
+        instance.position,
+        instance.changed_date.timestamp(),
+        [_get_plugin_tree(child) for child in children],
+    )
+
+
+def _get_plugin_cache_version_key(placeholder_id, lang, site_id):
+    prefix = get_cms_setting('CACHE_PREFIX')
+    return f'{prefix}|render_plugin_version|placeholder:{placeholder_id}|lang:{lang}|site:{site_id}'
+
+
+def _get_plugin_cache_version(placeholder_id, lang, site_id):
+    """
+    Returns the version of the fragments of the plugins in (placeholder x
+    lang x site_id), which is stored if there's none yet.
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_version_key(placeholder_id, lang, site_id)
+    version = cache.get(key)
+
+    if version is None:
+        version = int(time.time() * 1000000)
+        # Another process may have stored a version in the meantime.
+        if not cache.add(key, version, get_cms_setting('CACHE_DURATIONS')['content']):
+            version = cache.get(key, version)
+    return version
+
+
+def _get_plugin_cache_key(instance, placeholder, site_id, request):
+    """
+    Returns the fully-addressed cache key for the rendered «instance» and
+    the request.
+    """
+    _, plugin = instance.get_plugin_instance()
+    prefix = get_cms_setting('CACHE_PREFIX')
+    placeholder_id = placeholder.pk if placeholder else instance.placeholder_id
+    version = _get_plugin_cache_version(placeholder_id, instance.language, site_id)
+    tree = hashlib.sha1(repr(_get_plugin_tree(instance)).encode('utf-8')).hexdigest()
+    tz = get_timezone_name()
+    cache_key = (
+        f"{prefix}|render_plugin|id:{instance.pk}|tree:{tree}|v:{version}"
+        f"|lang:{instance.language}|site:{site_id}|tz:{tz}"
+    )
+
+    sub_key_list = []
+    for key in get_plugin_vary_cache_on(plugin, instance, placeholder, request):
+        value = request.META.get(get_header_name(key)) or '_'
+        sub_key_list.append(key + ':' + value)
+
+    if sub_key_list:
+        cache_key += '|' + '|'.join(sorted(sub_key_list))
+
+    # See _get_placeholder_cache_key(), keep a buffer below the 250
+    # characters limit.
+    if len(cache_key) > 200:
+        cache_key = '{prefix}|{hash}'.format(
+            prefix=prefix,
+            hash=hashlib.sha1(cache_key.encode('utf-8')).hexdigest(),
+        )
+    return cache_key
+
+
+def set_plugin_cache(instance, placeholder, site_id, content, request, *, ttl):
+    """
+    Sets the fragment cache of the rendered «instance» for «ttl» seconds.
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_key(instance, placeholder, site_id, request)
+    duration = min(get_cms_setting('CACHE_DURATIONS')['content'], ttl)
+    cache.set(key, content, duration)
+
+
+def get_plugin_cache(instance, placeholder, site_id, request):
+    """
+    Returns the rendered «instance» from cache respecting the plugin's
+    VARY headers.
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_key(instance, placeholder, site_id, request)
+    return cache.get(key)
+
+
+def clear_plugin_cache(placeholder, lang, site_id):
+    """
+    Invalidates the fragments of the plugins in (placeholder x lang x site_id).
+    """
+    from django.core.cache import cache
+
+    key = _get_plugin_cache_version_key(placeholder.pk, lang, site_id)
+    cache.set(key, int(time.time() * 1000000), get_cms_setting('CACHE_DURATIONS')['content'])
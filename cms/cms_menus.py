@@ -1,12 +1,26 @@
+import warnings
+from collections import defaultdict
 from typing import Optional
 
+from django.db.models import Q
 from django.db.models.query import Prefetch, prefetch_related_objects
 from django.utils.functional import SimpleLazyObject
 
 from cms import constants
 from cms.apphook_pool import apphook_pool
-from cms.models import EmptyPageContent, PageContent, PagePermission, PageUrl
+from cms.models import (
+    MASK_CHILDREN,
+    MASK_DESCENDANTS,
+    MASK_PAGE,
+    EmptyPageContent,
+    Page,
+    PageContent,
+    PagePermission,
+    PageUrl,
+    TreeNode,
+)
 from cms.toolbar.utils import get_object_preview_url, get_toolbar_from_request
+from cms.utils.compat.warnings import RemovedInDjangoCMS43Warning
 from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import (
     get_fallback_languages,
@@ -45,24 +59,50 @@ def get_visible_nodes(request, pages, site):
     restrictions = PagePermission.objects.filter(
         page__in=pages,
         can_view=True,
-    )
-    restriction_map = {perm.page_id: perm for perm in restrictions}
+    ).values_list('page__node__path', 'grant_on', 'user_id', 'group_id')
 
     user_id = request.user.pk
     user_groups = SimpleLazyObject(lambda: frozenset(request.user.groups.values_list("pk", flat=True)))
     is_auth_user = request.user.is_authenticated
 
-    def user_can_see_page(page):
-        if page.pk in restriction_map:
-            # set internal fk cache to our page with loaded ancestors and descendants
-            PagePermission.page.field.set_cached_value(restriction_map[page.pk], page)
+    # Index the restrictions by the path of their page: each page is then
+    # checked against the restrictions of its ancestors only.
+    restricted_paths = {}
+    granted_paths = {}
+
+    for path, grant_on, perm_user_id, perm_group_id in restrictions:
+        restricted_paths[path] = restricted_paths.get(path, 0) | grant_on
+
+        if not is_auth_user:
+            continue
+
+        if perm_user_id == user_id or (perm_group_id is not None and perm_group_id in user_groups):
+            granted_paths[path] = granted_paths.get(path, 0) | grant_on
 
+    steplen = TreeNode.steplen
+
+    def user_can_see_page(page):
+        path = page.node.path
+        depth = len(path) // steplen
         restricted = False
-        for perm in restrictions:
-            if perm.get_page_permission_tuple().contains(page.node.path):
-                if not is_auth_user:
-                    return False
-                if perm.user_id == user_id or perm.group_id in user_groups:
+
+        for ancestor_depth in range(1, depth + 1):
+            ancestor_path = path[:ancestor_depth * steplen]
+
+            if ancestor_path not in restricted_paths:
+                continue
+
+            distance = depth - ancestor_depth
+
+            if distance == 0:
+                mask = MASK_PAGE
+            elif distance == 1:
+                mask = MASK_CHILDREN | MASK_DESCENDANTS
+            else:
+                mask = MASK_DESCENDANTS
+
+            if restricted_paths[ancestor_path] & mask:
+                if granted_paths.get(ancestor_path, 0) & mask:
                     return True
                 restricted = True
 
@@ -173,6 +213,8 @@ class CMSNavigationNode(NavigationNode):
         language: The language used for the node (optional).
     """
 
+    __slots__ = ('path', 'language')
+
     def __init__(self, *args, path: str, language: Optional[str] = None, **kwargs):
         """
         Initializes a CMSNavigationNode instance.
@@ -188,12 +230,15 @@ class CMSNavigationNode(NavigationNode):
         self.language = language
         super().__init__(*args, **kwargs)
 
-    def is_selected(self, request):
+    def get_selection_key(self):
+        return self.id
+
+    @classmethod
+    def get_request_selection_key(cls, request):
         try:
-            page_id = request.current_page.pk
+            return request.current_page.pk
         except AttributeError:
-            return False
-        return page_id == self.id
+            return None
 
 
 class CMSMenu(Menu):
@@ -202,12 +247,105 @@ class CMSMenu(Menu):
     """
 
     def get_nodes(self, request):
+        pages = get_page_queryset(self.renderer.site)
+        return [menu_node for page, menu_node in self._get_page_nodes(request, pages)]
+
+    def update_nodes(self, request, nodes, node_ids):
+        """
+        Updates the nodes of the changed pages «node_ids» and of their
+        descendants. The menu is built again if the homepage or a page
+        with extenders is affected.
+        """
+        site = self.renderer.site
+        changed_pages = Page.objects.filter(pk__in=node_ids, node__site=site).values_list('node__path', 'is_home')
+
+        if any(is_home for path, is_home in changed_pages):
+            return None
+
+        changed_paths = tuple(path for path, is_home in changed_pages)
+
+        # Remove the nodes of the changed pages and of their descendants,
+        # where they were before the changes.
+        children = defaultdict(list)
+
+        for node in nodes:
+            children[node.parent_id].append(node)
+
+        removed_ids = set(node_ids)
+        pending_ids = list(removed_ids)
+
+        while pending_ids:
+            for child in children[pending_ids.pop()]:
+                removed_ids.add(child.id)
+                pending_ids.append(child.id)
+
+        for node in nodes:
+            if node.id in removed_ids and (node.attr.get('is_home') or node.attr.get('navigation_extenders')):
+                return None
+
+        # Build the nodes of the changed pages and of their descendants.
+        # The ancestors are needed to check the view restrictions and the
+        # parents of the changed pages.
+        steplen = TreeNode.steplen
+        ancestor_paths = {path[:depth * steplen] for path in changed_paths for depth in range(1, len(path) // steplen)}
+        query = Q(node__path__in=ancestor_paths)
+
+        for path in changed_paths:
+            query |= Q(node__path__startswith=path)
+
+        page_nodes = self._get_page_nodes(request, get_page_queryset(site).filter(query)) if changed_paths else []
+        updated_nodes = []
+
+        for page, menu_node in page_nodes:
+            if not page.node.path.startswith(changed_paths):
+                continue
+
+            if page.application_urls or page.navigation_extenders:
+                return None
+            removed_ids.add(menu_node.id)
+            updated_nodes.append((page.node.path, menu_node))
+
+        # Keep the pages in tree order. The unchanged nodes keep their
+        # cached order, only the siblings of the updated nodes are ordered
+        # again by the path of their page.
+        children = defaultdict(list)
+        paths = {}
+
+        for node in nodes:
+            if node.id not in removed_ids:
+                children[node.parent_id].append(node)
+
+        for path, menu_node in sorted(updated_nodes, key=lambda path_node: path_node[0]):
+            children[menu_node.parent_id].append(menu_node)
+            paths[menu_node.id] = path
+
+        parent_ids = {menu_node.parent_id for path, menu_node in updated_nodes}
+        sibling_ids = [node.id for parent_id in parent_ids for node in children[parent_id] if node.id not in paths]
+        paths.update(Page.objects.filter(pk__in=sibling_ids, node__site=site).values_list('pk', 'node__path'))
+
+        for parent_id in parent_ids:
+            if any(node.id not in paths for node in children[parent_id]):
+                return None
+            children[parent_id].sort(key=lambda node: paths[node.id])
+
+        tree_nodes = []
+        pending_nodes = children[None][::-1]
+
+        while pending_nodes:
+            node = pending_nodes.pop()
+            tree_nodes.append(node)
+            pending_nodes.extend(children[node.id][::-1])
+        return tree_nodes
+
+    def _get_page_nodes(self, request, pages):
+        """
+        Returns a list of (page, navigation node) tuples for the visible
+        «pages» of the site.
+        """
         site = self.renderer.site
         lang = self.renderer.request_language
         toolbar = get_toolbar_from_request(request)
 
-        pages = get_page_queryset(site)
-
         if is_valid_site_language(lang, site_id=site.pk):
             _valid_language = True
             _hide_untranslated = hide_untranslated(lang, site.pk)
@@ -311,7 +449,7 @@ class CMSMenu(Menu):
                 else:
                     menu_node.parent_id = parent_id
                 node_id_to_page[node.pk] = page.pk
-                menu_nodes.append(menu_node)
+                menu_nodes.append((page, menu_node))
         return menu_nodes
 
 
@@ -323,37 +461,48 @@ class NavExtender(Modifier):
         if post_cut:
             return nodes
         # rearrange the parent relations
-        # Find home
-        home = next((n for n in nodes if n.attr.get("is_home", False)), None)
-        # Find nodes with NavExtenders
-        exts = []
+        # Find home and the nodes with NavExtenders
+        home = None
+        extended_nodes = []
+
         for node in nodes:
-            extenders = node.attr.get("navigation_extenders", None)
-            if extenders:
-                for ext in extenders:
-                    if ext not in exts:
-                        exts.append(ext)
-                    # Link the nodes
-                    for extnode in nodes:
-                        if extnode.namespace == ext and not extnode.parent_id:
-                            # if home has nav extenders but home is not visible
-                            if node == home and not node.visible:
-                                # extnode.parent_id = None
-                                extnode.parent_namespace = None
-                                extnode.parent = None
-                            else:
-                                extnode.parent_id = node.id
-                                extnode.parent_namespace = node.namespace
-                                extnode.parent = node
-                                node.children.append(extnode)
-        removed = []
+            if home is None and node.attr.get("is_home", False):
+                home = node
+            if node.attr.get("navigation_extenders", None):
+                extended_nodes.append(node)
+
+        exts = set()
+        nodes_by_namespace = defaultdict(list)
+
+        if extended_nodes:
+            namespaces = {ext for node in extended_nodes for ext in node.attr["navigation_extenders"]}
+
+            for node in nodes:
+                if node.namespace in namespaces:
+                    nodes_by_namespace[node.namespace].append(node)
+
+        for node in extended_nodes:
+            for ext in node.attr["navigation_extenders"]:
+                exts.add(ext)
+                # Link the nodes
+                for extnode in nodes_by_namespace[ext]:
+                    if not extnode.parent_id:
+                        # if home has nav extenders but home is not visible
+                        if node == home and not node.visible:
+                            # extnode.parent_id = None
+                            extnode.parent_namespace = None
+                            extnode.parent = None
+                        else:
+                            extnode.parent_id = node.id
+                            extnode.parent_namespace = node.namespace
+                            extnode.parent = node
+                            node.children.append(extnode)
 
         # find all not assigned nodes
-        for menu in self.renderer.menus.items():
-            if hasattr(menu[1], "cms_enabled") and menu[1].cms_enabled and menu[0] not in exts:
-                for node in nodes:
-                    if node.namespace == menu[0]:
-                        removed.append(node)
+        removed = {
+            namespace for namespace, menu in self.renderer.menus.items()
+            if getattr(menu, "cms_enabled", False) and namespace not in exts
+        }
         if breadcrumb:
             # if breadcrumb and home not in navigation add node
             if breadcrumb and home and not home.visible:
@@ -363,8 +512,8 @@ class NavExtender(Modifier):
                 else:
                     home.selected = False
         # remove all nodes that are nav_extenders and not assigned
-        for node in removed:
-            nodes.remove(node)
+        if removed:
+            nodes = [node for node in nodes if node.namespace not in removed]
         return nodes
 
 
@@ -440,17 +589,11 @@ class SoftRootCutter(Modifier):
         # or if no id argument is provided, indicating {% show_menu_below_id %}
         if post_cut or root_id:
             return nodes
-        selected = None
-        root_nodes = []
-        # find the selected node as well as all the root nodes
-        for node in nodes:
-            if node.selected:
-                selected = node
-            if not node.parent:
-                root_nodes.append(node)
+        index = self.renderer.get_node_index(nodes)
 
         # if we found a selected ...
-        if selected:
+        if index.selected:
+            selected = index.selected[-1]
             # and the selected is a softroot
             if selected.attr.get("soft_root", False):
                 # get it's descendants
@@ -464,37 +607,81 @@ class SoftRootCutter(Modifier):
                 nodes = self.find_ancestors_and_remove_children(selected, nodes)
         return nodes
 
-    def find_and_remove_children(self, node, nodes):
-        for child in node.children:
-            if child.attr.get("soft_root", False):
-                self.remove_children(child, nodes)
-        return nodes
-
-    def remove_children(self, node, nodes):
-        for child in node.children:
-            nodes.remove(child)
-            self.remove_children(child, nodes)
-        node.children = []
-
     def find_ancestors_and_remove_children(self, node, nodes):
         """
-        Check ancestors of node for soft roots
+        Check ancestors of node for soft roots. The descendants of the soft
+        roots among the children of the other root nodes and among the
+        grandchildren of node and its ancestors are removed.
         """
-        if node.parent:
+        index = self.renderer.get_node_index(nodes)
+        ancestors = [node]
+        other_roots = []
+
+        while node.parent:
             if node.parent.attr.get("soft_root", False):
-                nodes = node.parent.get_descendants()
+                nodes = [node.parent] + node.parent.get_descendants()
                 node.parent.parent = None
-                nodes = [node.parent] + nodes
-            else:
-                nodes = self.find_ancestors_and_remove_children(node.parent, nodes)
+                break
+            node = node.parent
+            ancestors.append(node)
         else:
-            for newnode in nodes:
-                if newnode != node and not newnode.parent:
-                    self.find_and_remove_children(newnode, nodes)
+            other_roots = [root for root in index.roots if root is not node]
+
+        removed = set()
+
+        for root in other_roots:
+            self.remove_soft_root_children(root, removed)
+
+        for ancestor in ancestors[::-1]:
+            for child in ancestor.children:
+                self.remove_soft_root_children(child, removed)
+        return [node for node in nodes if node not in removed] if removed else nodes
+
+    def remove_soft_root_children(self, node, removed):
+        """
+        Adds the descendants of the soft roots among the children of node
+        to «removed».
+        """
         for child in node.children:
-            if child != node:
-                self.find_and_remove_children(child, nodes)
+            if child.attr.get("soft_root", False):
+                removed.update(child.get_descendants())
+                child.children = []
+
+    def find_and_remove_children(self, node, nodes):
+        """
+        Removes the descendants of the soft roots among the children of
+        node from «nodes».
+
+        .. deprecated:: 4.1.5
+            Use :meth:`remove_soft_root_children` instead, this method
+            will be removed in django CMS 4.3.
+        """
+        warnings.warn(
+            "SoftRootCutter.find_and_remove_children() is deprecated and will be removed in django CMS 4.3, "
+            "use remove_soft_root_children() instead.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
+        )
+        removed = set()
+        self.remove_soft_root_children(node, removed)
+        nodes[:] = [other for other in nodes if other not in removed]
         return nodes
 
+    def remove_children(self, node, nodes):
+        """
+        Removes the descendants of node from «nodes».
+
+        .. deprecated:: 4.1.5
+            This method will be removed in django CMS 4.3.
+        """
+        warnings.warn(
+            "SoftRootCutter.remove_children() is deprecated and will be removed in django CMS 4.3.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
+        )
+        removed = set(node.get_descendants())
+        nodes[:] = [other for other in nodes if other not in removed]
+        node.children = []
+
 
 menu_pool.register_modifier(SoftRootCutter)
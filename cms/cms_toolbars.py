@@ -29,6 +29,7 @@ from cms.utils.page_permissions import (
     user_can_change_page,
     user_can_delete_page,
 )
+from cms.utils.profiling import get_render_profile
 from cms.utils.urlutils import add_url_parameters, admin_reverse
 from menus.utils import DefaultLanguageChanger
 
@@ -67,6 +68,8 @@ REMOVE_PAGE_LANGUAGE_BREAK = "Remove page language Break"
 COPY_PAGE_LANGUAGE_BREAK = "Copy page language Break"
 TOOLBAR_DISABLE_BREAK = 'Toolbar disable Break'
 SHORTCUTS_BREAK = 'Shortcuts Break'
+RENDER_PROFILE_MENU_IDENTIFIER = 'render-profile'
+RENDER_PROFILE_CACHE_BREAK = 'Render Profile Cache Break'
 
 
 @toolbar_pool.register
@@ -235,6 +238,58 @@ class AppearanceToolbar(CMSToolbar):
             self.toolbar.add_item(dark_mode_toggle)
 
 
+@toolbar_pool.register
+class RenderProfileToolbar(CMSToolbar):
+    """
+    Shows where the time rendering the page went, if CMS_RENDER_PROFILING is enabled
+    """
+
+    def post_template_populate(self):
+        profile = get_render_profile(self.request)
+
+        if profile is None:
+            return
+
+        menu = self.toolbar.get_or_create_menu(RENDER_PROFILE_MENU_IDENTIFIER, _('Profile'), side=self.toolbar.RIGHT)
+
+        for category, verbose_name in (
+            ('placeholder', _('Placeholders')),
+            ('plugin', _('Plugins')),
+            ('menu', _('Menus')),
+        ):
+            submenu = menu.get_or_create_menu(f'{RENDER_PROFILE_MENU_IDENTIFIER}-{category}', verbose_name)
+
+            for name, count, duration, queries in profile.get_totals(category):
+                label = _('%(name)s (%(count)d): %(duration).1f ms, %(queries)d queries') % {
+                    'name': name,
+                    'count': count,
+                    'duration': duration,
+                    'queries': queries,
+                }
+                submenu.add_link_item(label, url='', disabled=True)
+
+        slowest = menu.get_or_create_menu(f'{RENDER_PROFILE_MENU_IDENTIFIER}-slowest', _('Slowest plugins'))
+
+        for timing in profile.get_slowest('plugin'):
+            label = _('%(name)s %(pk)s: %(duration).1f ms, %(queries)d queries') % {
+                'name': timing.name,
+                'pk': timing.key,
+                'duration': timing.duration,
+                'queries': timing.queries,
+            }
+            slowest.add_link_item(label, url='', disabled=True)
+
+        menu.add_break(RENDER_PROFILE_CACHE_BREAK)
+
+        for cache in sorted(set(profile.cache_hits) | set(profile.cache_misses)):
+            label = _('%(cache)s cache: %(hits)d hits, %(misses)d misses') % {
+                'cache': cache,
+                'hits': profile.cache_hits[cache],
+                'misses': profile.cache_misses[cache],
+            }
+            menu.add_link_item(label, url='', disabled=True)
+
+
 @toolbar_pool.register
 class BasicToolbar(CMSToolbar):
     """
@@ -9,6 +9,7 @@ from .subcommands.delete_orphaned_plugins import DeleteOrphanedPluginsCommand
 from .subcommands.list import ListCommand
 from .subcommands.tree import FixTreeCommand
 from .subcommands.uninstall import UninstallCommand
+from .subcommands.warmup import WarmupCommand
 
 
 class Command(SubcommandsCommand):
@@ -20,6 +21,7 @@ class Command(SubcommandsCommand):
         ('fix-tree', FixTreeCommand),
         ('list', ListCommand),
         ('uninstall', UninstallCommand),
+        ('warmup', WarmupCommand),
     ))
     missing_args_message = 'one of the available sub commands must be provided'
 
@@ -0,0 +1,133 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.sites.models import Site
+from django.core.management import CommandError
+from django.db import connections
+from django.db.models import QuerySet
+from django.test.client import Client, RequestFactory
+from django.utils.module_loading import import_string
+
+from cms.cache.page import is_page_cache_fresh
+from cms.utils import get_language_list
+
+from .base import SubcommandsCommand
+
+
+def get_sitemap_priority(sitemap, item):
+    priority = sitemap.priority
+    if callable(priority):
+        priority = priority(item)
+    return priority
+
+
+class WarmupCommand(SubcommandsCommand):
+    help_string = 'Renders the pages listed in the sitemap to fill the page and placeholder caches'
+    command_name = 'warmup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sitemap', action='store', dest='sitemap',
+                            default='cms.sitemaps.CMSSitemap',
+                            help='Dotted path of the sitemap class listing the pages to warm up.')
+        parser.add_argument('--language', action='append', dest='languages', default=[],
+                            help='Only warm up pages in this language. May be given several times.')
+        parser.add_argument('--depth', action='store', dest='depth', type=int,
+                            help='Only warm up pages up to this depth in the page tree (root pages are 1).')
+        parser.add_argument('--min-priority', action='store', dest='min_priority', type=float,
+                            help='Only warm up pages with at least this sitemap priority.')
+        parser.add_argument('--workers', action='store', dest='workers', type=int, default=1,
+                            help='Number of pages rendered concurrently.')
+        parser.add_argument('--host', action='store', dest='host',
+                            help='Host header sent with every request. Defaults to the domain of the current site.')
+        parser.add_argument('--secure', action='store_true', dest='secure', default=False,
+                            help='Send the requests as https requests.')
+        parser.add_argument('--incremental', action='store_true', dest='incremental', default=False,
+                            help='Skip pages which are still in the page cache.')
+
+    def get_urls(self, options):
+        sitemap = import_string(options['sitemap'])()
+        items = sitemap.items()
+        languages = options['languages']
+        depth = options['depth']
+        min_priority = options['min_priority']
+
+        if languages:
+            unknown = set(languages).difference(get_language_list())
+            if unknown:
+                raise CommandError('Unknown language(s): %s' % ', '.join(sorted(unknown)))
+            if isinstance(items, QuerySet):
+                items = items.filter(language__in=languages)
+            else:
+                items = [item for item in items if item.language in languages]
+
+        if depth is not None:
+            if isinstance(items, QuerySet):
+                items = items.filter(page__node__depth__lte=depth)
+            else:
+                items = [item for item in items if item.page.node.depth <= depth]
+
+        urls = []
+        for item in items:
+            if min_priority is not None and get_sitemap_priority(sitemap, item) < min_priority:
+                continue
+            urls.append(sitemap.location(item))
+        return urls
+
+    def handle(self, *args, **options):
+        verbosity = options.get('verbosity')
+        workers = options.get('workers')
+        host = options.get('host') or Site.objects.get_current().domain
+        secure = options.get('secure')
+
+        if workers < 1:
+            raise CommandError('--workers must be at least 1')
+
+        urls = self.get_urls(options)
+
+        if options.get('incremental'):
+            factory = RequestFactory()
+            urls = [
+                url for url in urls
+                if not is_page_cache_fresh(factory.get(url, HTTP_HOST=host, secure=secure))
+            ]
+
+        # The test client isn't thread-safe, every worker uses its own
+        local = threading.local()
+
+        def warmup(url):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = Client()
+            started = time.perf_counter()
+            try:
+                status = client.get(url, HTTP_HOST=host, secure=secure).status_code
+            except Exception as error:
+                status = error
+            finally:
+                if workers > 1:
+                    # Every worker thread has its own database connections
+                    connections.close_all()
+            return url, status, time.perf_counter() - started
+
+        start = time.perf_counter()
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(warmup, urls))
+        else:
+            results = [warmup(url) for url in urls]
+
+        failures = 0
+        for url, status, duration in results:
+            line = f'{status} {duration * 1000:.1f}ms {url}\n'
+            if status != 200:
+                failures += 1
+                self.stderr.write(line, ending='')
+            elif verbosity > 1:
+                self.stdout.write(line, ending='')
+
+        if verbosity > 0:
+            elapsed = time.perf_counter() - start
+            self.stdout.write('Warmed up %d page(s) in %.1fs\n' % (len(results) - failures, elapsed), ending='')
+        if failures:
+            raise CommandError('%d page(s) could not be warmed up' % failures)
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+from cms.cache.page import get_page_cache_response
+from cms.utils.conf import get_cms_setting
+from cms.utils.profiling import add_server_timing_header, get_render_profile
+
+
+class PageCacheMiddleware(MiddlewareMixin):
+    """
+    Serves anonymous page cache hits before the rest of the middleware stack
+    (sessions, authentication, toolbar, current page, apphook reloading) and
+    the url resolution run. Any other request passes through unchanged.
+
+    Place it as close to the top of ``MIDDLEWARE`` as possible.
+    """
+
+    def is_cacheable_request(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return False
+
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            # The user might be logged in or using the toolbar,
+            # the details view decides.
+            return False
+
+        toolbar_params = (
+            get_cms_setting('CMS_TOOLBAR_URL__ENABLE'),
+            get_cms_setting('CMS_TOOLBAR_URL__DISABLE'),
+        )
+        return not any(param in request.GET for param in toolbar_params)
+
+    def process_request(self, request):
+        if not get_cms_setting('PAGE_CACHE') or not self.is_cacheable_request(request):
+            return None
+
+        response = get_page_cache_response(request)
+        profile = get_render_profile(request)
+
+        if response is not None and profile is not None:
+            # Misses are recorded by the details view.
+            profile.record_cache('page', hit=True)
+            add_server_timing_header(request, response, profile)
+        return response
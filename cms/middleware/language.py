@@ -9,15 +9,12 @@ if DJANGO_2_2:
 
 
 class LanguageCookieMiddleware(MiddlewareMixin):
-    async_capable = False
-
     def __init__(self, get_response):
         super().__init__(get_response)
 
     if DJANGO_2_2:
 
-        def __call__(self, request):
-            response = self.get_response(request)
+        def process_response(self, request, response):
             language = get_language()
             if hasattr(request, 'session'):
                 session_language = request.session.get(LANGUAGE_SESSION_KEY, None)
@@ -39,8 +36,7 @@ class LanguageCookieMiddleware(MiddlewareMixin):
             return response
     else:
 
-        def __call__(self, request):
-            response = self.get_response(request)
+        def process_response(self, request, response):
             language = get_language()
             if (
                 settings.LANGUAGE_COOKIE_NAME in request.COOKIES  # noqa: W503
@@ -63,3 +59,8 @@ class LanguageCookieMiddleware(MiddlewareMixin):
                 secure=settings.LANGUAGE_COOKIE_SECURE,
             )
             return response
+
+        async def __acall__(self, request):
+            # Setting the cookie doesn't block, no need for a thread.
+            response = await self.get_response(request)
+            return self.process_response(request, response)
@@ -18,3 +18,8 @@ def get_page(request):
 class CurrentPageMiddleware(MiddlewareMixin):
     def process_request(self, request):
         request.current_page = SimpleLazyObject(lambda: get_page(request))
+
+    async def __acall__(self, request):
+        # The current page is looked up lazily, no need for a thread.
+        self.process_request(request)
+        return await self.get_response(request)
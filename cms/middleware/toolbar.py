@@ -6,11 +6,12 @@ from django.core.exceptions import ValidationError
 from django.urls import resolve
 from django.urls.exceptions import Resolver404
 from django.utils.deprecation import MiddlewareMixin
-from django.utils.functional import SimpleLazyObject
+from django.utils.functional import SimpleLazyObject, empty
 
 from cms.toolbar.toolbar import CMSToolbar
 from cms.toolbar.utils import get_toolbar_from_request
 from cms.utils.conf import get_cms_setting
+from cms.utils.profiling import add_server_timing_header, get_render_profile
 from cms.utils.request_ip_resolvers import get_request_ip_resolver
 
 get_request_ip = get_request_ip_resolver()
@@ -53,6 +54,26 @@ class ToolbarMiddleware(MiddlewareMixin):
 
         return match.url_name in ('pages-root', 'pages-details-by-slug')
 
+    def get_toolbar_disabled(self, request):
+        """
+        Returns the value of the "cms_toolbar_disabled" session flag
+        requested by the url parameters, None to leave it unchanged.
+        """
+        persist = get_cms_setting('CMS_TOOLBAR_URL__PERSIST')
+        enable_toolbar = get_cms_setting('CMS_TOOLBAR_URL__ENABLE')
+        disable_toolbar = get_cms_setting('CMS_TOOLBAR_URL__DISABLE')
+        field = forms.BooleanField(required=False)
+
+        if not field.clean(request.GET.get(persist, True)):
+            return None
+
+        if enable_toolbar in request.GET or self.is_edit_mode(request):
+            return False
+
+        if disable_toolbar in request.GET:
+            return True
+        return None
+
     def process_request(self, request):
         """
         If we should show the toolbar for this request, put it on
@@ -62,17 +83,10 @@ class ToolbarMiddleware(MiddlewareMixin):
         if not self.is_cms_request(request):
             return
 
-        persist = get_cms_setting('CMS_TOOLBAR_URL__PERSIST')
-        enable_toolbar = get_cms_setting('CMS_TOOLBAR_URL__ENABLE')
-        disable_toolbar = get_cms_setting('CMS_TOOLBAR_URL__DISABLE')
-        field = forms.BooleanField(required=False)
-
-        if field.clean(request.GET.get(persist, True)):
-            if disable_toolbar in request.GET:
-                request.session['cms_toolbar_disabled'] = True
+        toolbar_disabled = self.get_toolbar_disabled(request)
 
-            if enable_toolbar in request.GET or self.is_edit_mode(request):
-                request.session['cms_toolbar_disabled'] = False
+        if toolbar_disabled is not None:
+            request.session['cms_toolbar_disabled'] = toolbar_disabled
 
         request.toolbar = SimpleLazyObject(lambda: CMSToolbar(request))
 
@@ -86,4 +100,33 @@ class ToolbarMiddleware(MiddlewareMixin):
 
         if toolbar._cache_disabled:
             add_never_cache_headers(response)
+
+        profile = get_render_profile(request)
+
+        if profile is not None and not response.streaming:
+            # Streamed responses are rendered after their headers are sent.
+            add_server_timing_header(request, response, profile)
         return response
+
+    async def __acall__(self, request):
+        """
+        Only switches to a thread to load the session or
+        to set up a toolbar which was not used by the view.
+        """
+        from asgiref.sync import sync_to_async
+
+        if not self.is_cms_request(request):
+            return await self.get_response(request)
+
+        toolbar_disabled = self.get_toolbar_disabled(request)
+
+        if toolbar_disabled is not None:
+            await sync_to_async(request.session.__setitem__)('cms_toolbar_disabled', toolbar_disabled)
+
+        request.toolbar = SimpleLazyObject(lambda: CMSToolbar(request))
+        response = await self.get_response(request)
+        toolbar = request.toolbar
+
+        if isinstance(toolbar, SimpleLazyObject) and toolbar._wrapped is empty:
+            return await sync_to_async(self.process_response)(request, response)
+        return self.process_response(request, response)
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.utils.deprecation import MiddlewareMixin
 
 from cms.utils import apphook_reload
@@ -9,3 +10,9 @@ class ApphookReloadMiddleware(MiddlewareMixin):
     """
     def process_request(self, request):
         apphook_reload.ensure_urlconf_is_up_to_date()
+
+    async def __acall__(self, request):
+        # Only the revision lookup needs the database, the rest of the
+        # request stays on the event loop.
+        await sync_to_async(apphook_reload.ensure_urlconf_is_up_to_date, thread_sensitive=True)()
+        return await self.get_response(request)
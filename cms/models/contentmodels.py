@@ -161,11 +161,31 @@ class PageContent(models.Model):
             setattr(self, field, value)
         self.save(update_fields=data.keys())
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Don't load the template if the field is deferred
+        self._saved_template = self.__dict__.get('template')
+
     def save(self, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        template_changed = (
+            self.pk is not None
+            and self.template != self._saved_template
+            and (update_fields is None or 'template' in update_fields)
+        )
+
         # delete template cache
         if hasattr(self, '_template_cache'):
             delattr(self, '_template_cache')
         super().save(**kwargs)
+        self._saved_template = self.template
+
+        if template_changed:
+            # Pages are rendered without creating their placeholders
+            # outside of edit mode, create the ones of the new template.
+            self.rescan_placeholders()
+            # The inherited template may change with the ancestors
+            delattr(self, '_template_cache')
 
     def toggle_in_navigation(self, set_to=None):
         '''
@@ -180,9 +200,9 @@ class PageContent(models.Model):
 
         self.update(in_navigation=new)
 
-        # If there was a change, invalidate the cms page cache
+        # If there was a change, invalidate the cms page and menu caches
         if new != old:
-            self.page.clear_cache()
+            self.page.clear_cache(language=self.language, menu=True)
         return new
 
     def has_placeholder_change_permission(self, user):
@@ -646,11 +646,33 @@ class Page(models.Model):
         return self.pagecontent_set.filter(language=language).exists()
 
     def clear_cache(self, language=None, menu=False, placeholder=False):
-        from cms.cache import invalidate_cms_page_cache
+        from cms.cache import (
+            get_page_cache_tag,
+            get_site_cache_tag,
+            invalidate_cms_page_cache_tags,
+        )
 
         if get_cms_setting('PAGE_CACHE'):
-            # Clears all the page caches
-            invalidate_cms_page_cache()
+            site_id = self.node.site_id
+
+            if menu and language:
+                # Menus are rendered on every page of the site, clear the page
+                # caches of the site in the language and in the languages
+                # falling back to it.
+                tags = [get_site_cache_tag(site_id, language)]
+                tags.extend(
+                    get_site_cache_tag(site_id, lang)
+                    for lang in i18n.get_language_list(site_id)
+                    if language in i18n.get_fallback_languages(lang, site_id=site_id)
+                )
+            elif menu:
+                # Menus are rendered on every page of the site,
+                # so clear the page caches for the whole site.
+                tags = [get_site_cache_tag(site_id)]
+            else:
+                # Clears the page caches depending on this page
+                tags = [get_page_cache_tag(self.pk)]
+            invalidate_cms_page_cache_tags(tags)
 
         if placeholder and get_cms_setting('PLACEHOLDER_CACHE'):
             assert language, 'language is required when clearing placeholder cache'
@@ -661,8 +683,13 @@ class Page(models.Model):
                 placeholder.clear_cache(language, site_id=self.node.site_id)
 
         if menu:
-            # Clears all menu caches for this page's site
-            menu_pool.clear(site_id=self.node.site_id)
+            from cms.cms_menus import CMSMenu
+
+            # Updates the nodes of this page and of its descendants in the
+            # menu caches of this page's site. The other menus of the site,
+            # like the menus attached to pages, might depend on the pages too
+            # and are built again.
+            menu_pool.clear_nodes(self.node.site_id, CMSMenu.__name__, [self.pk], clear_other_menus=True)
 
     def get_child_pages(self):
         nodes = self.node.get_children()
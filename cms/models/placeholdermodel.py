@@ -1,15 +1,15 @@
-import warnings
-from datetime import datetime, timedelta
-
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import connection, models, transaction
 from django.template.defaultfilters import title
-from django.utils.encoding import force_str
 from django.utils.translation import gettext_lazy as _
 
-from cms.cache import invalidate_cms_page_cache
+from cms.cache import (
+    get_placeholder_cache_tag,
+    invalidate_cms_page_cache_tags,
+)
 from cms.cache.placeholder import clear_placeholder_cache
+from cms.cache.plugin import clear_plugin_cache, get_plugin_cache_expiration, get_plugin_vary_cache_on
 from cms.constants import EXPIRE_NOW, MAX_EXPIRATION_TTL
 from cms.exceptions import LanguageError
 from cms.models.managers import PlaceholderManager
@@ -371,51 +371,12 @@ class Placeholder(models.Model):
 
         language = get_language_from_request(request, self.page)
         for instance, plugin in inner_plugin_iterator(language):
-            plugin_expiration = plugin.get_cache_expiration(
-                request, instance, self)
+            ttl = get_plugin_cache_expiration(
+                plugin, instance, self, request, response_timestamp)
 
-            # The plugin_expiration should only ever be either: None, a TZ-
-            # aware datetime, a timedelta, or an integer.
-            if plugin_expiration is None:
+            if ttl is None:
                 # Do not consider plugins that return None
                 continue
-            if isinstance(plugin_expiration, (datetime, timedelta)):
-                if isinstance(plugin_expiration, datetime):
-                    # We need to convert this to a TTL against the
-                    # response timestamp.
-                    try:
-                        delta = plugin_expiration - response_timestamp
-                    except TypeError:
-                        # Attempting to take the difference of a naive datetime
-                        # and a TZ-aware one results in a TypeError. Ignore
-                        # this plugin.
-                        warnings.warn(
-                            'Plugin %(plugin_class)s (%(pk)d) returned a naive '
-                            'datetime : %(value)s for get_cache_expiration(), '
-                            'ignoring.' % {
-                                'plugin_class': plugin.__class__.__name__,
-                                'pk': instance.pk,
-                                'value': force_str(plugin_expiration),
-                            })
-                        continue
-                else:
-                    # Its already a timedelta instance...
-                    delta = plugin_expiration
-                ttl = int(delta.total_seconds() + 0.5)
-            else:  # must be an int-like value
-                try:
-                    ttl = int(plugin_expiration)
-                except ValueError:
-                    # Looks like it was not very int-ish. Ignore this plugin.
-                    warnings.warn(
-                        'Plugin %(plugin_class)s (%(pk)d) returned '
-                        'unexpected value %(value)s for '
-                        'get_cache_expiration(), ignoring.' % {
-                            'plugin_class': plugin.__class__.__name__,
-                            'pk': instance.pk,
-                            'value': force_str(plugin_expiration),
-                        })
-                    continue
 
             min_ttl = min(ttl, min_ttl)
             if min_ttl <= 0:
@@ -427,12 +388,14 @@ class Placeholder(models.Model):
 
     def clear_cache(self, language, site_id=None):
         if get_cms_setting('PAGE_CACHE'):
-            # Clears all the page caches
-            invalidate_cms_page_cache()
+            # Clears the page caches of all pages this placeholder was rendered on
+            invalidate_cms_page_cache_tags([get_placeholder_cache_tag(self.pk)])
 
         if not site_id and self.page:
             site_id = self.page.node.site_id
-        clear_placeholder_cache(self, language, get_site_id(site_id))
+        site_id = get_site_id(site_id)
+        clear_placeholder_cache(self, language, site_id)
+        clear_plugin_cache(self, language, site_id)
 
     def get_plugin_tree_order(self, language, parent_id=None):
         """
@@ -470,27 +433,7 @@ class Placeholder(models.Model):
         for instance, plugin in inner_plugin_iterator(language):
             if not instance:
                 continue
-            vary_on = plugin.get_vary_cache_on(request, instance, self)
-            if not vary_on:
-                # None, or an empty iterable
-                continue
-            if isinstance(vary_on, str):
-                if vary_on.lower() not in vary_list:
-                    vary_list.add(vary_on.lower())
-            else:
-                try:
-                    for vary_on_item in iter(vary_on):
-                        if vary_on_item.lower() not in vary_list:
-                            vary_list.add(vary_on_item.lower())
-                except TypeError:
-                    warnings.warn(
-                        'Plugin %(plugin_class)s (%(pk)d) returned '
-                        'unexpected value %(value)s for '
-                        'get_vary_cache_on(), ignoring.' % {
-                            'plugin_class': plugin.__class__.__name__,
-                            'pk': instance.pk,
-                            'value': force_str(vary_on),
-                        })
+            vary_list.update(get_plugin_vary_cache_on(plugin, instance, self, request))
 
         return sorted(list(vary_list))
 
@@ -1,12 +1,16 @@
 from django.conf import settings
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.template.response import TemplateResponse
 from django.urls import Resolver404, resolve, reverse
+from django.utils.cache import add_never_cache_headers
 
 from cms import __version__, constants
 from cms.cache.page import set_page_cache
 from cms.models import EmptyPageContent
+from cms.toolbar.utils import get_toolbar_from_request
+from cms.utils.conf import get_cms_setting
 from cms.utils.page_permissions import user_can_change_page, user_can_view_page
+from cms.utils.streaming import stream_template
 
 
 def render_page(request, page, current_language, slug=None):
@@ -29,8 +33,17 @@ def render_page(request, page, current_language, slug=None):
         return _handle_no_page(request)
 
     template = page_content.get_template()
-    response = TemplateResponse(request, template, context)
-    response.add_post_render_callback(set_page_cache)
+    response = None
+
+    if get_cms_setting('PAGE_STREAMING') and not _may_cache_page(request):
+        response = _stream_page(request, template, context)
+
+    if response is None:
+        if get_cms_setting('PAGE_CACHE'):
+            get_toolbar_from_request(request).content_renderer.enable_page_cache_holes()
+
+        response = TemplateResponse(request, template, context)
+        response.add_post_render_callback(set_page_cache)
 
     # Add headers for X Frame Options - this really should be changed upon moving to class based views
     xframe_options = page.get_xframe_options()
@@ -53,6 +66,38 @@ def render_page(request, page, current_language, slug=None):
     return response
 
 
+def _may_cache_page(request):
+    """
+    Returns True if the rendered page might be stored in the page cache,
+    which needs the complete response.
+    """
+    if not get_cms_setting('PAGE_CACHE') or request.user.is_authenticated:
+        return False
+    return not get_toolbar_from_request(request)._cache_disabled
+
+
+def _stream_page(request, template, context):
+    """
+    Returns a streaming response sending the page up to each placeholder
+    before rendering it, or None if the template can't be streamed.
+    """
+    toolbar = get_toolbar_from_request(request)
+    streaming_content = stream_template(
+        template,
+        context,
+        request,
+        toolbar_hidden=not toolbar.show_toolbar,
+    )
+
+    if streaming_content is None:
+        return None
+
+    response = StreamingHttpResponse(streaming_content)
+    # Streamed pages are never stored in the page cache.
+    add_never_cache_headers(response)
+    return response
+
+
 def _handle_no_page(request):
     try:
         # redirect to PageContent's changelist if the root page is detected
@@ -227,6 +227,33 @@ class CMSPluginBase(admin.ModelAdmin, metaclass=CMSPluginBaseMetaclass):
         If you disable a plugin cache be sure to restart the server and clear the cache afterwards.
     """
 
+    cache_fragment = False
+    """Cache the rendered output of every instance of this plugin on its own?
+
+    If set to ``True``, the output (including what is added to sekizai blocks)
+    is reused whenever the plugin is rendered again, even if the placeholder
+    it is in has to be re-rendered. The cache entry is replaced when the plugin
+    or one of its children is saved, moved or deleted, and when the cache of its
+    placeholder is cleared. It respects :meth:`get_cache_expiration` and
+    :meth:`get_vary_cache_on`.
+
+    Only use this for plugins whose output depends on nothing but their own
+    configuration and the request headers returned by
+    :meth:`get_vary_cache_on`. Plugins with ``cache = False`` are never cached.
+    """
+
+    parallel_safe = False
+    """Can instances of this plugin be rendered in a thread of their own?
+
+    If all plugins in a placeholder are parallel safe and
+    :setting:`CMS_PLACEHOLDER_RENDER_THREADS` is set, the placeholder is rendered
+    concurrently with the other parallel safe placeholders of the page.
+
+    Only set this to ``True`` if :meth:`render` and the plugin template neither
+    depend on nor change template variables set by the page template, do not
+    change the request and do not render placeholders themselves.
+    """
+
     system = False
 
     opts = {}
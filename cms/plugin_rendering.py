@@ -1,18 +1,44 @@
+import asyncio
 import contextlib
+import copy
 import logging
 import sys
+import threading
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
 from classytags.utils import flatten_context
 from django.contrib.sites.models import Site
+from django.db import close_old_connections, connections
 from django.template import Context
+from django.utils import timezone
+from django.utils.crypto import get_random_string
 from django.utils.functional import cached_property
 from django.utils.module_loading import import_string
 from django.utils.safestring import mark_safe
-from django.utils.translation import override
-
-from cms.cache.placeholder import get_placeholder_cache, set_placeholder_cache
+from django.utils.timezone import now
+from django.utils.translation import get_language, override
+from sekizai.context_processors import sekizai
+from sekizai.helpers import get_varname
+
+from cms.cache import (
+    get_page_cache_tag,
+    get_placeholder_cache_tag,
+    get_site_cache_tag,
+)
+from cms.cache.page import get_page_cache_hole_markers
+from cms.cache.placeholder import (
+    get_placeholder_cache,
+    get_placeholder_caches,
+    set_placeholder_cache,
+)
+from cms.cache.plugin import (
+    get_plugin_cache,
+    get_plugin_cache_expiration,
+    set_plugin_cache,
+)
+from cms.constants import EXPIRE_NOW, MAX_EXPIRATION_TTL
 from cms.exceptions import PlaceholderNotFound
 from cms.models import PageContent, Placeholder
 from cms.toolbar.utils import (
@@ -24,15 +50,41 @@ from cms.utils import get_language_from_request
 from cms.utils.conf import get_cms_setting
 from cms.utils.permissions import has_plugin_permission
 from cms.utils.placeholder import (
+    get_existing_placeholders_for_obj,
+    get_placeholder_conf,
     get_toolbar_plugin_struct,
     rescan_placeholders_for_obj,
     restore_sekizai_context,
 )
 from cms.utils.plugins import get_plugin_restrictions
+from cms.utils.profiling import RenderProfile, get_render_profile, measure
 
 logger = logging.getLogger(__name__)
 
 
+_placeholder_render_executor = (0, None)
+_placeholder_render_executor_lock = threading.Lock()
+
+
+def _get_placeholder_render_executor(max_workers):
+    """
+    Returns the placeholder render pool, replacing it
+    if CMS_PLACEHOLDER_RENDER_THREADS has changed.
+    """
+    global _placeholder_render_executor
+
+    with _placeholder_render_executor_lock:
+        size, executor = _placeholder_render_executor
+
+        if executor is None or size != max_workers:
+            if executor is not None:
+                # The renders already submitted are completed by the old threads.
+                executor.shutdown(wait=False)
+            executor = ThreadPoolExecutor(max_workers, thread_name_prefix='cms-placeholder')
+            _placeholder_render_executor = (max_workers, executor)
+    return executor
+
+
 def _unpack_plugins(parent_plugin):
     found_plugins = []
 
@@ -90,6 +142,10 @@ class BaseRenderer:
         self._rendered_placeholders = OrderedDict()
         self._rendered_static_placeholders = OrderedDict()
         self._rendered_plugins_by_placeholder = {}
+        self._page_cache_tags = set()
+        self._page_cache_holes = None
+        self._placeholder_cache_expirations = {}
+        self._placeholder_vary_cache_on = {}
 
     @cached_property
     def current_page(self):
@@ -116,6 +172,35 @@ class BaseRenderer:
     def request_language(self):
         return get_language_from_request(self.request)
 
+    @cached_property
+    def response_timestamp(self):
+        """
+        The time the cache expiration of the placeholders rendered
+        for the current response is computed from.
+        """
+        return now()
+
+    def get_placeholder_cache_expiration(self, placeholder):
+        """
+        Returns placeholder.get_cache_expiration() for the current response,
+        computed once per placeholder.
+        """
+        if placeholder.pk not in self._placeholder_cache_expirations:
+            self._placeholder_cache_expirations[placeholder.pk] = placeholder.get_cache_expiration(
+                self.request,
+                self.response_timestamp,
+            )
+        return self._placeholder_cache_expirations[placeholder.pk]
+
+    def get_placeholder_vary_cache_on(self, placeholder):
+        """
+        Returns placeholder.get_vary_cache_on() for the current request,
+        computed once per placeholder.
+        """
+        if placeholder.pk not in self._placeholder_vary_cache_on:
+            self._placeholder_vary_cache_on[placeholder.pk] = placeholder.get_vary_cache_on(self.request)
+        return self._placeholder_vary_cache_on[placeholder.pk]
+
     def get_placeholder_plugin_menu(self, placeholder, page=None):
         registered_plugins = self.plugin_pool.registered_plugins
         can_add_plugin = partial(has_plugin_permission, user=self.request.user, permission_type='add')
@@ -190,6 +275,40 @@ class BaseRenderer:
     def get_rendered_static_placeholders(self):
         return list(self._rendered_static_placeholders.values())
 
+    def add_page_cache_tag(self, tag):
+        """
+        Records an additional dependency of the current response,
+        e.g. a page referenced by a template tag.
+        """
+        self._page_cache_tags.add(tag)
+
+    def get_page_cache_tags(self):
+        """
+        Returns the tags the page cache entry for the current response
+        depends on: the current page, every rendered placeholder,
+        any explicitly recorded dependency and the site / language.
+        """
+        site_id = self.current_site.pk
+        tags = set(self._page_cache_tags)
+        tags.add(get_site_cache_tag(site_id))
+        tags.add(get_site_cache_tag(site_id, self.request_language))
+
+        current_page = getattr(self.request, 'current_page', None)
+
+        if current_page:
+            tags.add(get_page_cache_tag(current_page.pk))
+
+        for placeholder_id in self._rendered_placeholders:
+            tags.add(get_placeholder_cache_tag(placeholder_id))
+        return tags
+
+    def get_page_cache_holes(self):
+        """
+        Returns the placeholders which have been left out of the page cache
+        entry for the current response (see enable_page_cache_holes()).
+        """
+        return self._page_cache_holes or []
+
 
 class ContentRenderer(BaseRenderer):
 
@@ -207,6 +326,45 @@ class ContentRenderer(BaseRenderer):
     def __init__(self, request):
         super().__init__(request)
         self._placeholders_are_editable = bool(self.toolbar.edit_mode_active)
+        self._concurrent_renders = {}
+        self._awaited_plugin_renders = {}
+        self._render_profile = get_render_profile(request)
+
+    def enable_page_cache_holes(self):
+        """
+        Called before rendering a page which might be stored in the page cache.
+        From then on, placeholders which can't be cached for longer than
+        CMS_PAGE_CACHE_HOLE_TTL are marked in the rendered content, so the
+        page can be cached without them and they are rendered on every hit.
+        """
+        if get_cms_setting('PAGE_CACHE_HOLE_TTL') is None:
+            return
+
+        if self.request.user.is_authenticated or self.toolbar._cache_disabled:
+            # The response is not going to be cached.
+            return
+        self._page_cache_holes = []
+        self._page_cache_hole_prefix = get_random_string(12)
+
+    def _is_page_cache_hole(self, placeholder, editable):
+        if self._page_cache_holes is None or editable:
+            return False
+        ttl = self.get_placeholder_cache_expiration(placeholder)
+        return ttl <= get_cms_setting('PAGE_CACHE_HOLE_TTL')
+
+    def _add_page_cache_hole(self, placeholder, content, language, page, width):
+        key = '%s:%d' % (self._page_cache_hole_prefix, len(self._page_cache_holes))
+        current_page = self.current_page
+        self._page_cache_holes.append({
+            'key': key,
+            'placeholder': placeholder.pk,
+            'language': language,
+            'page': page.pk if page else None,
+            'current_page': current_page.pk if current_page else None,
+            'width': width,
+        })
+        start, end = get_page_cache_hole_markers(key)
+        return mark_safe(start + content + end)
 
     def placeholder_cache_is_enabled(self):
         if not get_cms_setting('PLACEHOLDER_CACHE'):
@@ -232,6 +390,9 @@ class ContentRenderer(BaseRenderer):
                 placeholder=placeholder,
                 language=language,
             )
+
+            if self._render_profile is not None:
+                self._render_profile.record_cache('placeholder', hit=cached_value is not None)
         else:
             cached_value = None
 
@@ -239,35 +400,44 @@ class ContentRenderer(BaseRenderer):
             # User has opted to use the cache
             # and there is something in the cache
             restore_sekizai_context(context, cached_value['sekizai'])
+
+            if self._is_page_cache_hole(placeholder, editable):
+                return self._add_page_cache_hole(
+                    placeholder,
+                    content=cached_value['content'],
+                    language=language,
+                    page=page,
+                    width=width or placeholder.default_width,
+                )
             return mark_safe(cached_value['content'])
 
         context.push()
 
         width = width or placeholder.default_width
         template = page.get_template() if page else None
-
-        if width:
-            context['width'] = width
-
-        # Add extra context as defined in settings, but do not overwrite existing context variables,
-        # since settings are general and database/template are specific
-        # TODO this should actually happen as a plugin context processor, but these currently overwrite
-        # existing context -- maybe change this order?
-        for key, value in placeholder.get_extra_context(template).items():
-            if key not in context:
-                context[key] = value
+        self._update_placeholder_context(context, placeholder, width, template)
 
         if use_cache:
             watcher = Watcher(context)
 
-        plugin_content = self.render_plugins(
-            placeholder,
-            language=language,
-            context=context,
-            editable=editable,
-            template=template,
-        )
-        placeholder_content = ''.join(plugin_content)
+        concurrent_render = None if editable else self._concurrent_renders.pop(placeholder.pk, None)
+
+        with measure(self._render_profile, 'placeholder', placeholder.slot, key=placeholder.pk):
+            if concurrent_render is not None:
+                # The plugins have been rendered in the placeholder render pool,
+                # merge their sekizai data and renderer state now to keep them in template order.
+                placeholder_content, sekizai_changes, renderer = concurrent_render.result()
+                restore_sekizai_context(context, sekizai_changes)
+                self._merge_thread_renderer(renderer)
+            else:
+                plugin_content = self.render_plugins(
+                    placeholder,
+                    language=language,
+                    context=context,
+                    editable=editable,
+                    template=template,
+                )
+                placeholder_content = ''.join(plugin_content)
 
         if not placeholder_content and nodelist:
             # should be nodelist from a template
@@ -284,6 +454,8 @@ class ContentRenderer(BaseRenderer):
                 site_id=self.current_site.pk,
                 content=content,
                 request=self.request,
+                vary_on_list=self.get_placeholder_vary_cache_on(placeholder),
+                ttl=self.get_placeholder_cache_expiration(placeholder),
             )
 
         rendered_placeholder = RenderedPlaceholder(
@@ -295,11 +467,14 @@ class ContentRenderer(BaseRenderer):
             has_content=bool(placeholder_content),
         )
 
+        is_page_cache_hole = self._is_page_cache_hole(placeholder, editable)
+
         if placeholder.pk not in self._rendered_placeholders:
             # First time this placeholder is rendered
-            if not self.toolbar._cache_disabled:
+            if not self.toolbar._cache_disabled and not is_page_cache_hole:
                 # The toolbar middleware needs to know if the response
-                # is to be cached.
+                # is to be cached. Page cache holes are left out of the
+                # cached page, so they don't prevent caching it.
                 # Set the _cache_disabled flag to the value of cache_placeholder
                 # only if the flag is False (meaning cache is enabled).
                 self.toolbar._cache_disabled = not use_cache
@@ -313,8 +488,162 @@ class ContentRenderer(BaseRenderer):
             placeholder_content = self.placeholder_edit_template.format(**data)
 
         context.pop()
+
+        if is_page_cache_hole:
+            return self._add_page_cache_hole(
+                placeholder,
+                content=placeholder_content,
+                language=language,
+                page=page,
+                width=width,
+            )
         return mark_safe(placeholder_content)
 
+    def _update_placeholder_context(self, context, placeholder, width, template):
+        if width:
+            context['width'] = width
+
+        # Add extra context as defined in settings, but do not overwrite existing context variables,
+        # since settings are general and database/template are specific
+        # TODO this should actually happen as a plugin context processor, but these currently overwrite
+        # existing context -- maybe change this order?
+        for key, value in placeholder.get_extra_context(template).items():
+            if key not in context:
+                context[key] = value
+
+    def _is_parallel_safe(self, placeholder, template):
+        """
+        Placeholders are parallel safe if configured so, or if all
+        their (already fetched) plugins are of parallel safe plugin classes.
+        """
+        parallel_safe = get_placeholder_conf('parallel_safe', placeholder.slot, template)
+
+        if parallel_safe is not None:
+            return bool(parallel_safe)
+
+        plugins = getattr(placeholder, '_all_plugins_cache', None)
+
+        if not plugins:
+            return False
+        return all(self.get_plugin_class(plugin).parallel_safe for plugin in plugins)
+
+    def _copy_for_thread(self):
+        """
+        Returns a copy of the renderer for rendering plugins in a pool thread.
+        The copy shares the request and the lazy attributes evaluated so far,
+        but records what it renders in structures of its own, which are merged
+        back on the request thread by _merge_thread_renderer().
+        """
+        renderer = copy.copy(self)
+        renderer.templates = copy.copy(self.templates)
+        renderer.templates._cached_templates = dict(self.templates._cached_templates)
+        renderer._cached_plugin_classes = dict(self._cached_plugin_classes)
+        renderer._rendered_plugins_by_placeholder = {}
+        renderer._page_cache_tags = set()
+        renderer._placeholder_cache_expirations = dict(self._placeholder_cache_expirations)
+        renderer._placeholder_vary_cache_on = dict(self._placeholder_vary_cache_on)
+        renderer._placeholders_content_cache = {}
+        renderer._concurrent_renders = {}
+        renderer._awaited_plugin_renders = {}
+
+        if self._render_profile is not None:
+            renderer._render_profile = RenderProfile()
+        return renderer
+
+    def _merge_thread_renderer(self, renderer):
+        """
+        Merges what «renderer», a copy made by _copy_for_thread(),
+        has recorded while rendering plugins in a pool thread.
+        """
+        self._cached_plugin_classes.update(renderer._cached_plugin_classes)
+        self._rendered_plugins_by_placeholder.update(renderer._rendered_plugins_by_placeholder)
+        self._page_cache_tags.update(renderer._page_cache_tags)
+
+        for placeholder_id, ttl in renderer._placeholder_cache_expirations.items():
+            self._placeholder_cache_expirations.setdefault(placeholder_id, ttl)
+
+        for placeholder_id, vary_on in renderer._placeholder_vary_cache_on.items():
+            self._placeholder_vary_cache_on.setdefault(placeholder_id, vary_on)
+
+        if self._render_profile is not None:
+            self._render_profile.timings.extend(renderer._render_profile.timings)
+            self._render_profile.cache_hits.update(renderer._render_profile.cache_hits)
+            self._render_profile.cache_misses.update(renderer._render_profile.cache_misses)
+
+    def _start_concurrent_renders(self, page, context):
+        """
+        Submits the plugins of all parallel safe placeholders of «page» to
+        the placeholder render pool. render_placeholder() picks up the results
+        in template order.
+
+        The pool threads use database connections of their own, so nothing is
+        rendered concurrently inside a transaction, e.g. with ATOMIC_REQUESTS.
+        """
+        max_workers = get_cms_setting('PLACEHOLDER_RENDER_THREADS')
+
+        if not max_workers or self._placeholders_are_editable:
+            return
+
+        if any(connections[alias].in_atomic_block for alias in connections):
+            # The pool threads would not see the changes made in the transaction.
+            return
+
+        language = self.request_language
+        template = page.get_template()
+        placeholders = [
+            placeholder for placeholder in self._placeholders_by_page_cache[page.pk].values()
+            if placeholder.pk not in self._concurrent_renders
+            and hasattr(placeholder, '_plugins_cache')
+            and self._is_parallel_safe(placeholder, template)
+        ]
+
+        if len(placeholders) < 2:
+            # Nothing to gain.
+            return
+
+        # Evaluate the lazy attributes used while rendering plugins
+        # before copying the renderer for the other threads.
+        self.current_site
+        self.templates
+        self.response_timestamp
+
+        executor = _get_placeholder_render_executor(max_workers)
+        translation = get_language()
+        tz = timezone.get_current_timezone()
+
+        def render(renderer, placeholder, placeholder_context):
+            try:
+                with override(translation), timezone.override(tz):
+                    content = ''.join(renderer.render_plugins(
+                        placeholder,
+                        language=language,
+                        context=placeholder_context,
+                        editable=False,
+                        template=template,
+                    ))
+                sekizai_data = placeholder_context[get_varname()]
+                sekizai_changes = {key: list(values) for key, values in sekizai_data.items() if values}
+                return content, sekizai_changes, renderer
+            finally:
+                # Every pool thread has its own database connections
+                close_old_connections()
+
+        for placeholder in placeholders:
+            # Every placeholder gets its own copy of the renderer and the context
+            # and collects its sekizai data separately.
+            renderer = self._copy_for_thread()
+            placeholder_context = Context(context.flatten())
+            placeholder_context.update(sekizai())
+            placeholder_context['cms_content_renderer'] = renderer
+            self._update_placeholder_context(placeholder_context, placeholder, placeholder.default_width, template)
+
+            try:
+                future = executor.submit(render, renderer, placeholder, placeholder_context)
+            except RuntimeError:
+                # The pool has just been replaced, render the rest sequentially.
+                break
+            self._concurrent_renders[placeholder.pk] = future
+
     def get_editable_placeholder_context(self, placeholder, page=None):
         placeholder_cache = self.get_rendered_plugins_cache(placeholder)
         placeholder_toolbar_js = self.get_placeholder_toolbar_js(placeholder, page)
@@ -346,8 +675,15 @@ class ContentRenderer(BaseRenderer):
         current_obj = self.toolbar.get_object()
         if current_obj is None:
             raise PlaceholderNotFound(f"No object found for placeholder '{slot}'")
-        rescan_placeholders_for_obj(current_obj)
-        placeholder = Placeholder.objects.get_for_obj(current_obj).get(slot=slot)
+        if self.toolbar.edit_mode_active:
+            # Creates any placeholders missing on the object
+            rescan_placeholders_for_obj(current_obj)
+            placeholder = Placeholder.objects.get_for_obj(current_obj).get(slot=slot)
+        else:
+            placeholder = get_existing_placeholders_for_obj(current_obj).get(slot)
+
+            if placeholder is None:
+                return ''
         content = self.render_placeholder(
             placeholder,
             context=context,
@@ -371,6 +707,7 @@ class ContentRenderer(BaseRenderer):
             # Instead of loading plugins for this one placeholder
             # try and load them for all placeholders on the page.
             self._preload_placeholders_for_page(current_page)
+            self._start_concurrent_renders(current_page, context)
 
         try:
             placeholder = placeholder_cache[current_page.pk][slot]
@@ -454,7 +791,43 @@ class ContentRenderer(BaseRenderer):
             self._rendered_static_placeholders[static_placeholder.pk] = static_placeholder
         return content
 
+    def plugin_cache_is_enabled(self):
+        if not get_cms_setting('PLUGIN_CACHE'):
+            return False
+        if self.request.user.is_staff:
+            return False
+        return not self._placeholders_are_editable
+
+    def _get_plugin_cache_ttl(self, plugin, instance, placeholder):
+        """
+        Returns the number of seconds the rendered «instance» can be kept
+        in the fragment cache, 0 if it must not be cached.
+        """
+        if not plugin.cache_fragment or not plugin.cache or not self.plugin_cache_is_enabled():
+            return EXPIRE_NOW
+
+        ttl = get_plugin_cache_expiration(
+            plugin,
+            instance,
+            placeholder,
+            self.request,
+            self.response_timestamp,
+        )
+
+        if ttl is None:
+            return MAX_EXPIRATION_TTL
+        return max(EXPIRE_NOW, min(ttl, MAX_EXPIRATION_TTL))
+
     def render_plugin(self, instance, context, placeholder=None, editable=False):
+        if self._render_profile is None:
+            return self._render_plugin(instance, context, placeholder, editable)
+
+        with self._render_profile.measure('plugin', instance.plugin_type, key=instance.pk):
+            return self._render_plugin(instance, context, placeholder, editable)
+
+    def _render_plugin(self, instance, context, placeholder, editable):
+        from sekizai.helpers import Watcher
+
         if not placeholder:
             placeholder = instance.placeholder
 
@@ -463,6 +836,24 @@ class ContentRenderer(BaseRenderer):
         if not instance or not plugin.render_plugin:
             return ''
 
+        cache_ttl = EXPIRE_NOW if editable else self._get_plugin_cache_ttl(plugin, instance, placeholder)
+
+        if cache_ttl:
+            cached_value = get_plugin_cache(
+                instance,
+                placeholder,
+                site_id=self.current_site.pk,
+                request=self.request,
+            )
+
+            if self._render_profile is not None:
+                self._render_profile.record_cache('plugin', hit=cached_value is not None)
+
+            if cached_value is not None:
+                restore_sekizai_context(context, cached_value['sekizai'])
+                return mark_safe(cached_value['content'])
+            watcher = Watcher(context)
+
         # we'd better pass a flat dict to template.render
         # as plugin.render can return pretty much any kind of context / dictionary
         # we'd better flatten it and force to a Context object
@@ -471,9 +862,10 @@ class ContentRenderer(BaseRenderer):
         # plugin._get_render_template is either a string or an engine-specific template object
         context = PluginContext(context, instance, placeholder)
         try:
-            context = plugin.render(context, instance, placeholder.slot)
+            context = self._get_plugin_render_context(plugin, instance, context, placeholder)
             context = flatten_context(context)
         except Exception:  # catch errors when executing a plugin's render method
+            cache_ttl = EXPIRE_NOW
             context['exc_info'] = sys.exc_info()
             content = self.render_exception('executing plugin.render', instance, context, placeholder, editable)
             logger.error(
@@ -487,6 +879,7 @@ class ContentRenderer(BaseRenderer):
                 template = self.templates.get_cached_template(template_name)
                 content = template.render(context)
             except Exception:  # catch errors when rendering a plugin's template
+                cache_ttl = EXPIRE_NOW
                 context['exc_info'] = sys.exc_info()
                 content = self.render_exception('rendering template', instance, context, placeholder, editable)
                 logger.error(
@@ -499,12 +892,77 @@ class ContentRenderer(BaseRenderer):
             processor = import_string(path)
             content = processor(instance, placeholder, content, context)
 
+        if cache_ttl:
+            set_plugin_cache(
+                instance,
+                placeholder,
+                site_id=self.current_site.pk,
+                content={'content': content, 'sekizai': watcher.get_changes()},
+                request=self.request,
+                ttl=cache_ttl,
+            )
+
         if editable:
             content = self.plugin_edit_template.format(pk=instance.pk, content=content)
             placeholder_cache = self._rendered_plugins_by_placeholder.setdefault(placeholder.pk, {})
             placeholder_cache.setdefault('plugins', []).append(instance)
         return mark_safe(content)
 
+    def _get_plugin_render_context(self, plugin, instance, context, placeholder):
+        """
+        Returns the context returned by the plugin's render() method, or by
+        its render_async() coroutine if it has one.
+        """
+        if instance.pk in self._awaited_plugin_renders:
+            # Already awaited together with the other plugins of the placeholder.
+            result = self._awaited_plugin_renders.pop(instance.pk)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+        if hasattr(plugin, 'render_async'):
+            from asgiref.sync import async_to_sync
+
+            return async_to_sync(plugin.render_async)(context, instance, placeholder.slot)
+        return plugin.render(context, instance, placeholder.slot)
+
+    def _await_plugin_renders(self, plugins, context, placeholder, editable):
+        """
+        Awaits the render_async() coroutines of the given plugins concurrently.
+        Plugins served from the fragment cache are left out.
+        """
+        from asgiref.sync import async_to_sync
+
+        pending = []
+
+        for plugin in plugins:
+            instance, plugin_class = plugin.get_plugin_instance()
+
+            if not instance or not plugin_class.render_plugin or not hasattr(plugin_class, 'render_async'):
+                continue
+
+            if not editable and self._get_plugin_cache_ttl(plugin_class, instance, placeholder):
+                continue
+            pending.append((plugin_class, instance))
+
+        if len(pending) < 2:
+            # Nothing to gain.
+            return
+
+        # The plugin context processors run synchronously, before the event loop is involved.
+        coroutines = [
+            plugin_class.render_async(PluginContext(context, instance, placeholder), instance, placeholder.slot)
+            for plugin_class, instance in pending
+        ]
+
+        async def render_all():
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+
+        results = async_to_sync(render_all)()
+
+        for index, (_, instance) in enumerate(pending):
+            self._awaited_plugin_renders[instance.pk] = results[index]
+
     def render_exception(self, action, instance, context, placeholder, editable):
         if editable:
             exc, value, traceback = context['exc_info']
@@ -525,6 +983,7 @@ class ContentRenderer(BaseRenderer):
             template=template,
             language=language,
         )
+        self._await_plugin_renders(plugins, context, placeholder, editable)
 
         for plugin in plugins:
             plugin._placeholder_cache = placeholder
@@ -557,6 +1016,29 @@ class ContentRenderer(BaseRenderer):
                 language_cache[placeholder.pk] = cached_value
         return language_cache.get(placeholder.pk)
 
+    def _preload_cached_placeholder_content(self, placeholders, language):
+        """
+        Looks up the cached content of all given placeholders at once.
+        Placeholders without cached content are not looked up again.
+        """
+        site_id = self.current_site.pk
+        site_cache = self._placeholders_content_cache.setdefault(site_id, {})
+        language_cache = site_cache.setdefault(language, {})
+        placeholders = [pl for pl in placeholders if pl.pk not in language_cache]
+
+        if not placeholders:
+            return
+
+        cached_values = get_placeholder_caches(
+            placeholders,
+            lang=language,
+            site_id=site_id,
+            request=self.request,
+        )
+
+        for placeholder in placeholders:
+            language_cache[placeholder.pk] = cached_values.get(placeholder.pk)
+
     def _get_content_object(self, page, slots=None):
         toolbar_obj = self.toolbar.get_object()
         if isinstance(toolbar_obj, PageContent) and toolbar_obj.page == page:
@@ -572,8 +1054,13 @@ class ContentRenderer(BaseRenderer):
             return Placeholder.objects.get_for_obj(page_content) if page_content else Placeholder.objects.none()
         elif page_content := page.get_content_obj(self.request_language, fallback=False):
             PageContent.page.field.set_cached_value(page_content, page)
-            # Creates any placeholders missing on the page
-            return page_content.rescan_placeholders().values()
+
+            if self.toolbar.edit_mode_active:
+                # Creates any placeholders missing on the page
+                return page_content.rescan_placeholders().values()
+            # The placeholders are created when the template is changed,
+            # only read them outside of edit mode.
+            return get_existing_placeholders_for_obj(page_content).values()
         else:
             return Placeholder.objects.none()
 
@@ -600,6 +1087,7 @@ class ContentRenderer(BaseRenderer):
             slots_w_inheritance = []
 
         if self.placeholder_cache_is_enabled():
+            self._preload_cached_placeholder_content(placeholders, self.request_language)
             _cached_content = self._get_cached_placeholder_content
             # Only prefetch plugins if the placeholder
             # has not been cached.
@@ -30,6 +30,7 @@ from django.utils.translation import (
 )
 from sekizai.templatetags.sekizai_tags import RenderBlock, SekizaiParser
 
+from cms.cache import get_page_cache_tag
 from cms.cache.page import get_page_url_cache, set_page_url_cache
 from cms.exceptions import PlaceholderNotFound
 from cms.models import (
@@ -97,6 +98,21 @@ def _get_page_by_untyped_arg(page_lookup, request, site_id):
             return None
 
 
+def _get_page_id_from_untyped_arg(page_lookup):
+    """
+    Returns the page id for the `page_lookup` argument (see
+    _get_page_by_untyped_arg()) if it can be determined without a
+    database lookup, otherwise None.
+    """
+    if isinstance(page_lookup, Page):
+        return page_lookup.pk
+    if isinstance(page_lookup, int):
+        return page_lookup
+    if isinstance(page_lookup, dict):
+        return page_lookup.get('pk')
+    return None
+
+
 def _show_placeholder_by_id(context, placeholder_name, reverse_id,
                             lang=None, site=None, use_cache=True):
     validate_placeholder_name(placeholder_name)
@@ -117,6 +133,8 @@ def _show_placeholder_by_id(context, placeholder_name, reverse_id,
     if not page:
         return ''
 
+    renderer.add_page_cache_tag(get_page_cache_tag(page.pk))
+
     if lang is None:
         lang = renderer.request_language
 
@@ -228,9 +246,18 @@ class PageUrl(AsTag):
         url = get_page_url_cache(page_lookup, lang, site_id)
         if url is None:
             page = _get_page_by_untyped_arg(page_lookup, request, site_id)
+            page_id = page.pk if page else None
             if page:
                 url = page.get_absolute_url(language=lang)
-                set_page_url_cache(page_lookup, lang, site_id, url)
+                set_page_url_cache(page_lookup, lang, site_id, url, page_id=page_id)
+        else:
+            page_id = _get_page_id_from_untyped_arg(page_lookup)
+
+        if page_id and hasattr(request, 'toolbar'):
+            # The page cache entry of the current response depends on the
+            # referenced page.
+            renderer = request.toolbar.get_content_renderer()
+            renderer.add_page_cache_tag(get_page_cache_tag(page_id))
         if url:
             return url
         return ''
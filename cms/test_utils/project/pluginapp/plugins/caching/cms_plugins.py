@@ -1,3 +1,4 @@
+import threading
 from datetime import datetime, timedelta
 
 from django.utils import timezone
@@ -106,3 +107,41 @@ class SekizaiPlugin(CMSPluginBase):
     def render(self, context, instance, placeholder):
         context['now'] = datetime.now().microsecond
         return context
+
+
+class FragmentCachePlugin(CMSPluginBase):
+    name = 'FragmentCache'
+    module = 'Test'
+    render_plugin = True
+    cache_fragment = True
+    render_template = "plugins/sekizai.html"
+
+    def render(self, context, instance, placeholder):
+        context['now'] = datetime.now().microsecond
+        return context
+
+
+class ParallelSafePlugin(CMSPluginBase):
+    name = 'ParallelSafe'
+    module = 'Test'
+    render_plugin = True
+    parallel_safe = True
+    render_template = "plugins/sekizai.html"
+
+    def render(self, context, instance, placeholder):
+        context['now'] = '%s:%s' % (instance.pk, threading.current_thread().name)
+        return context
+
+
+class FragmentCacheParentPlugin(CMSPluginBase):
+    name = 'FragmentCacheParent'
+    module = 'Test'
+    render_plugin = True
+    allow_children = True
+    cache_fragment = True
+    render_template = "plugins/fragment_parent.html"
+
+    def render(self, context, instance, placeholder):
+        context = super().render(context, instance, placeholder)
+        context['now'] = datetime.now().microsecond
+        return context
@@ -5,6 +5,7 @@ from shutil import rmtree as _rmtree
 from tempfile import _exists, mkdtemp, template
 
 from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
 from django.utils.translation import activate, get_language
 
 from cms.apphook_pool import apphook_pool
@@ -173,3 +174,63 @@ class SignalTester:
     def __call__(self, *args, **kwargs):
         self.call_count += 1
         self.calls.append((args, kwargs))
+
+
+@contextmanager
+def cache_tester(alias=DEFAULT_CACHE_ALIAS):
+    env = CacheTester(caches[alias])
+
+    try:
+        yield env
+    finally:
+        env.restore()
+
+
+class CacheTester:
+    """
+    Records the operations done on a cache backend, e.g. to count the cache
+    round-trips needed to render a page. Operations a backend implements on
+    top of other operations (like get_many() calling get()) count once.
+    """
+    operations = ('get', 'get_many', 'set', 'set_many', 'add', 'incr', 'delete', 'delete_many', 'touch')
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = []
+        self._depth = 0
+
+        for operation in self.operations:
+            setattr(backend, operation, self._wrap(operation, getattr(backend, operation)))
+
+    def _wrap(self, operation, method):
+        def wrapper(key_or_keys, *args, **kwargs):
+            if not self._depth:
+                if isinstance(key_or_keys, str):
+                    keys = [key_or_keys]
+                else:
+                    keys = list(key_or_keys)
+                self.calls.append((operation, keys))
+            self._depth += 1
+            try:
+                return method(key_or_keys, *args, **kwargs)
+            finally:
+                self._depth -= 1
+        return wrapper
+
+    def restore(self):
+        for operation in self.operations:
+            delattr(self.backend, operation)
+
+    def get_calls(self, key_contains=''):
+        """
+        Returns the recorded (operation, keys) calls involving
+        a key containing «key_contains».
+        """
+        return [
+            (operation, keys) for operation, keys in self.calls
+            if any(key_contains in key for key in keys)
+        ]
+
+    @property
+    def call_count(self):
+        return len(self.calls)
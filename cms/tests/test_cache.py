@@ -1,11 +1,31 @@
+import gzip
+import re
 import time
+from datetime import timedelta
+from unittest.mock import patch
 
 from django.conf import settings
 from django.template import Context
+from django.test import TransactionTestCase
+from django.utils.timezone import now
 from sekizai.context import SekizaiContext
 
 from cms.api import add_plugin, create_page, create_page_content
-from cms.cache import invalidate_cms_page_cache
+from cms.cache import (
+    _get_page_cache_tag_key,
+    _get_page_cache_tag_versions,
+    _page_cache_tag_versions_are_current,
+    invalidate_cms_page_cache,
+    invalidate_cms_page_cache_tags,
+)
+from cms.cache.page import (
+    _page_cache_key,
+    _page_cache_lock_key,
+    _page_cache_variant_key,
+    get_page_cache,
+    get_page_cache_stats,
+    is_page_cache_fresh,
+)
 from cms.cache.placeholder import (
     _get_placeholder_cache_key,
     _get_placeholder_cache_version,
@@ -13,22 +33,28 @@ from cms.cache.placeholder import (
     _set_placeholder_cache_version,
     clear_placeholder_cache,
     get_placeholder_cache,
+    get_placeholder_caches,
     set_placeholder_cache,
 )
 from cms.exceptions import PluginAlreadyRegistered
 from cms.models import Page
 from cms.plugin_pool import plugin_pool
+from cms.plugin_rendering import _get_placeholder_render_executor
 from cms.test_utils.project.placeholderapp.models import Example1
 from cms.test_utils.project.pluginapp.plugins.caching.cms_plugins import (
     DateTimeCacheExpirationPlugin,
+    FragmentCacheParentPlugin,
+    FragmentCachePlugin,
     LegacyCachePlugin,
     NoCachePlugin,
+    ParallelSafePlugin,
     SekizaiPlugin,
     TimeDeltaCacheExpirationPlugin,
     TTLCacheExpirationPlugin,
     VaryCacheOnPlugin,
 )
-from cms.test_utils.testcases import CMSTestCase
+from cms.test_utils.testcases import BaseCMSTestCase, CMSTestCase
+from cms.test_utils.util.context_managers import cache_tester
 from cms.test_utils.util.fuzzy_int import FuzzyInt
 from cms.toolbar.toolbar import CMSToolbar
 from cms.toolbar.utils import get_object_edit_url
@@ -128,7 +154,7 @@ class CacheTestCase(CMSTestCase):
             request = self.get_request(page1_url)
             request.current_page = Page.objects.get(pk=page1.pk)
             request.toolbar = CMSToolbar(request)
-            with self.assertNumQueries(FuzzyInt(16, 23)):
+            with self.assertNumQueries(FuzzyInt(14, 21)):
                 response1 = self.client.get(page1_url)
                 content1 = response1.content
 
@@ -169,7 +195,7 @@ class CacheTestCase(CMSTestCase):
             request = self.get_request(page1_url)
             request.current_page = Page.objects.get(pk=page1.pk)
             request.toolbar = CMSToolbar(request)
-            with self.assertNumQueries(6):
+            with self.assertNumQueries(5):
                 output2 = self.render_template_obj(template, {}, request)
             with self.settings(CMS_PAGE_CACHE=False):
                 with self.assertNumQueries(FuzzyInt(8, 16)):
@@ -546,6 +572,138 @@ class CacheTestCase(CMSTestCase):
         response = self.client.get(page1.get_absolute_url())
         self.assertContains(response, "alert(")
 
+    def test_plugin_fragment_cache(self):
+        page1 = create_page("test page 1", "nav_playground.html", "en")
+        page1_url = page1.get_absolute_url()
+        placeholder = page1.get_placeholders("en").get(slot="body")
+
+        for plugin in (FragmentCachePlugin, NoCachePlugin):
+            try:
+                plugin_pool.register_plugin(plugin)
+            except PluginAlreadyRegistered:
+                pass
+        fragment_plugin = add_plugin(placeholder, "FragmentCachePlugin", "en")
+        add_plugin(placeholder, "NoCachePlugin", "en")
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        }
+        with self.settings(**overrides):
+            content1 = self.client.get(page1_url).content.decode("utf8").split("$$$")
+            content2 = self.client.get(page1_url).content.decode("utf8").split("$$$")
+            # The placeholder is re-rendered, the fragment cache plugin is not
+            self.assertEqual(content1[1], content2[1])
+            self.assertNotEqual(content1[3], content2[3])
+            # Its sekizai data is restored from the cache
+            self.assertIn("alert('%s')" % content2[1], content2[-1])
+
+            # Changing the plugin replaces the cache entry
+            fragment_plugin.save()
+            content3 = self.client.get(page1_url).content.decode("utf8").split("$$$")
+            self.assertNotEqual(content2[1], content3[1])
+
+            with self.settings(CMS_PLUGIN_CACHE=False):
+                content4 = self.client.get(page1_url).content.decode("utf8").split("$$$")
+                self.assertNotEqual(content3[1], content4[1])
+
+        plugin_pool.unregister_plugin(FragmentCachePlugin)
+        plugin_pool.unregister_plugin(NoCachePlugin)
+
+    def test_plugin_fragment_cache_children(self):
+        page1 = create_page("test page 1", "nav_playground.html", "en")
+        page1_url = page1.get_absolute_url()
+        placeholder = page1.get_placeholders("en").get(slot="body")
+
+        for plugin in (FragmentCacheParentPlugin, NoCachePlugin):
+            try:
+                plugin_pool.register_plugin(plugin)
+            except PluginAlreadyRegistered:
+                pass
+        parent = add_plugin(placeholder, "FragmentCacheParentPlugin", "en")
+        child1 = add_plugin(placeholder, "FragmentCacheParentPlugin", "en", target=parent)
+        child2 = add_plugin(placeholder, "FragmentCacheParentPlugin", "en", target=parent)
+        add_plugin(placeholder, "NoCachePlugin", "en")
+
+        def get_rendered_tree():
+            content = self.client.get(page1_url).content.decode("utf8")
+            # The [pk:timestamp ...] output of the plugins
+            return re.findall(r"\[(\d+):(\d+)", content)
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        }
+        with self.settings(**overrides):
+            tree1 = get_rendered_tree()
+            self.assertEqual(tree1, get_rendered_tree())
+            self.assertEqual([pk for pk, _ in tree1], [str(parent.pk), str(child1.pk), str(child2.pk)])
+
+            # Reordering the children
+            child2.refresh_from_db()
+            placeholder.move_plugin(child2, target_position=child2.position - 1, target_plugin=parent)
+            tree2 = get_rendered_tree()
+            self.assertEqual([pk for pk, _ in tree2], [str(parent.pk), str(child2.pk), str(child1.pk)])
+            self.assertNotEqual(tree1[0], tree2[0])
+
+            # Moving a child out of the parent
+            child1.refresh_from_db()
+            placeholder.move_plugin(child1, target_position=placeholder.get_last_plugin_position("en"))
+            tree3 = get_rendered_tree()
+            self.assertEqual([pk for pk, _ in tree3][:2], [str(parent.pk), str(child2.pk)])
+            self.assertNotEqual(tree2[0], tree3[0])
+
+            # Deleting a child
+            child2.refresh_from_db()
+            placeholder.delete_plugin(child2)
+            tree4 = get_rendered_tree()
+            self.assertEqual([pk for pk, _ in tree4], [str(parent.pk), str(child1.pk)])
+            self.assertNotEqual(tree3[0], tree4[0])
+
+            # Clearing the placeholder cache
+            self.assertEqual(tree4, get_rendered_tree())
+            placeholder.clear_cache("en")
+            self.assertNotEqual(tree4[0], get_rendered_tree()[0])
+
+        plugin_pool.unregister_plugin(FragmentCacheParentPlugin)
+        plugin_pool.unregister_plugin(NoCachePlugin)
+
+    def test_concurrent_placeholder_rendering_in_transaction(self):
+        page1 = create_page("test page 1", "nav_playground.html", "en")
+        placeholders = page1.get_placeholders("en")
+
+        try:
+            plugin_pool.register_plugin(ParallelSafePlugin)
+        except PluginAlreadyRegistered:
+            pass
+        add_plugin(placeholders.get(slot="right-column"), "ParallelSafePlugin", "en")
+        add_plugin(placeholders.get(slot="body"), "ParallelSafePlugin", "en")
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE": False,
+            "CMS_PLACEHOLDER_CACHE": False,
+            "CMS_PLACEHOLDER_RENDER_THREADS": 2,
+        }
+        with self.settings(**overrides):
+            # The test runs in a transaction the pool threads can't see
+            content = self.client.get(page1.get_absolute_url()).content.decode("utf8")
+
+        self.assertNotIn(":cms-placeholder", content)
+        self.assertIn(":MainThread", content)
+
+        plugin_pool.unregister_plugin(ParallelSafePlugin)
+
     def test_cache_invalidation(self):
 
         # Ensure that we're testing in an environment WITHOUT the MW cache...
@@ -580,6 +738,465 @@ class CacheTestCase(CMSTestCase):
             response = self.client.get(page1_url)
             self.assertContains(response, "A Link")
 
+    def test_cache_invalidation_by_tags(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page2 = create_page("test page 2", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            page2_url = page2.get_absolute_url()
+            placeholder1 = page1.get_placeholders("en").get(slot="body")
+            placeholder2 = page2.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder1, "TextPlugin", "en", body="Page 1 content")
+            add_plugin(placeholder2, "TextPlugin", "en", body="Page 2 content")
+
+            # Prime the page cache
+            self.client.get(page1_url)
+            self.client.get(page2_url)
+
+            # Changing a placeholder only invalidates the pages it was rendered on
+            placeholder1.clear_cache("en")
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                response = self.client.get(page1_url)
+            self.assertContains(response, "Page 1 content")
+            with self.assertNumQueries(0):
+                response = self.client.get(page2_url)
+            self.assertContains(response, "Page 2 content")
+
+            # Changing a page only invalidates its own cache entries
+            Page.objects.get(pk=page2.pk).clear_cache()
+            with self.assertNumQueries(0):
+                self.client.get(page1_url)
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page2_url)
+
+            # Menu changes invalidate all pages of the site
+            Page.objects.get(pk=page1.pk).clear_cache(menu=True)
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page1_url)
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page2_url)
+
+            # The global page cache version still invalidates everything
+            invalidate_cms_page_cache()
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page1_url)
+
+    def test_cache_invalidation_by_language(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            self.client.get(page1_url)
+
+            with patch("cms.cache.invalidate_cms_page_cache_tags") as invalidate:
+                Page.objects.get(pk=page1.pk).clear_cache(language="de", menu=True)
+            # The languages falling back to German are invalidated as well
+            self.assertEqual(
+                sorted(invalidate.call_args[0][0]),
+                ["site:1:lang:de", "site:1:lang:en", "site:1:lang:es-mx", "site:1:lang:fr", "site:1:lang:pt-br"],
+            )
+
+            # Menu changes in a language no other language falls back to
+            # don't invalidate the pages in the other languages
+            Page.objects.get(pk=page1.pk).clear_cache(language="pt-br", menu=True)
+            with self.assertNumQueries(0):
+                self.client.get(page1_url)
+
+            # Menu changes in the language of a page invalidate it
+            Page.objects.get(pk=page1.pk).clear_cache(language="en", menu=True)
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page1_url)
+
+    def test_cache_tag_versions_keep_concurrent_invalidations(self):
+        from django.core.cache import cache
+
+        invalidate_cms_page_cache_tags(["page:1"])
+        tag_key = _get_page_cache_tag_key("page:1")
+        new_tag_key = _get_page_cache_tag_key("page:2")
+        get_many = cache.get_many
+
+        def get_many_then_invalidate(keys):
+            versions = get_many(keys)
+            # Another process invalidates the tags after they have been read
+            cache.set(tag_key, 1)
+            cache.set(new_tag_key, 1)
+            return versions
+
+        with patch.object(cache, "get_many", get_many_then_invalidate):
+            tag_versions = _get_page_cache_tag_versions(["page:1", "page:2"])
+
+        # The invalidations are not overwritten
+        self.assertEqual(cache.get(tag_key), 1)
+        self.assertEqual(cache.get(new_tag_key), 1)
+        self.assertIsNone(tag_versions[new_tag_key])
+        self.assertFalse(_page_cache_tag_versions_are_current(tag_versions))
+
+        # Without concurrent changes, the versions are kept
+        tag_versions = _get_page_cache_tag_versions(["page:1", "page:2"])
+        self.assertEqual(tag_versions[tag_key], 1)
+        self.assertEqual(tag_versions[new_tag_key], 1)
+        self.assertTrue(_page_cache_tag_versions_are_current(tag_versions))
+
+    def test_stale_page_cache_single_flight(self):
+        from django.core.cache import cache
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE_STALE_TTL": 60,
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            placeholder = page1.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder, "TextPlugin", "en", body="Stale content")
+            self.client.get(page1_url)
+
+            # Let the entry expire, it's kept for the grace window
+            request = self.get_request(page1_url)
+            key = _page_cache_variant_key(request, [])
+            bodies, headers, expires_datetime, tag_versions, holes = cache.get(key)
+            expired = (bodies, headers, now() - timedelta(seconds=5), tag_versions, holes)
+            cache.set(key, expired, 60)
+
+            # Another worker is re-rendering the page
+            cache.add(_page_cache_lock_key(request), 1, 30)
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url)
+            self.assertContains(response, "Stale content")
+            self.assertIn("max-age=0", response["Cache-Control"])
+            self.assertEqual(get_page_cache_stats()["coalesced"], 1)
+
+            # The lock is free, this request re-renders the page
+            cache.delete(_page_cache_lock_key(request))
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                response = self.client.get(page1_url)
+            self.assertContains(response, "Stale content")
+            self.assertEqual(get_page_cache_stats()["revalidated"], 1)
+            self.assertIsNone(cache.get(_page_cache_lock_key(request)))
+
+            # The fresh entry is served from the cache
+            with self.assertNumQueries(0):
+                self.client.get(page1_url)
+
+    def test_stale_page_cache_with_middleware(self):
+        from django.core.cache import cache
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        middleware = [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        overrides = {
+            "MIDDLEWARE": ["cms.middleware.cache.PageCacheMiddleware"] + middleware,
+            "CMS_PAGE_CACHE_STALE_TTL": 60,
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            self.client.get(page1_url)
+
+            request = self.get_request(page1_url)
+            key = _page_cache_variant_key(request, [])
+            bodies, headers, expires_datetime, tag_versions, holes = cache.get(key)
+            expired = (bodies, headers, now() - timedelta(seconds=5), tag_versions, holes)
+            cache.set(key, expired, 60)
+
+            # The middleware chooses this request to re-render the page,
+            # the details view must not serve it the stale entry.
+            self.client.cookies.clear()
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                response = self.client.get(page1_url)
+            self.assertNotIn("max-age=0", response["Cache-Control"])
+            self.assertEqual(get_page_cache_stats(), {"revalidated": 1, "coalesced": 0})
+            self.assertIsNone(cache.get(_page_cache_lock_key(request)))
+            self.assertTrue(is_page_cache_fresh(request))
+
+    def test_conditional_get_on_cached_page(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+            "django.middleware.http.ConditionalGetMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            response = self.client.get(page1_url)
+            etag = response["ETag"]
+            last_modified = response["Last-Modified"]
+            self.assertTrue(etag.startswith('"'))
+
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+            self.assertIn("max-age", response["Cache-Control"])
+
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+            self.assertEqual(response.status_code, 304)
+
+            response = self.client.get(page1_url, HTTP_IF_NONE_MATCH='"outdated"')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["ETag"], etag)
+
+    def test_page_cache_variants(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+        }
+        plugin_pool.register_plugin(VaryCacheOnPlugin)
+        self.addCleanup(plugin_pool.unregister_plugin, VaryCacheOnPlugin)
+
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            placeholder = page1.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder, "VaryCacheOnPlugin", "en")
+
+            response = self.client.get(page1_url, HTTP_COUNTRY_CODE="de")
+            self.assertContains(response, "$$$de$$$")
+            self.assertIn("country-code", response["Vary"])
+
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_COUNTRY_CODE="de")
+            self.assertContains(response, "$$$de$$$")
+
+            # A different variant is rendered and cached separately
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                response = self.client.get(page1_url, HTTP_COUNTRY_CODE="fr")
+            self.assertContains(response, "$$$fr$$$")
+
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_COUNTRY_CODE="fr")
+            self.assertContains(response, "$$$fr$$$")
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_COUNTRY_CODE="de")
+            self.assertContains(response, "$$$de$$$")
+
+    def test_page_cache_query_params(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE_QUERY_PARAMS": {"policy": "deny", "params": ["utm_source", "fbclid"]},
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            self.client.get(page1_url + "?a=1&b=2")
+
+            # Reordered and denied parameters share the cache entry
+            with self.assertNumQueries(0):
+                self.client.get(page1_url + "?b=2&utm_source=news&a=1")
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page1_url + "?a=2&b=2")
+
+        overrides["CMS_PAGE_CACHE_QUERY_PARAMS"] = {"policy": "allow", "params": ["page"]}
+        with self.settings(**overrides):
+            self.client.get(page1_url)
+            with self.assertNumQueries(0):
+                self.client.get(page1_url + "?fbclid=123&gclid=456")
+            with self.assertNumQueries(FuzzyInt(1, 25)):
+                self.client.get(page1_url + "?page=2")
+
+        overrides["CMS_PAGE_CACHE_QUERY_PARAMS"] = {"policy": "ignore"}
+        with self.settings(**overrides):
+            with self.assertNumQueries(0):
+                self.client.get(page1_url + "?page=3")
+
+    def test_page_cache_middleware(self):
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        middleware = [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        overrides = {
+            "MIDDLEWARE": ["cms.middleware.cache.PageCacheMiddleware"] + middleware,
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            placeholder = page1.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder, "TextPlugin", "en", body="Early content")
+            self.client.get(page1_url)
+
+            toolbar_request = "cms.middleware.toolbar.ToolbarMiddleware.process_request"
+            with patch(toolbar_request) as process_request:
+                with self.assertNumQueries(0):
+                    response = self.client.get(page1_url)
+            self.assertContains(response, "Early content")
+            process_request.assert_not_called()
+
+            # Requests with a session are left to the details view
+            self.client.cookies[settings.SESSION_COOKIE_NAME] = "session"
+            with patch(toolbar_request, return_value=None) as process_request:
+                response = self.client.get(page1_url)
+            self.assertContains(response, "Early content")
+            process_request.assert_called_once()
+
+    def test_compressed_page_cache(self):
+        from django.core.cache import cache
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE_ENCODINGS": ["gzip"],
+            "CMS_PAGE_CACHE_STORE_IDENTITY": False,
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            placeholder = page1.get_placeholders("en").get(slot="body")
+            add_plugin(placeholder, "TextPlugin", "en", body="Compressed content")
+            response = self.client.get(page1_url)
+            raw_content = response.content
+
+            bodies = cache.get(_page_cache_variant_key(self.get_request(page1_url), []))[0]
+            self.assertEqual(list(bodies), ["gzip"])
+
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertEqual(gzip.decompress(response.content), raw_content)
+
+            # Clients not accepting gzip get the decompressed content
+            with self.assertNumQueries(0):
+                response = self.client.get(page1_url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertEqual(response.content, raw_content)
+
+    def test_page_cache_holes(self):
+        from django.core.cache import cache
+
+        try:
+            plugin_pool.register_plugin(NoCachePlugin)
+        except PluginAlreadyRegistered:
+            pass
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        middleware = [mw for mw in settings.MIDDLEWARE if mw not in exclude]
+        overrides = {
+            "MIDDLEWARE": ["cms.middleware.cache.PageCacheMiddleware"] + middleware,
+            "CMS_PAGE_CACHE_HOLE_TTL": 0,
+        }
+        with self.settings(**overrides):
+            page1 = create_page("test page 1", "nav_playground.html", "en")
+            page1_url = page1.get_absolute_url()
+            placeholder1 = page1.get_placeholders("en").get(slot="body")
+            placeholder2 = page1.get_placeholders("en").get(slot="right-column")
+            add_plugin(placeholder1, "NoCachePlugin", "en")
+            add_plugin(placeholder2, "TextPlugin", "en", body="Cached content")
+
+            response = self.client.get(page1_url)
+            content1 = response.content.decode("utf8")
+            self.assertIn("no-cache", response["Cache-Control"])
+            self.assertIn("Cached content", content1)
+            self.assertNotIn("cms-hole", content1)
+
+            # Only the shell of the page has been cached
+            shell = cache.get(_page_cache_variant_key(self.get_request(page1_url), []))[0]["identity"]
+            self.assertIn(b"<!--cms-hole:", shell)
+            self.assertNotIn(b"$$$", shell)
+
+            # Hits render the uncacheable placeholder only
+            with self.assertNumQueries(FuzzyInt(1, 8)):
+                response = self.client.get(page1_url)
+            content2 = response.content.decode("utf8")
+            self.assertIn("no-cache", response["Cache-Control"])
+            self.assertFalse(response.has_header("ETag"))
+            self.assertIn("Cached content", content2)
+            self.assertNotIn("cms-hole", content2)
+            self.assertEqual(content1.split("$$$")[0], content2.split("$$$")[0])
+            self.assertNotEqual(content1.split("$$$")[1], content2.split("$$$")[1])
+
+        overrides["CMS_PAGE_CACHE_HOLE_TTL"] = None
+        with self.settings(**overrides):
+            # Without hole punching, the page is not cached at all
+            invalidate_cms_page_cache()
+            self.client.get(page1_url)
+            self.assertIsNone(get_page_cache(self.get_request(page1_url)))
+        plugin_pool.unregister_plugin(NoCachePlugin)
+
+    def test_placeholder_cache_operations(self):
+        """
+        Counts the cache operations on placeholder versions and content
+        needed to render a page with several placeholders.
+        """
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE": False,
+        }
+        page1 = create_page("test page 1", "nav_playground.html", "en")
+        page1_url = page1.get_absolute_url()
+        placeholders = page1.get_placeholders("en")
+
+        for placeholder in placeholders:
+            add_plugin(placeholder, "TextPlugin", "en", body=placeholder.slot)
+
+        with self.settings(**overrides):
+            with cache_tester() as cold:
+                self.client.get(page1_url)
+
+            with cache_tester() as warm:
+                response = self.client.get(page1_url)
+
+        for placeholder in placeholders:
+            self.assertContains(response, placeholder.slot)
+
+        def placeholder_operations(tester):
+            return [
+                operation for operation, keys in tester.calls
+                if any("|placeholder_cache_version|" in key or "|render_placeholder|" in key for key in keys)
+            ]
+
+        # One batched read for the versions (the content isn't looked up
+        # without a version), then a version read and a single write for
+        # the version and the content of every placeholder.
+        self.assertEqual(
+            placeholder_operations(cold),
+            ["get_many"] + ["get", "set_many"] * len(placeholders),
+        )
+        # Two batched reads, regardless of the number of placeholders.
+        self.assertEqual(
+            placeholder_operations(warm),
+            ["get_many", "get_many"],
+        )
+
     def test_render_placeholder_cache(self):
         """
         Regression test for #4223
@@ -792,6 +1409,37 @@ class PlaceholderCacheTestCase(CMSTestCase):
         )
         self.assertNotEqual(cached_en_us_content, cached_en_uk_content)
 
+    def test_get_placeholder_caches(self):
+        from django.core.cache import cache
+
+        placeholder_right = self.page.get_placeholders("en").get(slot="right-column")
+        placeholder_empty = self.page.get_placeholders("de").get(slot="right-column")
+        en_us_renderer = self.get_content_renderer(self.en_us_request)
+        en_us_content = en_us_renderer.render_placeholder(
+            self.placeholder_en, Context({"request": self.en_us_request}), "en", width=350
+        )
+        set_placeholder_cache(self.placeholder_en, "en", 1, en_us_content, self.en_us_request)
+        set_placeholder_cache(placeholder_right, "en", 1, "right", self.en_us_request)
+        placeholders = [self.placeholder_en, placeholder_right, placeholder_empty]
+
+        with patch("cms.cache.placeholder._get_placeholder_cache_version") as get_version, \
+                patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            cached = get_placeholder_caches(placeholders, "en", 1, self.en_us_request)
+        # One round-trip for the versions, one for the content
+        get_version.assert_not_called()
+        self.assertEqual(get_many.call_count, 2)
+        self.assertEqual(cached, {self.placeholder_en.pk: en_us_content, placeholder_right.pk: "right"})
+
+        for placeholder in placeholders:
+            self.assertEqual(
+                cached.get(placeholder.pk),
+                get_placeholder_cache(placeholder, "en", 1, self.en_us_request),
+            )
+
+        # The content of the first placeholder varies on the country code
+        cached = get_placeholder_caches(placeholders, "en", 1, self.en_uk_request)
+        self.assertEqual(cached, {placeholder_right.pk: "right"})
+
     def test_set_get_placeholder_cache_with_long_prefix(self):
         """
         This is for testing that everything continues to work even when the
@@ -829,3 +1477,65 @@ class PlaceholderCacheTestCase(CMSTestCase):
                 self.placeholder_en, "en", 1, en_crazy_request
             )
             self.assertEqual(en_crazy_content, cached_en_crazy_content)
+
+
+class ConcurrentPlaceholderRenderingTestCase(BaseCMSTestCase, TransactionTestCase):
+    # Runs outside of a transaction, as the pool threads don't see its changes.
+
+    def test_concurrent_placeholder_rendering(self):
+        page1 = create_page("test page 1", "nav_playground.html", "en")
+        page1_url = page1.get_absolute_url()
+        placeholders = page1.get_placeholders("en")
+
+        try:
+            plugin_pool.register_plugin(ParallelSafePlugin)
+        except PluginAlreadyRegistered:
+            pass
+        right_plugin = add_plugin(placeholders.get(slot="right-column"), "ParallelSafePlugin", "en")
+        body_plugin = add_plugin(placeholders.get(slot="body"), "ParallelSafePlugin", "en")
+
+        exclude = [
+            "django.middleware.cache.UpdateCacheMiddleware",
+            "django.middleware.cache.FetchFromCacheMiddleware",
+        ]
+        overrides = {
+            "MIDDLEWARE": [mw for mw in settings.MIDDLEWARE if mw not in exclude],
+            "CMS_PAGE_CACHE": False,
+            "CMS_PLACEHOLDER_CACHE": False,
+        }
+        with self.settings(**overrides):
+            content1 = self.client.get(page1_url).content.decode("utf8")
+
+            with self.settings(CMS_PLACEHOLDER_RENDER_THREADS=2, CMS_RENDER_PROFILING=True):
+                response = self.client.get(page1_url)
+                content2 = response.content.decode("utf8")
+
+        right_thread = content2.split("$$$")[1].split(":")[1]
+        body_thread = content2.split("$$$")[3].split(":")[1]
+        self.assertTrue(right_thread.startswith("cms-placeholder"))
+        self.assertTrue(body_thread.startswith("cms-placeholder"))
+        # Output and sekizai data keep their order
+        self.assertLess(content2.index("alert('%s:" % right_plugin.pk), content2.index("alert('%s:" % body_plugin.pk))
+        main_thread = content1.split("$$$")[1].split(":")[1]
+        expected = content1.replace(
+            "%s:%s" % (right_plugin.pk, main_thread), "%s:%s" % (right_plugin.pk, right_thread),
+        ).replace(
+            "%s:%s" % (body_plugin.pk, main_thread), "%s:%s" % (body_plugin.pk, body_thread),
+        )
+        self.assertEqual(content2, expected)
+        # The plugins rendered in the pool are merged into the render profile of the request
+        timings = response.wsgi_request._cms_render_profile.get_totals("plugin")
+        self.assertIn(("ParallelSafePlugin", 2), [timing[:2] for timing in timings])
+
+        plugin_pool.unregister_plugin(ParallelSafePlugin)
+
+    def test_placeholder_render_executor(self):
+        executor = _get_placeholder_render_executor(2)
+        self.assertIs(_get_placeholder_render_executor(2), executor)
+
+        # Changing the number of threads replaces the pool
+        new_executor = _get_placeholder_render_executor(3)
+        self.assertIsNot(new_executor, executor)
+        self.assertEqual(new_executor._max_workers, 3)
+        self.assertTrue(executor._shutdown)
+        self.assertIs(_get_placeholder_render_executor(3), new_executor)
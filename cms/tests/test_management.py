@@ -14,6 +14,7 @@ from cms.management.commands.subcommands.list import plugin_report
 from cms.models import Page, StaticPlaceholder
 from cms.models.placeholdermodel import Placeholder
 from cms.models.pluginmodel import CMSPlugin
+from cms.sitemaps import CMSSitemap
 from cms.test_utils.fixtures.navextenders import NavextendersFixture
 from cms.test_utils.project.sampleapp.cms_apps import SampleApp
 from cms.test_utils.testcases import CMSTestCase
@@ -35,6 +36,12 @@ if settings.AUTH_USER_MODEL == "customuserapp.User":
     TEST_INSTALLED_APPS.append("cms.test_utils.project.customuserapp")
 
 
+class ListSitemap(CMSSitemap):
+
+    def items(self):
+        return list(super().items())
+
+
 class ManagementTestCase(CMSTestCase):
     @override_settings(INSTALLED_APPS=TEST_INSTALLED_APPS)
     def test_list_apphooks(self):
@@ -303,6 +310,44 @@ class ManagementTestCase(CMSTestCase):
         self.assertEqual(out.getvalue(), "1 'TextPlugin' plugins uninstalled\n")
         self.assertEqual(CMSPlugin.objects.filter(plugin_type=PLUGIN).count(), 0)
 
+    def test_warmup(self):
+        root = create_page("home", "nav_playground.html", "en")
+        create_page("child", "nav_playground.html", "en", parent=root)
+        create_page("grandchild", "nav_playground.html", "en", parent=root.get_child_pages()[0])
+
+        out = StringIO()
+        management.call_command("cms", "warmup", host="testserver", verbosity=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith("200 "))
+        self.assertTrue(lines[0].endswith(" /en/home/"))
+        self.assertTrue(lines[3].startswith("Warmed up 3 page(s)"))
+
+        out = StringIO()
+        management.call_command("cms", "warmup", host="testserver", incremental=True, stdout=out)
+        self.assertTrue(out.getvalue().startswith("Warmed up 0 page(s)"))
+
+        root.clear_cache()
+        out = StringIO()
+        management.call_command("cms", "warmup", host="testserver", incremental=True, verbosity=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith(" /en/home/"))
+
+        out = StringIO()
+        management.call_command("cms", "warmup", host="testserver", depth=2, languages=["en"], stdout=out)
+        self.assertTrue(out.getvalue().startswith("Warmed up 2 page(s)"))
+
+        out = StringIO()
+        management.call_command(
+            "cms", "warmup", host="testserver", depth=2, languages=["en"],
+            sitemap="cms.tests.test_management.ListSitemap", stdout=out,
+        )
+        self.assertTrue(out.getvalue().startswith("Warmed up 2 page(s)"))
+
+        with self.assertRaises(CommandError):
+            management.call_command("cms", "warmup", languages=["xx"], stdout=StringIO())
+
 
 class PageFixtureManagementTestCase(NavextendersFixture, CMSTestCase):
 
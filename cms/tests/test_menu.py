@@ -1,8 +1,11 @@
 import copy
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser, Group, Permission
 from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
 from django.template import Template, TemplateSyntaxError
 from django.template.context import Context
 from django.test.utils import override_settings
@@ -10,8 +13,8 @@ from django.utils.translation import activate, override as force_language
 
 from cms.api import create_page, create_page_content
 from cms.apphook_pool import apphook_pool
-from cms.cms_menus import get_visible_nodes
-from cms.models import ACCESS_PAGE_AND_DESCENDANTS, Page
+from cms.cms_menus import CMSMenu, SoftRootCutter, get_visible_nodes
+from cms.models import ACCESS_CHOICES, ACCESS_PAGE_AND_DESCENDANTS, Page
 from cms.models.permissionmodels import GlobalPagePermission, PagePermission
 from cms.test_utils.fixtures.menus import (
     ExtendedMenusFixture,
@@ -33,10 +36,13 @@ from cms.test_utils.testcases import CMSTestCase
 from cms.test_utils.util.context_managers import LanguageOverride, apphooks
 from cms.test_utils.util.mock import AttributeObject
 from cms.utils import get_current_site
+from cms.utils.compat.warnings import RemovedInDjangoCMS43Warning
 from cms.utils.conf import get_cms_setting
-from menus.base import NavigationNode
+from menus.base import Menu, NavigationNode, NodeIndex
+from menus.cache import get_menu_cache
 from menus.menu_pool import _build_nodes_inner_for_one_menu, menu_pool
 from menus.models import CacheKey
+from menus.modifiers import Level, Marker
 from menus.utils import cut_levels, find_selected, mark_descendants
 
 
@@ -216,6 +222,29 @@ class ExtendedFixturesMenuTests(ExtendedMenusFixture, BaseMenuTest):
     def get_all_pages(self):
         return Page.objects.all()
 
+    def test_menu_cache_update_builds_other_menus(self):
+        """
+        The other menus of the site are built again when a page changes,
+        the CMSMenu is updated.
+        """
+        class OtherMenu(Menu):
+            def get_nodes(self, request):
+                return [NavigationNode('Other', '/other/', 1)]
+
+        menu_pool.menus['OtherMenu'] = OtherMenu
+        renderer = menu_pool.get_renderer(self.get_request('/'))
+        renderer._build_nodes()
+        self.get_page(3).clear_cache(menu=True)
+        changed_nodes = [NavigationNode('Changed', '/changed/', 1)]
+
+        with patch.object(OtherMenu, 'get_nodes', return_value=changed_nodes) as get_nodes, \
+                patch.object(CMSMenu, 'get_nodes') as get_cms_nodes:
+            nodes = renderer._build_nodes()
+        get_nodes.assert_called_once()
+        get_cms_nodes.assert_not_called()
+        self.assertEqual({node.namespace for node in nodes[:-1]}, {'CMSMenu'})
+        self.assertEqual((nodes[-1].namespace, nodes[-1].title), ('OtherMenu', 'Changed'))
+
     def test_menu_failfast_on_invalid_usage(self):
         context = self.get_context()
         context['child'] = self.get_page(1)
@@ -272,6 +301,111 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
     def get_all_pages(self):
         return Page.objects.all()
 
+    def _get_cached_menu(self, renderer):
+        nodes, changes, versions = get_menu_cache(renderer.cache_key, renderer.site.pk, renderer.request_language)
+        return nodes, changes
+
+    def _get_menu_tree(self, nodes):
+        return [
+            (node.id, node.title, node.url, node.visible, node.parent_id, [child.id for child in node.children])
+            for node in nodes
+        ]
+
+    def test_menu_cache_updated_with_page_changes(self):
+        """
+        The cached menus are updated with the changed pages
+        instead of being built again.
+        """
+        def assert_menu_updated():
+            renderer = menu_pool.get_renderer(self.get_request('/'))
+            self.assertNotEqual(self._get_cached_menu(renderer)[1], [])
+            nodes = renderer._build_nodes()
+            self.assertEqual(self._get_cached_menu(renderer)[1], [])
+            menu_pool.clear(all=True)
+            renderer = menu_pool.get_renderer(self.get_request('/'))
+            self.assertEqual(self._get_menu_tree(nodes), self._get_menu_tree(renderer._build_nodes()))
+            return nodes
+
+        menu_pool.get_renderer(self.get_request('/'))._build_nodes()
+
+        # Title change
+        page = self.get_page(2)
+        page.get_content_obj('en').update(menu_title='Second')
+        page.clear_cache(menu=True)
+        nodes = assert_menu_updated()
+        self.assertIn('Second', [node.title for node in nodes])
+
+        # Hidden page
+        self.get_page(5).get_content_obj('en').toggle_in_navigation(False)
+        assert_menu_updated()
+
+        # Move of a page with descendants
+        self.get_page(4).move_page(self.get_page(2).node, position='last-child')
+        nodes = assert_menu_updated()
+        self.assertEqual([node.title for node in nodes[0].get_descendants()], ['Second', 'P3', 'P4', 'P5'])
+
+        # Added and deleted pages
+        added = create_page('P9', 'nav_playground.html', 'en', parent=self.get_page(4), in_navigation=True)
+        added.clear_cache(menu=True)
+        assert_menu_updated()
+        self.get_page(3).delete()
+        nodes = assert_menu_updated()
+        self.assertEqual([node.title for node in nodes[0].get_descendants()], ['Second', 'P4', 'P5', 'P9'])
+
+        # Move to the left of a sibling, whose path changes as well
+        self.get_page(9).move_page(self.get_page(5).node, position='left')
+        nodes = assert_menu_updated()
+        self.assertEqual([node.title for node in nodes[0].get_descendants()], ['Second', 'P4', 'P9', 'P5'])
+
+    def test_menu_cache_flat_form(self):
+        """
+        The nodes are cached without references to other nodes
+        and are built again with all their attributes.
+        """
+        from menus.cache import _dump_nodes, _load_nodes
+
+        nodes = menu_pool.get_renderer(self.get_request('/'))._build_nodes()
+        nodes[1].selected = True
+        nodes[1].custom = 'custom'
+        dumped_nodes = _dump_nodes(nodes)
+
+        for dumped_node in dumped_nodes:
+            self.assertFalse(any(isinstance(value, NavigationNode) for value in dumped_node))
+
+        loaded_nodes = _load_nodes(dumped_nodes)
+        self.assertEqual(self._get_menu_tree(loaded_nodes), self._get_menu_tree(nodes))
+        self.assertEqual(
+            [(node.path, node.language, node.attr, node.selected) for node in loaded_nodes],
+            [(node.path, node.language, node.attr, node.selected) for node in nodes],
+        )
+        self.assertEqual(loaded_nodes[1].custom, 'custom')
+        self.assertEqual(loaded_nodes[1].get_ancestors(), [loaded_nodes[0]])
+
+    def test_menu_cache_update_queries(self):
+        """
+        Updating a cached menu only loads the changed pages and their ancestors.
+        """
+        renderer = menu_pool.get_renderer(self.get_request('/'))
+        renderer._build_nodes()
+        self.get_page(3).clear_cache(menu=True)
+
+        with patch('cms.cms_menus.prefetch_related_objects', wraps=prefetch_related_objects) as prefetch:
+            renderer._build_nodes()
+        pages = prefetch.call_args[0][0]
+        self.assertEqual([page.get_title() for page in pages], ['P1', 'P2', 'P3'])
+
+    def test_menu_cache_updated_with_homepage(self):
+        """
+        The menus are built again when the homepage changes.
+        """
+        renderer = menu_pool.get_renderer(self.get_request('/'))
+        renderer._build_nodes()
+        self.get_page(1).clear_cache(menu=True)
+
+        with patch.object(CMSMenu, 'get_nodes', return_value=[]) as get_nodes:
+            self.assertEqual(renderer._build_nodes(), [])
+        get_nodes.assert_called_once()
+
     def test_menu_failfast_on_invalid_usage(self):
         context = self.get_context()
         context['child'] = self.get_page(1)
@@ -302,24 +436,27 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
 
     def test_show_page_in_menu_after_move_page(self):
         """
-        Test checks if the menu cache is cleaned after move page.
+        Test checks if the menu cache is updated after move page.
         """
         page = create_page('page to move', 'nav_playground.html', 'en')
+        superuser = self.get_superuser()
+        # Logging in clears the menu caches
+        self.client.force_login(superuser)
 
         request = self.get_request('/')
         renderer = menu_pool.get_renderer(request)
         renderer.draft_mode_active = True
         nodes_before = renderer.get_nodes()
         index_before = [i for i, s in enumerate(nodes_before) if s.title == page.get_title()]
-        self.assertEqual(CacheKey.objects.count(), 1)
+        self.assertEqual(self._get_cached_menu(renderer)[1], [])
 
-        with self.login_user_context(self.get_superuser()):
-            # Moves the page to the second position in the tree
-            data = {'id': page.pk, 'position': 1}
-            endpoint = self.get_admin_url(Page, 'move_page', page.pk)
-            response = self.client.post(endpoint, data)
-            self.assertEqual(response.status_code, 200)
-            self.assertEqual(CacheKey.objects.count(), 0)
+        # Moves the page to the second position in the tree
+        data = {'id': page.pk, 'position': 1}
+        endpoint = self.get_admin_url(Page, 'move_page', page.pk)
+        response = self.client.post(endpoint, data)
+        self.assertEqual(response.status_code, 200)
+        # The cached menu is updated with the moved page
+        self.assertEqual(self._get_cached_menu(renderer)[1], [('CMSMenu', [page.pk], True)])
 
         request = self.get_request('/')
         renderer = menu_pool.get_renderer(request)
@@ -327,7 +464,7 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
         nodes_after = renderer.get_nodes()
         index_after = [i for i, s in enumerate(nodes_after) if s.title == page.get_title()]
 
-        self.assertEqual(CacheKey.objects.count(), 1)
+        self.assertEqual(self._get_cached_menu(renderer)[1], [])
         self.assertNotEqual(
             index_before,
             index_after,
@@ -420,15 +557,13 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
     def test_show_menu_num_queries(self):
         context = self.get_context()
         # test standard show_menu
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(4):
             """
             The queries should be:
                 get all page nodes
                 get all page permissions
                 get all page contents
                 get all page urls
-                get the menu cache key
-                set the menu cache key
             """
             tpl = Template("{% load menu_tags %}{% show_menu %}")
             tpl.render(context)
@@ -436,61 +571,76 @@ class FixturesMenuTests(MenusFixture, BaseMenuTest):
     def test_show_menu_cache_key_leak(self):
         context = self.get_context()
         tpl = Template("{% load menu_tags %}{% show_menu %}")
-        self.assertEqual(CacheKey.objects.count(), 0)
-        tpl.render(context)
-        self.assertEqual(CacheKey.objects.count(), 1)
         tpl.render(context)
-        self.assertEqual(CacheKey.objects.count(), 1)
+        # The menu cache doesn't use the database
+        self.assertEqual(CacheKey.objects.count(), 0)
 
-    def test_menu_cache_respects_database_keys(self):
+        with self.assertNumQueries(0):
+            tpl.render(context)
+
+    def test_menu_renderer_is_cached_deprecated(self):
+        renderer = menu_pool.get_renderer(self.get_request('/'))
+        message = (
+            "MenuRenderer.is_cached is deprecated, the menu cache no longer uses "
+            "the CacheKey table. Use menus.cache.get_menu_cache() instead."
+        )
+        self.assertFalse(self.assertWarns(RemovedInDjangoCMS43Warning, message, getattr, renderer, 'is_cached'))
+        renderer._build_nodes()
+        self.assertTrue(self.assertWarns(RemovedInDjangoCMS43Warning, message, getattr, renderer, 'is_cached'))
+        self.assertWarns(
+            RemovedInDjangoCMS43Warning,
+            "The CacheKey model is deprecated and will be removed in django CMS 4.3, "
+            "the menu cache no longer uses it.",
+            CacheKey.objects.get_keys,
+        )
+
+    def test_menu_cache_respects_versions(self):
         cms_page = self.get_page(1)
         context = self.get_context(path=cms_page.get_absolute_url(), page=cms_page)
         context['request'].session['cms_edit'] = False
 
         # Prime the cache
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(4):
             # The queries should be:
             #     get all page nodes
             #     get all page permissions
             #     get all titles
             #     get all page urls
-            #     get the menu cache key
-            #     set the menu cache key
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-        # One new CacheKey should have been created
-        self.assertEqual(CacheKey.objects.count(), 1)
-
-        # Because its cached, only one query is made to the db
-        with self.assertNumQueries(1):
-            # The queries should be:
-            #     get the menu cache key
+        # Because its cached, no query is made to the db
+        with self.assertNumQueries(0):
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-        # Delete the current cache key but don't touch the cache
-        CacheKey.objects.all().delete()
+        # Invalidate the menus of another language and of another site
+        menu_pool.clear(site_id=1, language='fr')
+        menu_pool.clear(site_id=2)
 
-        # The menu should be recalculated
-        with self.assertNumQueries(6):
-            # The queries should be:
-            #     check if cache key exists
-            #     get all page nodes
-            #     get all page permissions
-            #     get all title objects
-            #     get all page url objects
-            #     set the menu cache key
+        with self.assertNumQueries(0):
             Template("{% load menu_tags %}{% show_menu %}").render(context)
 
-    def test_menu_keys_duplicate_clear(self):
+        for kwargs in ({'site_id': 1, 'language': 'en'}, {'site_id': 1}, {'language': 'en'}, {'all': True}):
+            menu_pool.clear(**kwargs)
+
+            # The menu should be recalculated
+            with self.assertNumQueries(4):
+                Template("{% load menu_tags %}{% show_menu %}").render(context)
+
+    def test_menu_cache_evicted_version(self):
         """
-        Tests that the menu clears all keys, including duplicates.
+        Menus aren't read from the cache if one of their versions is missing.
         """
-        CacheKey.objects.create(language="fr", site=1, key="a")
-        CacheKey.objects.create(language="fr", site=1, key="a")
+        from menus.cache import _get_menu_cache_version_key
 
-        self.assertEqual(CacheKey.objects.count(), 2)
-        menu_pool.clear(site_id=1, language='fr')
-        self.assertEqual(CacheKey.objects.count(), 0)
+        context = self.get_context()
+        Template("{% load menu_tags %}{% show_menu %}").render(context)
+        cache.delete(_get_menu_cache_version_key(1, 'en'))
+
+        with self.assertNumQueries(4):
+            Template("{% load menu_tags %}{% show_menu %}").render(context)
+
+        with self.assertNumQueries(0):
+            Template("{% load menu_tags %}{% show_menu %}").render(context)
 
     def test_only_active_tree(self):
         context = self.get_context(page=self.get_page(1))
@@ -920,6 +1070,112 @@ class MenuTests(BaseMenuTest):
         tree_nodes, flat_nodes = self._get_nodes()
         self.assertEqual(cut_levels(tree_nodes, 1), [flat_nodes[1]])
 
+    def test_apply_modifiers_marks_nodes(self):
+        with patch.object(NavigationNode, 'is_selected') as is_selected:
+            tree_nodes, flat_nodes = self._get_nodes('/2/')
+        node1, node2, node3, node4, node5 = flat_nodes
+        # The nodes are looked up by their url.
+        is_selected.assert_not_called()
+        self.assertEqual([node.selected for node in flat_nodes], [False, True, False, False, False])
+        self.assertEqual([node.ancestor for node in flat_nodes], [True, False, False, False, False])
+        self.assertEqual([node.descendant for node in flat_nodes], [False, False, True, True, False])
+        self.assertEqual([node.level for node in flat_nodes], [0, 1, 2, 2, 0])
+        self.assertEqual([node.is_leaf_node for node in flat_nodes], [False, False, True, True, True])
+
+    def test_apply_modifiers_is_selected_override(self):
+        class SelectedNode(NavigationNode):
+            def is_selected(self, request):
+                return self.id == 3
+
+        nodes = _build_nodes_inner_for_one_menu([
+            NavigationNode('1', '/1/', 1),
+            SelectedNode('2', '/2/', 2, 1),
+            SelectedNode('3', '/3/', 3, 1),
+            NavigationNode('4', '/4/', 4),
+        ], "test")
+        renderer = menu_pool.get_renderer(self.get_request('/4/'))
+        renderer.apply_modifiers(nodes)
+        self.assertEqual([node.selected for node in nodes], [False, False, True, True])
+        self.assertEqual([node.sibling for node in nodes], [True, True, False, False])
+
+    def test_node_index(self):
+        tree_nodes, flat_nodes = self._get_nodes('/3/')
+        node1, node2, node3, node4, node5 = flat_nodes
+        index = NodeIndex(flat_nodes)
+        self.assertEqual(index.roots, [node1, node5])
+        self.assertEqual(index.selected, [node3])
+        # The nodes are indexed again when they're updated.
+        node2.parent = None
+        index.update([node2, node3, node4])
+        self.assertEqual(index.roots, [node2])
+        index.select(self.get_request('/4/'))
+        self.assertEqual(index.selected, [node4])
+        self.assertFalse(node3.selected)
+        self.assertEqual(node1.get_descendants(), [node2, node3, node4])
+
+    def test_soft_root_child_of_other_root(self):
+        """
+        The descendants of a soft root which is a child of another root
+        node are cut from the menu.
+        """
+        nodes = _build_nodes_inner_for_one_menu([
+            NavigationNode('A', '/a/', 1),
+            NavigationNode('A1', '/a1/', 2, 1),
+            NavigationNode('B', '/b/', 3),
+            NavigationNode('B1', '/b1/', 4, 3, attr={'soft_root': True}),
+            NavigationNode('B1a', '/b1a/', 5, 4),
+        ], "test")
+        request = self.get_request('/a1/')
+        renderer = menu_pool.get_renderer(request)
+        renderer._mark_selected(nodes)
+        nodes = SoftRootCutter(renderer).modify(request, nodes, None, None, False, False)
+        self.assertEqual([node.title for node in nodes], ['A', 'A1', 'B', 'B1'])
+        self.assertEqual(nodes[3].children, [])
+
+    def test_deprecated_modifier_methods(self):
+        def get_nodes():
+            return _build_nodes_inner_for_one_menu([
+                NavigationNode('A', '/a/', 1),
+                NavigationNode('A1', '/a1/', 2, 1, attr={'soft_root': True}),
+                NavigationNode('A1a', '/a1a/', 3, 2),
+                NavigationNode('A1a1', '/a1a1/', 4, 3),
+            ], "test")
+
+        renderer = menu_pool.get_renderer(self.get_request('/'))
+        nodes = get_nodes()
+        self.assertWarns(
+            RemovedInDjangoCMS43Warning,
+            "Marker.mark_descendants() is deprecated and will be removed in django CMS 4.3.",
+            Marker(renderer).mark_descendants, nodes[1:2],
+        )
+        self.assertEqual([node.descendant for node in nodes], [False, True, True, True])
+
+        nodes[0].level = 0
+        self.assertWarns(
+            RemovedInDjangoCMS43Warning,
+            "Level.mark_levels() is deprecated and will be removed in django CMS 4.3.",
+            Level(renderer).mark_levels, nodes[0], False,
+        )
+        self.assertEqual([node.level for node in nodes], [0, 1, 2, 3])
+
+        cutter = SoftRootCutter(renderer)
+        self.assertWarns(
+            RemovedInDjangoCMS43Warning,
+            "SoftRootCutter.find_and_remove_children() is deprecated and will be removed in django CMS 4.3, "
+            "use remove_soft_root_children() instead.",
+            cutter.find_and_remove_children, nodes[0], nodes,
+        )
+        self.assertEqual([node.title for node in nodes], ['A', 'A1'])
+
+        nodes = get_nodes()
+        self.assertWarns(
+            RemovedInDjangoCMS43Warning,
+            "SoftRootCutter.remove_children() is deprecated and will be removed in django CMS 4.3.",
+            cutter.remove_children, nodes[1], nodes,
+        )
+        self.assertEqual([node.title for node in nodes], ['A', 'A1'])
+        self.assertEqual(nodes[1].children, [])
+
     def test_empty_menu(self):
         context = self.get_context()
         tpl = Template("{% load menu_tags %}{% show_menu 0 100 100 100 %}")
@@ -1293,15 +1549,13 @@ class ShowSubMenuCheck(SubMenusFixture, BaseMenuTest):
         context = self.get_context(page.get_absolute_url(), page=page)
 
         # test standard show_menu
-        with self.assertNumQueries(6):
+        with self.assertNumQueries(4):
             """
             The queries should be:
                 get all page nodes
                 get all page permissions
                 get all titles
                 get all page urls
-                get the menu cache key
-                set the menu cache key
             """
             tpl = Template("{% load menu_tags %}{% show_sub_menu %}")
             tpl.render(context)
@@ -1460,15 +1714,13 @@ class ShowMenuBelowIdTests(BaseMenuTest):
 
         with LanguageOverride('en'):
             context = self.get_context(a.get_absolute_url())
-            with self.assertNumQueries(6):
+            with self.assertNumQueries(4):
                 """
                 The queries should be:
                     get all page nodes
                     get all page permissions
                     get all titles
                     get all page urls
-                    get the menu cache key
-                    set the menu cache key
                 """
                 # Actually seems to run:
                 tpl = Template("{% load menu_tags %}{% show_menu_below_id 'a' 0 100 100 100 %}")
@@ -1717,6 +1969,76 @@ class PublicViewPermissionMenuTests(CMSTestCase):
         )
         self.assertSequenceEqual(sorted(pages), ['a', 'b1', 'c1', 'c2'])
 
+    def test_restriction_scopes(self):
+        """
+        Every scope of a view restriction applies to the same pages
+        as PermissionTuple.contains().
+        """
+        group = Group.objects.create(name='members')
+        pages = Page.objects.filter(pk__in=[page.pk for page in self.pages]).select_related('node')
+
+        for grant_on, _label in ACCESS_CHOICES:
+            for page in self.pages[:2] + self.pages[4:5]:
+                with self.subTest(grant_on=grant_on, page=page):
+                    restriction = PagePermission.objects.create(page=page, group=group, can_view=True,
+                                                                grant_on=grant_on)
+                    permissions = PagePermission.objects.filter(can_view=True).select_related('page__node')
+                    expected = []
+
+                    for candidate in pages:
+                        containing = [
+                            perm for perm in permissions
+                            if perm.get_page_permission_tuple().contains(candidate.node.path)
+                        ]
+                        if not containing or any(perm.user_id == self.user.pk for perm in containing):
+                            expected.append(candidate.pk)
+                    visible = [page.pk for page in get_visible_nodes(self.request, pages, self.site)]
+                    self.assertEqual(visible, expected)
+                    restriction.delete()
+
+    def _get_renderer(self, user):
+        request = self.get_request('/')
+        request.user = user
+        return menu_pool.get_renderer(request)
+
+    def test_menu_cache_shared_by_visibility(self):
+        """
+        Users who can view the same pages share their cached menu.
+        """
+        group = Group.objects.create(name='members')
+        PagePermission.objects.create(page=self.pages[1], group=group, can_view=True,
+                                      grant_on=ACCESS_PAGE_AND_DESCENDANTS)
+        member = self._create_user("member", is_staff=False, is_superuser=False)
+        member.groups.add(group)
+        user_renderer = self._get_renderer(self.user)
+        member_renderer = self._get_renderer(member)
+
+        self.assertEqual(member_renderer.cache_key, user_renderer.cache_key)
+        self.assertNotEqual(self._get_renderer(self.other).cache_key, user_renderer.cache_key)
+
+        nodes = user_renderer.get_nodes()
+
+        with self.assertNumQueries(0):
+            member_nodes = member_renderer.get_nodes()
+        self.assertEqual([node.title for node in member_nodes], [node.title for node in nodes])
+        self.assertEqual([node.title for node in nodes], ['a', 'b1', 'c1', 'c2'])
+
+    def test_menu_cache_user_specific(self):
+        """
+        Menus are cached per user if a menu depends on the user.
+        """
+        member = self._create_user("member", is_staff=False, is_superuser=False)
+        PagePermission.objects.create(page=self.pages[1], user=member, can_view=True,
+                                      grant_on=ACCESS_PAGE_AND_DESCENDANTS)
+        user_renderer = self._get_renderer(self.user)
+        member_renderer = self._get_renderer(member)
+
+        self.assertEqual(member_renderer.cache_key, user_renderer.cache_key)
+
+        for renderer in (user_renderer, member_renderer):
+            renderer.menus['UserMenu'] = type('UserMenu', (StaticMenu,), {'user_specific': True})
+        self.assertNotEqual(member_renderer.cache_key, user_renderer.cache_key)
+
 
 @override_settings(CMS_PERMISSION=False)
 class SoftrootTests(CMSTestCase):
@@ -1,3 +1,9 @@
+import os
+from copy import deepcopy
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
@@ -5,6 +11,7 @@ from django.template import Template, TemplateSyntaxError
 from django.template.loader import get_template
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils.autoreload import file_changed
 from django.utils.encoding import force_str
 from django.utils.numberformat import format
 from sekizai.context import SekizaiContext
@@ -116,6 +123,64 @@ class PlaceholderTestCase(TransactionCMSTestCase):
         )
         self.assertEqual(sorted(placeholders), sorted(['one']))
 
+    def test_placeholder_registry_cached_loader(self):
+        templates = deepcopy(settings.TEMPLATES)
+        templates[0]['OPTIONS']['loaders'] = [
+            ('django.template.loaders.cached.Loader', templates[0]['OPTIONS']['loaders']),
+        ]
+
+        with self.settings(TEMPLATES=templates):
+            self.assertEqual(_get_placeholder_slots('placeholder_tests/test_one.html'), ['new_one', 'two', 'three'])
+            self.assertWarns(
+                DuplicatePlaceholderWarning,
+                'Duplicate {% placeholder "one" %} in template placeholder_tests/test_seven.html.',
+                _get_placeholder_slots, 'placeholder_tests/test_seven.html'
+            )
+
+            with patch('cms.utils.placeholder._scan_placeholders') as scan, \
+                    patch('cms.utils.placeholder.get_template') as get_template_mock:
+                placeholders = _get_placeholder_slots('placeholder_tests/test_one.html')
+                self.assertEqual(placeholders, ['new_one', 'two', 'three'])
+                # The duplicates are still reported
+                self.assertWarns(
+                    DuplicatePlaceholderWarning,
+                    'Duplicate {% placeholder "one" %} in template placeholder_tests/test_seven.html.',
+                    _get_placeholder_slots, 'placeholder_tests/test_seven.html'
+                )
+                self.assertFalse(scan.called)
+                self.assertFalse(get_template_mock.called)
+
+            # Changing a template file resets the registry
+            template_path = get_template('placeholder_tests/test_one.html').origin.name
+            file_changed.send(sender=None, file_path=Path(template_path))
+
+            with patch('cms.utils.placeholder._scan_placeholders', return_value=[]) as scan:
+                self.assertEqual(_get_placeholder_slots('placeholder_tests/test_one.html'), [])
+                self.assertTrue(scan.called)
+
+    def test_placeholder_registry_debug(self):
+        with TemporaryDirectory() as template_dir:
+            template_path = os.path.join(template_dir, 'registry.html')
+            templates = deepcopy(settings.TEMPLATES)
+            templates[0]['DIRS'] = [template_dir]
+
+            with open(template_path, 'w') as template_file:
+                template_file.write('{% load cms_tags %}{% placeholder "one" %}')
+
+            with self.settings(TEMPLATES=templates, DEBUG=True):
+                self.assertEqual(_get_placeholder_slots('registry.html'), ['one'])
+
+                with patch('cms.utils.placeholder.get_template') as get_template_mock:
+                    self.assertEqual(_get_placeholder_slots('registry.html'), ['one'])
+                    self.assertFalse(get_template_mock.called)
+
+                with open(template_path, 'w') as template_file:
+                    template_file.write('{% load cms_tags %}{% placeholder "one" %}{% placeholder "two" %}')
+                mtime = os.path.getmtime(template_path) + 10
+                os.utime(template_path, (mtime, mtime))
+
+                self.assertEqual(_get_placeholder_slots('registry.html'), ['one', 'two'])
+
     def test_placeholder_scanning_extend_outside_block(self):
         placeholders = _get_placeholder_slots('placeholder_tests/outside.html')
         self.assertEqual(sorted(placeholders), sorted(['new_one', 'two', 'base_outside']))
@@ -1013,17 +1078,19 @@ class PlaceholderTestCase(TransactionCMSTestCase):
 
         poll = FancyPoll.objects.create(name='poll 1')
 
-        # Go to the poll for the first time
+        # Go to the poll for the first time, the placeholders
+        # are only created in edit mode.
         response = self.client.get(poll.get_absolute_url())
         placeholders = Placeholder.objects.get_for_obj(poll)
-        self.assertEqual(placeholders.count(), 2)
+        self.assertEqual(placeholders.count(), 0)
 
         # Now go to edit mode
         with self.login_user_context(self.get_superuser()):
             response = self.client.get(get_object_edit_url(poll))
 
+        # FancyPoll isn't rendered by the edit endpoint
         placeholders = Placeholder.objects.get_for_obj(poll)
-        self.assertEqual(placeholders.count(), 2)
+        self.assertEqual(placeholders.count(), 0)
 
         # Now go to structure mode
         with self.login_user_context(self.get_superuser()):
@@ -2,6 +2,7 @@ import datetime
 import pickle
 import warnings
 from contextlib import contextmanager
+from unittest.mock import patch
 
 from django import http
 from django.conf import settings
@@ -52,7 +53,11 @@ from cms.test_utils.project.pluginapp.plugins.validation.cms_plugins import (
 from cms.test_utils.testcases import CMSTestCase
 from cms.toolbar.toolbar import CMSToolbar
 from cms.toolbar.utils import get_object_edit_url
-from cms.utils.plugins import copy_plugins_to_placeholder, get_plugins
+from cms.utils.plugins import (
+    copy_plugins_to_placeholder,
+    downcast_plugins,
+    get_plugins,
+)
 
 
 @contextmanager
@@ -917,6 +922,45 @@ class PluginsTestCase(PluginsTestBaseCase):
             name = "Test Plugin"
         self.assertIsNotNone(DecoratorTestPlugin)
 
+    def test_downcast_plugins_queries(self):
+        from cms.test_utils.project.mti_pluginapp.models import (
+            TestPluginBetaModel,
+        )
+        from cms.test_utils.project.pluginapp.plugins.style.models import Style
+
+        placeholder = self.get_placeholder()
+        api.add_plugin(placeholder, 'TextPlugin', 'en', body='Text')
+        api.add_plugin(placeholder, 'LinkPlugin', 'en', name='Link', external_link='https://www.django-cms.org')
+        api.add_plugin(placeholder, 'StylePlugin', 'en', tag_type='section')
+        api.add_plugin(placeholder, 'NoCustomModel', 'en')
+        api.add_plugin(placeholder, 'TestPluginBeta', 'en', alpha='ALPHA', beta='BETA')
+        plugins = list(placeholder.get_plugins('en'))
+
+        # The models inheriting CMSPlugin are loaded by one query,
+        # the model inheriting TestPluginAlphaModel by another one.
+        with self.assertNumQueries(2):
+            downcasted = list(downcast_plugins(plugins))
+
+        self.assertEqual([plugin.pk for plugin in downcasted], [plugin.pk for plugin in plugins])
+        text, link, style, no_model, beta = downcasted
+        self.assertIsInstance(text, Text)
+        self.assertEqual(text.body, 'Text')
+        self.assertEqual(link.name, 'Link')
+        self.assertIsInstance(style, Style)
+        self.assertEqual(style.tag_type, 'section')
+        self.assertEqual(style.placeholder_id, placeholder.pk)
+        self.assertIs(type(no_model), CMSPlugin)
+        self.assertIsInstance(beta, TestPluginBetaModel)
+        self.assertEqual((beta.alpha, beta.beta), ('ALPHA', 'BETA'))
+
+        with self.assertNumQueries(2):
+            downcasted = list(downcast_plugins(plugins, select_placeholder=True))
+            self.assertEqual([plugin.placeholder for plugin in downcasted], [placeholder] * 5)
+
+        # One query per joined model, and one for TestPluginBetaModel
+        with patch('cms.utils.plugins.DOWNCAST_JOIN_SIZE', 1), self.assertNumQueries(4):
+            self.assertEqual(len(list(downcast_plugins(plugins))), 5)
+
 
 class PluginManyToManyTestCase(PluginsTestBaseCase):
     def setUp(self):
@@ -19,6 +19,7 @@ from cms.views import details
 TEMPLATE_NAME = 'tests/rendering/base.html'
 INHERIT_TEMPLATE_NAME = 'tests/rendering/inherit.html'
 INHERIT_WITH_OR_TEMPLATE_NAME = 'tests/rendering/inherit_with_or.html'
+STREAMING_TEMPLATE_NAME = 'tests/streaming/page.html'
 
 
 def sample_plugin_processor(instance, placeholder, rendered_content, original_context):
@@ -295,6 +296,36 @@ class RenderingTestCase(CMSTestCase):
         r = self.strip_rendered(response.content.decode('utf8'))
         self.assertEqual(r, '|' + self.test_data['text_main'] + '|' + self.test_data['text_sub'] + '|')
 
+    @override_settings(
+        CMS_TEMPLATES=[(STREAMING_TEMPLATE_NAME, ''), ('nav_playground.html', '')],
+        CMS_PAGE_CACHE=False,
+        CMS_PAGE_STREAMING=True,
+    )
+    def test_streaming_page(self):
+        page = create_page('streaming', STREAMING_TEMPLATE_NAME, 'en')
+        placeholders = page.get_placeholders('en')
+        add_plugin(placeholders.get(slot='first'), 'TextPlugin', 'en', body='first-content')
+        add_plugin(placeholders.get(slot='second'), 'TextPlugin', 'en', body='second-content')
+
+        response = self.client.get(page.get_absolute_url())
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode('utf8') for chunk in response.streaming_content]
+        # The head is sent before the placeholders are rendered
+        self.assertEqual(len(chunks), 3)
+        self.assertIn('<title>streaming</title>', chunks[0])
+        self.assertNotIn('first-content', chunks[0])
+        self.assertIn('first-content', chunks[1])
+        self.assertIn('second-content', chunks[2])
+
+        with self.settings(CMS_PAGE_STREAMING=False):
+            response = self.client.get(page.get_absolute_url())
+        self.assertEqual(''.join(chunks), response.content.decode('utf8'))
+
+        # {% render_block "css" %} in the head needs the whole page rendered first
+        page = create_page('buffered', 'nav_playground.html', 'en')
+        response = self.client.get(page.get_absolute_url())
+        self.assertFalse(response.streaming)
+
     def test_getting_placeholders(self):
         """ContentRenderer._get_content_object uses toolbar to return placeholders of a page"""
         request = self.get_request(page=self.test_page)
@@ -359,6 +390,45 @@ class RenderingTestCase(CMSTestCase):
         self.assertEqual(r, expected)
         plugin_rendering._standard_processors = {}
 
+    def test_render_async_plugins(self):
+        """
+        Tests that the render_async() coroutines of the plugins
+        in a placeholder are awaited concurrently.
+        """
+        import asyncio
+
+        from cms.plugin_base import CMSPluginBase
+        from cms.plugin_pool import plugin_pool
+
+        load_from_string = self.load_template_from_string
+        running = []
+        concurrency = []
+
+        class AsyncRenderTestPlugin(CMSPluginBase):
+            name = "Async Render Test Plugin"
+
+            async def render_async(self, context, instance, placeholder):
+                running.append(instance.pk)
+                await asyncio.sleep(0)
+                concurrency.append(len(running))
+                context['awaited'] = instance.pk
+                return context
+
+            def get_render_template(self, context, instance, placeholder):
+                return load_from_string('[{{ awaited }}]')
+
+        plugin_pool.register_plugin(AsyncRenderTestPlugin)
+        placeholder = self.test_page.get_placeholders('en').get(slot='empty')
+        plugins = [add_plugin(placeholder, 'AsyncRenderTestPlugin', 'en') for _ in range(3)]
+
+        renderer = self.get_content_renderer()
+        content = renderer.render_placeholder(placeholder, context=SekizaiContext(), language='en')
+        plugin_pool.unregister_plugin(AsyncRenderTestPlugin)
+
+        self.assertEqual(content, ''.join('[%s]' % plugin.pk for plugin in plugins))
+        # All coroutines were started before the first one finished
+        self.assertEqual(concurrency, [3, 3, 3])
+
     def test_placeholder(self):
         """
         Tests the {% placeholder %} templatetag.
@@ -335,7 +335,7 @@ class TemplatetagDatabaseTests(TwoPagesFixture, CMSTestCase):
     def test_create_placeholder_if_not_exist_in_template(self):
         """
         Tests that adding a new placeholder to a an existing page's template
-        creates the placeholder.
+        creates the placeholder when the page is rendered in edit mode.
         """
         page = create_page('Test', 'col_two.html', 'en')
         # I need to make it seem like the user added another placeholder to the SAME template.
@@ -355,6 +355,29 @@ class TemplatetagDatabaseTests(TwoPagesFixture, CMSTestCase):
             inherit=False,
             page=page,
         )
+        # Rendering the page outside of edit mode doesn't write to the database
+        self.assertObjectDoesNotExist(page.get_placeholders('en'), slot='col_right')
+
+        context = self.get_context(page=page)
+        request = context['request']
+        request.toolbar = CMSToolbar(request)
+        request.toolbar.edit_mode_active = True
+        renderer = self.get_content_renderer(request)
+        renderer.render_page_placeholder(
+            'col_right',
+            context,
+            inherit=False,
+            page=page,
+        )
+        self.assertObjectExist(page.get_placeholders('en'), slot='col_right')
+
+    def test_template_change_creates_placeholders(self):
+        page = create_page('Test', 'col_two.html', 'en')
+        page_content = page.get_content_obj('en')
+        self.assertObjectDoesNotExist(page.get_placeholders('en'), slot='col_right')
+
+        page_content.template = 'col_three.html'
+        page_content.save()
         self.assertObjectExist(page.get_placeholders('en'), slot='col_right')
 
 
@@ -1,5 +1,6 @@
 import re
 import sys
+from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -9,10 +10,10 @@ from django.core.cache import cache
 from django.http import Http404, HttpResponse
 from django.template import Variable
 from django.test.utils import override_settings
-from django.urls import clear_url_caches, reverse
+from django.urls import clear_url_caches, resolve, reverse
 from django.utils.translation import override as force_language
 
-from cms.api import create_page, create_page_content
+from cms.api import add_plugin, create_page, create_page_content
 from cms.middleware.toolbar import ToolbarMiddleware
 from cms.models import PageContent, PagePermission, Placeholder, UserSettings
 from cms.page_rendering import _handle_no_page
@@ -332,6 +333,103 @@ class ViewTests(CMSTestCase):
                 ['cms-btn', 'cms-btn-action', 'cms-btn-switch-edit']
             )
 
+    def test_details_async(self):
+        from asgiref.sync import async_to_sync
+
+        page = create_page("page", "nav_playground.html", "en")
+        disable_toolbar = get_cms_setting('CMS_TOOLBAR_URL__DISABLE')
+        response = async_to_sync(self.async_client.get)(page.get_absolute_url() + '?' + disable_toolbar)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies[settings.LANGUAGE_COOKIE_NAME].value, 'en')
+        self.assertTrue(self.async_client.session['cms_toolbar_disabled'])
+
+    def test_details_async_view(self):
+        from asgiref.sync import async_to_sync
+
+        from cms.utils.apphook_reload import reload_urlconf
+        from cms.views import details_async
+
+        page = create_page("page", "nav_playground.html", "en")
+        add_plugin(page.get_placeholders("en").get(slot="body"), "TextPlugin", "en", body="async body")
+
+        with self.settings(CMS_ASYNC_DETAILS_VIEW=True):
+            reload_urlconf()
+            try:
+                self.assertIs(resolve(page.get_absolute_url()).func, details_async)
+                response = async_to_sync(self.async_client.get)(page.get_absolute_url())
+            finally:
+                reload_urlconf()
+        self.assertContains(response, "async body")
+
+        # The page has been stored in the page cache
+        with self.assertNumQueries(0):
+            response = self.client.get(page.get_absolute_url())
+        self.assertContains(response, "async body")
+
+    def test_apphook_reload_middleware_async(self):
+        from asgiref.sync import async_to_sync
+
+        from cms.middleware.utils import ApphookReloadMiddleware
+
+        async def get_response(request):
+            return HttpResponse("async response")
+
+        middleware = ApphookReloadMiddleware(get_response)
+
+        with patch("cms.utils.apphook_reload.ensure_urlconf_is_up_to_date") as ensure_urlconf_is_up_to_date:
+            response = async_to_sync(middleware)(self.get_request("/"))
+        self.assertContains(response, "async response")
+        ensure_urlconf_is_up_to_date.assert_called_once_with()
+
+    def test_render_profiling(self):
+        page = create_page("page", "nav_playground.html", "en")
+        placeholder = page.get_placeholders("en").get(slot="body")
+        add_plugin(placeholder, "TextPlugin", "en", body="profiled")
+
+        response = self.client.get(page.get_absolute_url())
+        self.assertFalse(response.has_header('Server-Timing'))
+
+        with self.settings(CMS_RENDER_PROFILING=True):
+            cache.clear()
+            response = self.client.get(page.get_absolute_url())
+            server_timing = response['Server-Timing']
+            self.assertIn('cms-plugin-TextPlugin;desc="1x TextPlugin, 0 queries";dur=', server_timing)
+            self.assertIn('cms-placeholder-body;desc="1x body, ', server_timing)
+            self.assertIn('cms-menu-build_nodes;desc="', server_timing)
+            self.assertIn('cms-page-cache;desc="0 hits, 1 misses"', server_timing)
+
+            with self.login_user_context(self.get_superuser()):
+                response = self.client.get(page.get_absolute_url())
+            menu = response.wsgi_request.toolbar.get_menu('render-profile')
+            self.assertIsNotNone(menu)
+            plugins = menu.get_or_create_menu('render-profile-plugin', '')
+            self.assertTrue(plugins.get_items()[0].name.startswith('TextPlugin (1): '))
+
+    def test_render_profiling_header_access(self):
+        page = create_page("page", "nav_playground.html", "en")
+        url = page.get_absolute_url()
+
+        with self.settings(CMS_RENDER_PROFILING=True, INTERNAL_IPS=['127.0.0.1']):
+            cache.clear()
+            # An anonymous client which isn't in INTERNAL_IPS
+            response = self.client.get(url, REMOTE_ADDR='10.0.0.1')
+            self.assertFalse(response.has_header('Server-Timing'))
+
+            # The response of an internal client isn't shared
+            response = self.client.get(url)
+            self.assertIn('cms-page-cache;desc="1 hits, 0 misses"', response['Server-Timing'])
+            self.assertIn('private', response['Cache-Control'])
+
+            # The cached page is served without the header
+            response = self.client.get(url, REMOTE_ADDR='10.0.0.1')
+            self.assertFalse(response.has_header('Server-Timing'))
+
+        with self.settings(CMS_RENDER_PROFILING=True, INTERNAL_IPS=[]):
+            with self.login_user_context(self.get_staff_user_with_no_permissions()):
+                response = self.client.get(url, REMOTE_ADDR='10.0.0.1')
+            self.assertTrue(response.has_header('Server-Timing'))
+
     def test_incorrect_slug_for_language(self):
         """
         Test details view when page slug and current language don't match.
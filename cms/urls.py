@@ -5,6 +5,7 @@ from cms import views
 from cms.apphook_pool import apphook_pool
 from cms.appresolver import get_app_patterns
 from cms.constants import SLUG_REGEXP
+from cms.utils.conf import get_cms_setting
 
 if settings.APPEND_SLASH:
     regexp = r'^(?P<slug>%s)/$' % SLUG_REGEXP
@@ -18,10 +19,14 @@ if apphook_pool.get_apphooks():
 else:
     urlpatterns = []
 
+if get_cms_setting('ASYNC_DETAILS_VIEW'):
+    details = views.details_async
+else:
+    details = views.details
 
 urlpatterns.extend([
     re_path(r'^cms_login/$', views.login, name='cms_login'),
     re_path(r'^cms_wizard/', include('cms.wizards.urls')),
-    re_path(regexp, views.details, name='pages-details-by-slug'),
-    re_path(r'^$', views.details, {'slug': ''}, name='pages-root'),
+    re_path(regexp, details, name='pages-details-by-slug'),
+    re_path(r'^$', details, {'slug': ''}, name='pages-root'),
 ])
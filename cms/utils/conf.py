@@ -59,8 +59,18 @@ DEFAULTS = {
     'PAGE_MEDIA_PATH': 'cms_page_media/',
     'TITLE_CHARACTER': '+',
     'PAGE_CACHE': True,
+    'PAGE_CACHE_STALE_TTL': 0,
+    'PAGE_CACHE_LOCK_TIMEOUT': 30,
+    'PAGE_CACHE_ENCODINGS': [],
+    'PAGE_CACHE_STORE_IDENTITY': True,
+    'PAGE_CACHE_QUERY_PARAMS': {'policy': 'all'},
+    'PAGE_CACHE_HOLE_TTL': None,
+    'PAGE_STREAMING': False,
+    'ASYNC_DETAILS_VIEW': False,
     'PLACEHOLDER_CACHE': True,
+    'PLACEHOLDER_RENDER_THREADS': 0,
     'PLUGIN_CACHE': True,
+    'RENDER_PROFILING': False,
     'CACHE_PREFIX': f'cms_{__version__}_',
     'PLUGIN_PROCESSORS': [],
     'PLUGIN_CONTEXT_PROCESSORS': [],
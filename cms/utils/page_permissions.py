@@ -1,3 +1,4 @@
+import hashlib
 from functools import wraps
 
 from cms.cache.permissions import get_permission_cache, set_permission_cache
@@ -352,6 +353,31 @@ def user_can_view_all_pages(user, site):
     return has_global_permission(user, site, action='view_page')
 
 
+def get_page_visibility_key(user, site):
+    """
+    Returns a key identifying the pages «user» can view on «site».
+    Users who are granted the same view restrictions get the same key.
+    """
+    if user.is_superuser or not get_cms_setting('PERMISSION'):
+        return 'all' if user_can_view_all_pages(user, site) else 'none'
+
+    cached = get_permission_cache(user, 'page_visibility') or {}
+
+    if site.pk in cached:
+        return cached[site.pk]
+
+    if user_can_view_all_pages(user, site):
+        key = 'all'
+    else:
+        public_for = get_cms_setting('PUBLIC_FOR')
+        can_see_unrestricted = public_for == 'all' or (public_for == 'staff' and user.is_staff)
+        perm_tuples = sorted(set(get_view_perm_tuples(user, site, check_global=False)))
+        key = hashlib.sha1(repr((can_see_unrestricted, perm_tuples)).encode('utf-8')).hexdigest()
+    cached[site.pk] = key
+    set_permission_cache(user, 'page_visibility', cached)
+    return key
+
+
 def _perm_tuples_to_ids(perm_tuples):
     import inspect
     import warnings
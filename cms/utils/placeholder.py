@@ -1,12 +1,15 @@
 import operator
+import os
 import warnings
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 from typing import Union
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
 from django.db import models
 from django.db.models.query_utils import Q
+from django.dispatch import receiver
 from django.template import (
     Context,
     NodeList,
@@ -18,6 +21,7 @@ from django.template import (
 from django.template.base import VariableNode
 from django.template.loader import get_template
 from django.template.loader_tags import BlockNode, ExtendsNode, IncludeNode
+from django.utils.autoreload import file_changed
 from sekizai.helpers import get_varname
 
 from cms.exceptions import DuplicatePlaceholderWarning
@@ -26,6 +30,30 @@ from cms.utils.conf import get_cms_setting
 
 RANGE_START = 128
 
+# The placeholders declared by each template, by template name. Entries are
+# filled on first lookup and dropped when a template file or the template
+# settings change. In DEBUG, an entry is also rebuilt once the template files
+# it was built from have been modified.
+_declared_placeholders = {}
+_declared_static_placeholders = {}
+
+_RegistryEntry = namedtuple('_RegistryEntry', ['mtimes', 'declarations'])
+
+
+@receiver(file_changed, dispatch_uid='cms_placeholder_registry_file_changed')
+@receiver(setting_changed, dispatch_uid='cms_placeholder_registry_setting_changed')
+def _clear_placeholder_registry(sender, **kwargs):
+    file_path = kwargs.get('file_path')
+    setting = kwargs.get('setting')
+
+    if file_path is not None and file_path.suffix == '.py':
+        return
+
+    if setting is not None and setting != 'TEMPLATES':
+        return
+    _declared_placeholders.clear()
+    _declared_static_placeholders.clear()
+
 
 def _get_nodelist(tpl):
     if hasattr(tpl, "template"):
@@ -284,10 +312,71 @@ def _scan_static_placeholders(nodelist):
     return _scan_placeholders(nodelist, node_class=StaticPlaceholderNode)
 
 
-def get_placeholders(template):
+def _get_template_mtimes(compiled_template):
+    """
+    Returns the modification times of the files of «compiled_template»
+    and of the templates it extends or includes, by file name.
+    """
+    mtimes = {}
+    templates = [compiled_template]
+
+    while templates:
+        template = getattr(templates.pop(), "template", None)
+
+        if template is None or template.origin.name in mtimes:
+            continue
+
+        try:
+            mtimes[template.origin.name] = os.path.getmtime(template.origin.name)
+        except OSError:
+            mtimes[template.origin.name] = None
+
+        for node in template.nodelist.get_nodes_by_type(ExtendsNode):
+            templates.append(node.get_parent(get_context()))
+
+        for node in template.nodelist.get_nodes_by_type(IncludeNode):
+            if callable(getattr(node.template, "render", None)):
+                templates.append(node.template)
+            elif node.template and not isinstance(node.template.var, Variable):
+                templates.append(get_template(node.template.var))
+    return mtimes
+
+
+def _is_modified(mtimes):
+    for name, mtime in mtimes.items():
+        try:
+            if os.path.getmtime(name) != mtime:
+                return True
+        except OSError:
+            if mtime is not None:
+                return True
+    return False
+
+
+def _get_declarations(registry, template, scan):
+    """
+    Returns the result of «scan» for the compiled «template», from
+    «registry» if it was scanned before. In DEBUG, a template whose
+    files have been modified since is scanned again.
+    """
+    entry = registry.get(template)
+
+    if entry is not None and not settings.DEBUG:
+        return entry.declarations
+
+    if entry is not None and entry.mtimes is not None and not _is_modified(entry.mtimes):
+        return entry.declarations
+
     compiled_template = get_template(template)
+    declarations = scan(compiled_template)
+    mtimes = _get_template_mtimes(compiled_template) if settings.DEBUG else None
+    registry[template] = _RegistryEntry(mtimes, declarations)
+    return declarations
+
 
+def _scan_declared_placeholders(compiled_template):
     placeholders = []
+    duplicates = []
     nodes = _scan_placeholders(_get_nodelist(compiled_template))
     clean_placeholders = []
 
@@ -296,20 +385,35 @@ def get_placeholders(template):
         slot = placeholder.slot
 
         if slot in clean_placeholders:
-            warnings.warn(
-                f'Duplicate {{% placeholder "{slot}" %}} ' f"in template {template}.",
-                DuplicatePlaceholderWarning,
-            )
+            duplicates.append(slot)
         else:
             validate_placeholder_name(slot)
             placeholders.append(placeholder)
             clean_placeholders.append(slot)
-    return placeholders
+    return placeholders, duplicates
+
+
+def get_placeholders(template):
+    placeholders, duplicates = _get_declarations(
+        _declared_placeholders, template, _scan_declared_placeholders
+    )
+
+    for slot in duplicates:
+        warnings.warn(
+            f'Duplicate {{% placeholder "{slot}" %}} ' f"in template {template}.",
+            DuplicatePlaceholderWarning,
+        )
+    return list(placeholders)
 
 
 def get_static_placeholders(template, context):
-    compiled_template = get_template(template)
-    nodes = _scan_static_placeholders(_get_nodelist(compiled_template))
+    # The names of static placeholders may depend on the context,
+    # only the nodes are kept in the registry.
+    nodes = _get_declarations(
+        _declared_static_placeholders,
+        template,
+        lambda compiled_template: _scan_static_placeholders(_get_nodelist(compiled_template)),
+    )
     placeholders = [node.get_declaration(context) for node in nodes]
     placeholders_with_code = []
 
@@ -387,16 +491,27 @@ def _find_topmost_template(extend_node):
     return extend_node.get_parent(get_context())
 
 
-def rescan_placeholders_for_obj(obj):
+def get_existing_placeholders_for_obj(obj):
+    """
+    Returns the placeholders of «obj» declared by its template, by slot.
+    Unlike rescan_placeholders_for_obj(), doesn't create the missing ones.
+    """
     from cms.models import Placeholder
 
     existing = OrderedDict()
-    declared_placeholders = get_declared_placeholders_for_obj(obj)
-    placeholders = [pl.slot for pl in declared_placeholders]
+    placeholders = [pl.slot for pl in get_declared_placeholders_for_obj(obj)]
 
     for placeholder in Placeholder.objects.get_for_obj(obj):
         if placeholder.slot in placeholders:
             existing[placeholder.slot] = placeholder
+    return existing
+
+
+def rescan_placeholders_for_obj(obj):
+    from cms.models import Placeholder
+
+    existing = get_existing_placeholders_for_obj(obj)
+    placeholders = [pl.slot for pl in get_declared_placeholders_for_obj(obj)]
 
     for placeholder in placeholders:
         if placeholder not in existing:
@@ -6,6 +6,8 @@ from functools import cache, lru_cache
 from itertools import starmap
 from operator import itemgetter
 
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.manager import BaseManager
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
 
@@ -19,6 +21,9 @@ from cms.utils.placeholder import get_placeholder_conf
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of plugin model tables joined by a single downcasting query
+DOWNCAST_JOIN_SIZE = 20
+
 
 @cache
 def get_plugin_class(plugin_type: str) -> CMSPluginBase:
@@ -386,6 +391,32 @@ def get_bound_plugins(plugins):
             yield plugin_lookup[plugin.pk]
 
 
+def _has_default_render_queryset(plugin_class):
+    """
+    Returns True if the plugin class renders the instances
+    returned by the default manager of its model.
+    """
+    get_render_queryset = plugin_class.get_render_queryset.__func__
+    get_queryset = type(plugin_class.model._default_manager).get_queryset
+    return (
+        get_render_queryset is CMSPluginBase.get_render_queryset.__func__
+        and get_queryset is BaseManager.get_queryset
+    )
+
+
+@lru_cache
+def _get_plugin_model_join(model):
+    """
+    Returns the (select_related() name, accessor name) tuple of the reverse
+    relation from CMSPlugin to «model», None if «model» doesn't inherit
+    CMSPlugin alone (and directly).
+    """
+    if model._meta.proxy or list(model._meta.parents) != [CMSPlugin]:
+        return None
+    parent_link = model._meta.parents[CMSPlugin]
+    return parent_link.related_query_name(), parent_link.remote_field.get_accessor_name()
+
+
 def downcast_plugins(plugins,
                      placeholders=None, select_placeholder=False, request=None):
     """
@@ -415,6 +446,14 @@ def downcast_plugins(plugins,
 
     placeholders = placeholders or []
     placeholders_by_id = {placeholder.pk: placeholder for placeholder in placeholders}
+    plugins_by_id = {plugin.pk: plugin for plugin in plugins}
+    plugin_classes = {}
+    instances = []
+    # Plugin types using the default queryset of their model are grouped: the
+    # models inheriting CMSPlugin alone are LEFT JOINed to the cms_cmsplugin
+    # table, the other ones are loaded with one query per model.
+    joined_pks = defaultdict(list)
+    model_pks = defaultdict(list)
 
     for plugin_type, pks in plugin_types_map.items():
         try:
@@ -425,24 +464,80 @@ def downcast_plugins(plugins,
                 f"Plugin not installed: {plugin_type} (pk={', '.join(str(pk) for pk in pks)})", exc_info=sys.exc_info()
             )
             continue
-        # get all the plugins of type cls.model
-        plugin_qs = cls.get_render_queryset().filter(pk__in=pks)
+
+        plugin_classes[plugin_type] = cls
+
+        if not _has_default_render_queryset(cls):
+            # get all the plugins of type cls.model
+            plugin_qs = cls.get_render_queryset().filter(pk__in=pks)
+
+            if select_placeholder:
+                plugin_qs = plugin_qs.select_related('placeholder')
+            instances.extend(plugin_qs.iterator())
+        elif cls.model is CMSPlugin and not select_placeholder:
+            # The plugins are already instances of the plugin model
+            instances.extend(plugins_by_id[pk] for pk in pks)
+        elif cls.model is CMSPlugin or _get_plugin_model_join(cls.model):
+            joined_pks[cls.model].extend(pks)
+        else:
+            model_pks[cls.model].extend(pks)
+
+    for model, pks in model_pks.items():
+        plugin_qs = model._default_manager.filter(pk__in=pks)
 
         if select_placeholder:
             plugin_qs = plugin_qs.select_related('placeholder')
+        instances.extend(plugin_qs.iterator())
 
-        # put them in a map, so we can replace the base CMSPlugins with their
-        # downcasted versions
-        for instance in plugin_qs.iterator():
-            placeholder = placeholders_by_id.get(instance.placeholder_id)
+    joined_models = list(joined_pks)
 
-            if placeholder:
-                instance.placeholder = placeholder
+    for start in range(0, len(joined_models), DOWNCAST_JOIN_SIZE):
+        joins = {}
+        pks = []
 
-                if not cls.cache and not cls().get_cache_expiration(request, instance, placeholder):
-                    placeholder.cache_placeholder = False
+        for model in joined_models[start:start + DOWNCAST_JOIN_SIZE]:
+            if model is not CMSPlugin:
+                joins[model] = _get_plugin_model_join(model)
+            pks.extend(joined_pks[model])
 
-            plugin_lookup[instance.pk] = instance
+        plugin_qs = CMSPlugin.objects.filter(pk__in=pks)
+        plugin_qs = plugin_qs.select_related(*(related_name for related_name, accessor in joins.values()))
+
+        if select_placeholder:
+            plugin_qs = plugin_qs.select_related('placeholder')
+
+        for base_instance in plugin_qs.iterator():
+            model = plugin_classes[base_instance.plugin_type].model
+
+            if model is CMSPlugin:
+                instances.append(base_instance)
+                continue
+
+            related_name, accessor = joins[model]
+
+            try:
+                instance = getattr(base_instance, accessor)
+            except ObjectDoesNotExist:
+                # The plugin has no row in the table of its model
+                continue
+
+            if select_placeholder:
+                instance.placeholder = base_instance.placeholder
+            instances.append(instance)
+
+    # put them in a map, so we can replace the base CMSPlugins with their
+    # downcasted versions
+    for instance in instances:
+        cls = plugin_classes[instance.plugin_type]
+        placeholder = placeholders_by_id.get(instance.placeholder_id)
+
+        if placeholder:
+            instance.placeholder = placeholder
+
+            if not cls.cache and not cls().get_cache_expiration(request, instance, placeholder):
+                placeholder.cache_placeholder = False
+
+        plugin_lookup[instance.pk] = instance
 
     for plugin in plugins:
         parent_not_available = (not plugin.parent_id or plugin.parent_id not in plugin_ids)
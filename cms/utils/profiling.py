@@ -0,0 +1,151 @@
+"""
+Collects the time spent and the database queries made rendering plugins,
+placeholders and menus, as well as the page, placeholder, plugin and menu
+cache hits and misses, when CMS_RENDER_PROFILING is enabled.
+"""
+import re
+import time
+from collections import Counter, namedtuple
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_cache_control
+
+from cms.utils.conf import get_cms_setting
+
+Timing = namedtuple('Timing', ['category', 'name', 'key', 'duration', 'queries'])
+
+_not_measured = nullcontext()
+
+# Characters not allowed in Server-Timing metric names
+_invalid_metric_chars = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+
+class RenderProfile:
+    """
+    The timings of one request. Durations are in milliseconds
+    and include the nested measures.
+    """
+
+    def __init__(self):
+        self.timings = []
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+
+    @contextmanager
+    def measure(self, category, name, key=None):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            try:
+                yield
+            finally:
+                duration = (time.perf_counter() - start) * 1000
+                self.timings.append(Timing(category, name, key, duration, len(queries)))
+
+    def record_cache(self, cache, hit):
+        if hit:
+            self.cache_hits[cache] += 1
+        else:
+            self.cache_misses[cache] += 1
+
+    def get_totals(self, category):
+        """
+        Returns a list of (name, count, duration, queries) tuples with the totals
+        of «category» per name, slowest first.
+        """
+        totals = {}
+
+        for timing in self.timings:
+            if timing.category != category:
+                continue
+            count, duration, queries = totals.get(timing.name, (0, 0, 0))
+            totals[timing.name] = (count + 1, duration + timing.duration, queries + timing.queries)
+        totals = [(name,) + values for name, values in totals.items()]
+        return sorted(totals, key=lambda total: total[2], reverse=True)
+
+    def get_slowest(self, category, limit=10):
+        timings = [timing for timing in self.timings if timing.category == category]
+        return sorted(timings, key=lambda timing: timing.duration, reverse=True)[:limit]
+
+    def get_server_timing(self):
+        """
+        Returns the value of the Server-Timing header.
+        """
+        metrics = []
+
+        for category in ('placeholder', 'plugin', 'menu'):
+            for name, count, duration, queries in self.get_totals(category):
+                metric = _invalid_metric_chars.sub('_', f'cms-{category}-{name}')
+                description = f'{count}x {name}, {queries} queries'
+                metrics.append(f'{metric};desc="{description}";dur={duration:.1f}')
+
+        for cache in sorted(set(self.cache_hits) | set(self.cache_misses)):
+            description = f'{self.cache_hits[cache]} hits, {self.cache_misses[cache]} misses'
+            metrics.append(f'cms-{cache}-cache;desc="{description}"')
+        return ', '.join(metrics)
+
+
+def get_render_profile(request):
+    """
+    Returns the RenderProfile of the request, None if profiling is disabled.
+    """
+    if request is None or not get_cms_setting('RENDER_PROFILING'):
+        return None
+    profile = getattr(request, '_cms_render_profile', None)
+
+    if profile is None:
+        profile = request._cms_render_profile = RenderProfile()
+    return profile
+
+
+def can_see_render_profile(request):
+    """
+    Returns True if the render profile can be sent to the client of the
+    request: a staff user, or a client in INTERNAL_IPS.
+    """
+    from cms.utils.request_ip_resolvers import get_request_ip_resolver
+
+    user = getattr(request, 'user', None)
+
+    if user is not None and user.is_staff:
+        return True
+    return get_request_ip_resolver()(request) in settings.INTERNAL_IPS
+
+
+def add_server_timing_header(request, response, profile):
+    """
+    Adds the Server-Timing header with «profile» to «response», if the
+    client of the request can see it.
+    """
+    if not can_see_render_profile(request):
+        return
+
+    server_timing = profile.get_server_timing()
+
+    if not server_timing:
+        return
+
+    if response.has_header('Server-Timing'):
+        server_timing = '%s, %s' % (response['Server-Timing'], server_timing)
+    response['Server-Timing'] = server_timing
+    # Shared caches must not serve the profile to other clients.
+    patch_cache_control(response, private=True)
+
+
+def measure(profile, category, name, key=None):
+    """
+    Measures the enclosed block if «profile» is not None.
+    """
+    if profile is None:
+        return _not_measured
+    return profile.measure(category, name, key)
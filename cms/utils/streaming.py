@@ -0,0 +1,142 @@
+"""
+Renders page templates as a stream of chunks: the output up to a placeholder
+is sent to the client before the placeholder is rendered.
+
+The template inheritance is followed the way ExtendsNode.render() and
+BlockNode.render() do it. Every other tag is rendered as a whole.
+"""
+from django.template import Context
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY,
+    BlockContext,
+    BlockNode,
+    ExtendsNode,
+)
+from django.utils import timezone
+from django.utils.translation import get_language, override
+from sekizai.templatetags.sekizai_tags import RenderBlock, WithData
+
+
+def _iter_nodes(nodelist, context, toolbar_hidden):
+    """
+    Yields the nodes of «nodelist» in rendering order. Each node
+    has to be rendered before the next one is requested.
+    """
+    from cms.templatetags.cms_tags import CMSToolbar
+
+    for node in nodelist:
+        if isinstance(node, ExtendsNode):
+            yield from _iter_extends_nodes(node, context, toolbar_hidden)
+        elif isinstance(node, BlockNode):
+            yield from _iter_block_nodes(node, context, toolbar_hidden)
+        elif isinstance(node, CMSToolbar) and toolbar_hidden:
+            # Without the toolbar, {% cms_toolbar %} only renders the rest of the template.
+            yield from _iter_nodes(node.nodelist, context, toolbar_hidden)
+        else:
+            yield node
+
+
+def _iter_extends_nodes(node, context, toolbar_hidden):
+    compiled_parent = node.get_parent(context)
+
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(node.blocks)
+
+    for parent_node in compiled_parent.nodelist:
+        # The ExtendsNode has to be the first non-text node.
+        if not isinstance(parent_node, TextNode):
+            if not isinstance(parent_node, ExtendsNode):
+                blocks = {n.name: n for n in compiled_parent.nodelist.get_nodes_by_type(BlockNode)}
+                block_context.add_blocks(blocks)
+            break
+
+    with context.render_context.push_state(compiled_parent, isolated_context=False):
+        yield from _iter_nodes(compiled_parent.nodelist, context, toolbar_hidden)
+
+
+def _iter_block_nodes(node, context, toolbar_hidden):
+    block_context = context.render_context.get(BLOCK_CONTEXT_KEY)
+
+    with context.push():
+        if block_context is None:
+            context['block'] = node
+            yield from _iter_nodes(node.nodelist, context, toolbar_hidden)
+        else:
+            push = block = block_context.pop(node.name)
+            if block is None:
+                block = node
+            block = type(node)(block.name, block.nodelist)
+            block.context = context
+            context['block'] = block
+            yield from _iter_nodes(block.nodelist, context, toolbar_hidden)
+            if push is not None:
+                block_context.push(node.name, push)
+
+
+def _can_stream(template, context, toolbar_hidden):
+    """
+    Returns True if a placeholder is rendered before any
+    sekizai block which post-processes the rest of the template.
+    """
+    from cms.templatetags.cms_tags import Placeholder, StaticPlaceholderNode
+
+    node_types = (Placeholder, StaticPlaceholderNode, RenderBlock, WithData)
+
+    with context.render_context.push_state(template), context.bind_template(template):
+        nodes = _iter_nodes(template.nodelist, context, toolbar_hidden)
+        try:
+            for node in nodes:
+                found = node.get_nodes_by_type(node_types)
+
+                if any(isinstance(found_node, (RenderBlock, WithData)) for found_node in found):
+                    return False
+
+                if found:
+                    return True
+        finally:
+            nodes.close()
+    return False
+
+
+def stream_template(template_name, context, request, toolbar_hidden=True):
+    """
+    Returns an iterator over the rendered template, or None if the template
+    can't be streamed because a sekizai {% render_block %} or {% with_data %}
+    tag needs the output following it before the first placeholder.
+    """
+    backend_template = get_template(template_name)
+    template = backend_template.template
+    autoescape = backend_template.backend.engine.autoescape
+
+    # Inspect the template on a plain context,
+    # the context processors run once the template is rendered.
+    if not _can_stream(template, Context(context, autoescape=autoescape), toolbar_hidden):
+        return None
+
+    context = make_context(context, request, autoescape=autoescape)
+    # The response is rendered after the view returned.
+    language = get_language()
+    current_timezone = timezone.get_current_timezone()
+
+    def render():
+        from cms.templatetags.cms_tags import Placeholder, StaticPlaceholderNode
+
+        bits = []
+
+        with override(language), timezone.override(current_timezone):
+            with context.render_context.push_state(template), context.bind_template(template):
+                context.template_name = template.name
+
+                for node in _iter_nodes(template.nodelist, context, toolbar_hidden):
+                    if bits and node.get_nodes_by_type((Placeholder, StaticPlaceholderNode)):
+                        # Send the output so far before rendering the placeholder.
+                        yield ''.join(bits)
+                        bits = []
+                    bits.append(str(node.render_annotated(context)))
+        yield ''.join(bits)
+    return render()
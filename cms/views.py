@@ -1,5 +1,6 @@
 from urllib.parse import quote
 
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth import REDIRECT_FIELD_NAME, login as auth_login
@@ -8,19 +9,18 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import (
     Http404,
-    HttpResponse,
     HttpResponseBadRequest,
     HttpResponseRedirect,
 )
 from django.shortcuts import render
+from django.template.response import SimpleTemplateResponse
 from django.urls import Resolver404, resolve, reverse
-from django.utils.cache import patch_cache_control
 from django.utils.timezone import now
 from django.utils.translation import activate, get_language_from_request
 from django.views.decorators.http import require_POST
 
 from cms.apphook_pool import apphook_pool
-from cms.cache.page import get_page_cache
+from cms.cache.page import get_page_cache_response
 from cms.exceptions import LanguageError
 from cms.forms.login import CMSToolbarLoginForm
 from cms.models import PageContent
@@ -33,7 +33,7 @@ from cms.page_rendering import (
 )
 from cms.toolbar.utils import get_object_preview_url, get_toolbar_from_request
 from cms.utils import get_current_site
-from cms.utils.compat import DJANGO_2_2, DJANGO_3_0, DJANGO_3_1
+from cms.utils.compat import DJANGO_2_2
 from cms.utils.conf import get_cms_setting
 from cms.utils.helpers import is_editable_model
 from cms.utils.i18n import (
@@ -45,6 +45,7 @@ from cms.utils.i18n import (
     is_language_prefix_patterns_used,
 )
 from cms.utils.page import get_page_from_request
+from cms.utils.profiling import get_render_profile
 
 if DJANGO_2_2:
     from django.utils.http import (
@@ -75,20 +76,13 @@ def details(request, slug):
             not request.toolbar.edit_mode_active and not request.toolbar.show_toolbar and not is_authenticated
         )
     ):
-        cache_content = get_page_cache(request)
-        if cache_content is not None:
-            content, headers, expires_datetime = cache_content
-            response = HttpResponse(content)
-            response.xframe_options_exempt = True
-            if DJANGO_2_2 or DJANGO_3_0 or DJANGO_3_1:
-                response._headers = headers
-            else:
-                #  for django3.2 and above. response.headers replaces response._headers in earlier versions of django
-                response.headers = headers
-            # Recalculate the max-age header for this cached response
-            max_age = int(
-                (expires_datetime - response_timestamp).total_seconds() + 0.5)
-            patch_cache_control(response, max_age=max_age)
+        response = get_page_cache_response(request, response_timestamp)
+        profile = get_render_profile(request)
+
+        if profile is not None:
+            profile.record_cache('page', hit=response is not None)
+
+        if response is not None:
             return response
 
     # Get a Page model object from the request
@@ -232,6 +226,25 @@ def details(request, slug):
     return render_pagecontent(request, content)
 
 
+async def details_async(request, slug):
+    """
+    Asynchronous variant of :func:`details` for sites served by ASGI (see
+    :setting:`CMS_ASYNC_DETAILS_VIEW`). The page is looked up and its
+    template rendered in a single switch to a thread, where Django switches
+    once to run a synchronous view and once more to render its template
+    response. Template response middlewares get the rendered response.
+    """
+    return await sync_to_async(_render_details, thread_sensitive=True)(request, slug)
+
+
+def _render_details(request, slug):
+    response = details(request, slug)
+
+    if isinstance(response, SimpleTemplateResponse):
+        response.render()
+    return response
+
+
 @require_POST
 def login(request):
     redirect_to = request.GET.get(REDIRECT_FIELD_NAME)
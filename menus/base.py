@@ -6,6 +6,10 @@ from django.utils.encoding import smart_str
 class Menu:
     """The base class for all menu-generating classes."""
     namespace = None
+    #: Set to True if the nodes depend on the user beyond the pages they can
+    #: view. The menus are then cached per user instead of being shared by
+    #: the users who can view the same pages.
+    user_specific = False
 
     def __init__(self, renderer):
         """
@@ -31,6 +35,22 @@ class Menu:
         """
         raise NotImplementedError
 
+    def update_nodes(self, request, nodes, node_ids) -> Optional[List['NavigationNode']]:
+        """
+        Update the cached nodes of the menu after some of them changed.
+
+        Args:
+            request: The request object.
+            nodes: The cached NavigationNode instances of the menu, in order
+                and without their children.
+            node_ids: The ids of the changed nodes.
+
+        Returns:
+            The updated list of NavigationNode instances, or None if the menu
+            has to be built again with get_nodes().
+        """
+        return None
+
 
 class Modifier:
     """The base class for all menu-modifying classes. A modifier add, removes or changes
@@ -71,12 +91,15 @@ class NavigationNode:
         parent_namespace: The namespace of the parent (optional).
         attr: Additional information to store on this node (optional).
         visible: Indicates whether this item is visible (default is True).
+
+    The attributes set on every node are slots. Other attributes, like the
+    ones set by the menu modifiers, are stored in the instance dictionary.
     """
 
-    selected: bool = False
-    sibling: bool = False
-    ancestor: bool = False
-    descendant: bool = False
+    __slots__ = (
+        'children', 'parent', 'namespace', 'title', 'url', 'id', 'parent_id', 'parent_namespace', 'visible',
+        'attr', 'selected', 'sibling', 'ancestor', 'descendant', '__dict__',
+    )
 
     def __init__(
         self,
@@ -109,6 +132,10 @@ class NavigationNode:
         self.parent_id = parent_id
         self.parent_namespace = parent_namespace
         self.visible = visible
+        self.selected: bool = False
+        self.sibling: bool = False
+        self.ancestor: bool = False
+        self.descendant: bool = False
         self.attr = attr or {}
         """
         A dictionary to add arbitrary attributes to the node. An important key is 'is_page':
@@ -150,7 +177,14 @@ class NavigationNode:
         """
         Returns a list of all children beneath the current menu item.
         """
-        return sum(([node] + node.get_descendants() for node in self.children), [])
+        descendants = []
+        stack = self.children[::-1]
+
+        while stack:
+            node = stack.pop()
+            descendants.append(node)
+            stack.extend(reversed(node.children))
+        return descendants
 
     def get_ancestors(self) -> List['NavigationNode']:
         """
@@ -161,15 +195,120 @@ class NavigationNode:
         else:
             return []
 
+    def get_selection_key(self) -> Any:
+        """
+        Returns the key compared with the one of the request to find the
+        selected nodes, the URL of the node.
+        """
+        return self.get_absolute_url()
+
+    @classmethod
+    def get_request_selection_key(cls, request) -> Any:
+        """
+        Returns the key of the nodes of this class the request selects,
+        the request path.
+
+        Args:
+            request: The request object.
+        """
+        return request.path
+
     def is_selected(self, request) -> bool:
         """
         Checks if the node is selected based on the request path.
 
+        The menu renderer looks the selected nodes up by their selection key
+        and only calls this method for the classes which override it.
+
         Args:
             request: The request object.
 
         Returns:
             True if the node is selected, False otherwise.
         """
-        node_abs_url = self.get_absolute_url()
-        return node_abs_url == request.path
+        return self.get_selection_key() == self.get_request_selection_key(request)
+
+
+class NodeIndex:
+    """
+    Keeps the root and the selected nodes of the nodes the menu modifiers are
+    applied to. The renderer builds one index per call of
+    :meth:`menus.menu_pool.MenuRenderer.apply_modifiers` and updates it with
+    the nodes returned by each modifier.
+
+    The roots and the selected nodes are found in one pass over the current
+    list of nodes, on first use after each modifier, as modifiers may change
+    the tree. There is no index by id or by path: the nodes are looked up by
+    walking the ``children`` of these nodes.
+    """
+
+    def __init__(self, nodes: List[NavigationNode]):
+        self.nodes = nodes
+        self._roots = None
+        self._selected = None
+
+    def update(self, nodes: List[NavigationNode]):
+        """
+        Indexes «nodes», the list of nodes returned by the last modifier.
+        """
+        self.nodes = nodes
+        self._roots = None
+        self._selected = None
+
+    def select(self, request):
+        """
+        Marks the nodes selected by the request. The selection key of the
+        request is computed once per node class and compared with the
+        selection keys of the nodes, is_selected() is only called for the
+        classes which override it.
+        """
+        request_keys = {}
+        not_indexed = object()
+        self._selected = None
+
+        for node in self.nodes:
+            node_class = node.__class__
+
+            try:
+                request_key = request_keys[node_class]
+            except KeyError:
+                if node_class.is_selected is NavigationNode.is_selected:
+                    request_key = node_class.get_request_selection_key(request)
+                else:
+                    request_key = not_indexed
+                request_keys[node_class] = request_key
+
+            if request_key is not_indexed:
+                node.selected = node.is_selected(request)
+            else:
+                node.selected = node.get_selection_key() == request_key
+
+    def _index_nodes(self):
+        roots = []
+        selected = []
+
+        for node in self.nodes:
+            if not node.parent:
+                roots.append(node)
+            if node.selected:
+                selected.append(node)
+        self._roots = roots
+        self._selected = selected
+
+    @property
+    def roots(self) -> List[NavigationNode]:
+        """
+        The nodes without a parent, in order.
+        """
+        if self._roots is None:
+            self._index_nodes()
+        return self._roots
+
+    @property
+    def selected(self) -> List[NavigationNode]:
+        """
+        The selected nodes, in order.
+        """
+        if self._selected is None:
+            self._index_nodes()
+        return self._selected
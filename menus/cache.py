@@ -0,0 +1,259 @@
+"""
+This module manages the menu cache. We use a cache-versioning strategy in
+which each site, each language, each (site x language) pair and the menus as
+a whole have their own version. The versions are stored in the cache itself.
+
+Each cached menu is stored along with the versions it was built with, and is
+only used if these versions are all still current. Reading a menu and its
+versions is a single cache round-trip.
+
+Invalidating menus simply replaces the relevant version with a new value,
+which renders any menus built with the old one inaccessible. Those cache
+entries will simply expire and will be purged according to the policy of the
+cache backend in-use.
+
+The menus are cached in a flat form: each node is a tuple of its attributes
+which references its parent by its index instead of holding the node objects,
+and the nodes are only built again from a menu which is up-to-date.
+
+Changes to some nodes of a site don't invalidate its menus. They are numbered
+and recorded in the cache instead, and the cached menus are updated with the
+changes made since they were cached. Menus more than MAX_MENU_CHANGES changes
+behind are built again.
+"""
+import time
+from functools import lru_cache
+
+from cms.utils.conf import get_cms_setting
+
+MAX_MENU_CHANGES = 100
+
+# The node attributes stored in each tuple, the
+# others are stored in a dictionary if they're set.
+_NODE_FIELDS = ('title', 'url', 'id', 'parent_id', 'parent_namespace', 'namespace', 'visible', 'attr')
+_NODE_DEFAULTS = {'selected': False, 'sibling': False, 'ancestor': False, 'descendant': False}
+
+
+def _get_menu_cache_version_key(site_id=None, language=None):
+    """
+    Returns the key of the version of the menus of «site_id» and «language»,
+    of all the menus if neither is given.
+    """
+    key = f"{get_cms_setting('CACHE_PREFIX')}|menu_cache_version"
+
+    if site_id:
+        key += f'|site:{site_id}'
+
+    if language:
+        key += f'|lang:{language}'
+    return key
+
+
+def _get_menu_cache_version_keys(site_id, language):
+    """
+    Returns the keys of the versions the menus of «site_id» and «language»
+    depend on.
+    """
+    return [
+        _get_menu_cache_version_key(),
+        _get_menu_cache_version_key(site_id=site_id),
+        _get_menu_cache_version_key(language=language),
+        _get_menu_cache_version_key(site_id, language),
+    ]
+
+
+def _get_menu_changes_key(site_id, number=None):
+    """
+    Returns the key of the number of node changes made on «site_id»,
+    of the change «number» if given.
+    """
+    key = f"{get_cms_setting('CACHE_PREFIX')}|menu_changes|site:{site_id}"
+
+    if number is not None:
+        key += f'|{number}'
+    return key
+
+
+def _get_new_version():
+    return int(time.time() * 1000000)
+
+
+@lru_cache
+def _get_node_slots(node_class):
+    """
+    Returns the slots of «node_class» which aren't stored in the node tuples.
+    """
+    excluded = {'children', 'parent', '__dict__', '__weakref__', *_NODE_FIELDS}
+    slots = []
+
+    for cls in reversed(node_class.__mro__):
+        cls_slots = cls.__dict__.get('__slots__', ())
+
+        if isinstance(cls_slots, str):
+            cls_slots = (cls_slots,)
+        slots.extend(slot for slot in cls_slots if slot not in excluded)
+    return tuple(slots)
+
+
+def _dump_nodes(nodes):
+    """
+    Returns the flat form of «nodes», a list of (class, parent index,
+    *_NODE_FIELDS, state) tuples where «state» holds the other attributes.
+    Every parent has to be in «nodes».
+    """
+    indexes = {node: index for index, node in enumerate(nodes)}
+    dumped_nodes = []
+
+    for node in nodes:
+        state = {}
+
+        for slot in _get_node_slots(node.__class__):
+            try:
+                value = getattr(node, slot)
+            except AttributeError:
+                continue
+
+            if slot not in _NODE_DEFAULTS or value != _NODE_DEFAULTS[slot]:
+                state[slot] = value
+        state.update(getattr(node, '__dict__', {}))
+        parent_index = indexes[node.parent] if node.parent is not None else None
+        fields = tuple(getattr(node, field) for field in _NODE_FIELDS)
+        dumped_nodes.append((node.__class__, parent_index) + fields + (state or None,))
+    return dumped_nodes
+
+
+def _load_nodes(dumped_nodes):
+    """
+    Returns the nodes of the flat form returned by _dump_nodes().
+    """
+    nodes = []
+
+    for node_class, parent_index, title, url, id, parent_id, parent_namespace, namespace, visible, attr, state \
+            in dumped_nodes:
+        node = node_class.__new__(node_class)
+        node.title = title
+        node.url = url
+        node.id = id
+        node.parent_id = parent_id
+        node.parent_namespace = parent_namespace
+        node.namespace = namespace
+        node.visible = visible
+        node.attr = attr
+        node.selected = node.sibling = node.ancestor = node.descendant = False
+        node.children = []
+
+        if state:
+            for name, value in state.items():
+                setattr(node, name, value)
+
+        if parent_index is None:
+            node.parent = None
+        else:
+            node.parent = nodes[parent_index]
+            node.parent.children.append(node)
+        nodes.append(node)
+    return nodes
+
+
+def get_menu_cache(key, site_id, language):
+    """
+    Returns a (nodes, changes, versions) tuple. «nodes» is the menu cached
+    under «key», None if there's none or if it's outdated. «changes» is the
+    list of (menu name, node ids, clear other menus) changes «nodes» has to be
+    updated with.
+    «versions» has to be passed to set_menu_cache() when the menu is updated
+    or built again.
+    """
+    from django.core.cache import cache
+
+    # The number of changes is the last version.
+    version_keys = _get_menu_cache_version_keys(site_id, language) + [_get_menu_changes_key(site_id)]
+    cached = cache.get_many([key] + version_keys)
+    versions = {version_key: cached.get(version_key) for version_key in version_keys}
+
+    if key not in cached:
+        return None, [], versions
+
+    cached_versions, nodes = cached[key]
+    current_versions = tuple(versions.values())
+
+    if None in current_versions or cached_versions[:-1] != current_versions[:-1]:
+        return None, [], versions
+
+    first_change = cached_versions[-1] + 1
+    last_change = current_versions[-1]
+
+    if last_change < first_change:
+        return _load_nodes(nodes), [], versions
+
+    if last_change - first_change >= MAX_MENU_CHANGES:
+        return None, [], versions
+
+    change_keys = [_get_menu_changes_key(site_id, number) for number in range(first_change, last_change + 1)]
+    changes = cache.get_many(change_keys)
+
+    if len(changes) < len(change_keys):
+        # A change expired or is being recorded.
+        return None, [], versions
+    return _load_nodes(nodes), [changes[change_key] for change_key in change_keys], versions
+
+
+def set_menu_cache(key, nodes, versions):
+    """
+    Caches the menu «nodes» under «key» with the «versions» read by
+    get_menu_cache() before they were built.
+
+    Nothing is cached if a version was changed in the meantime, as the
+    nodes might have been built from outdated content.
+    """
+    from django.core.cache import cache
+
+    duration = get_cms_setting('CACHE_DURATIONS')['menus']
+
+    for version_key, version in versions.items():
+        if version is None:
+            version = versions[version_key] = _get_new_version()
+            # Another process could have invalidated the menus since.
+            if not cache.add(version_key, version, duration):
+                return
+        elif not cache.touch(version_key, duration):
+            # The versions have to outlive the menus built with them.
+            return
+    cache.set(key, (tuple(versions.values()), _dump_nodes(nodes)), duration)
+
+
+def record_menu_change(site_id, menu_name, node_ids, clear_other_menus=False):
+    """
+    Records that the nodes «node_ids» of the menu «menu_name» changed on
+    «site_id». The cached menus are updated with the change when they're next
+    read. If «clear_other_menus» is True, the other menus are built again.
+    """
+    from django.core.cache import cache
+
+    duration = get_cms_setting('CACHE_DURATIONS')['menus']
+    changes_key = _get_menu_changes_key(site_id)
+
+    try:
+        number = cache.incr(changes_key)
+    except ValueError:
+        # No menu can be updated without knowing the number of changes,
+        # this prevents a menu read before the change from being cached.
+        cache.set(changes_key, _get_new_version(), duration)
+        return
+
+    change = (menu_name, list(node_ids), clear_other_menus)
+
+    if not cache.add(_get_menu_changes_key(site_id, number), change, duration):
+        # incr() isn't atomic on every cache backend.
+        clear_menu_cache(site_id)
+
+
+def clear_menu_cache(site_id=None, language=None):
+    """
+    Invalidates the menus of «site_id» and «language», all of them if
+    neither is given.
+    """
+    from django.core.cache import cache
+
+    version_key = _get_menu_cache_version_key(site_id, language)
+    cache.set(version_key, _get_new_version(), get_cms_setting('CACHE_DURATIONS')['menus'])
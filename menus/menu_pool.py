@@ -1,12 +1,11 @@
+import warnings
 from functools import partial
 from logging import getLogger
 
 from django.contrib import messages
 from django.contrib.sites.models import Site
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.urls import NoReverseMatch
-from django.utils.functional import cached_property
 from django.utils.module_loading import autodiscover_modules
 from django.utils.translation import (
     get_language_from_request,
@@ -14,14 +13,21 @@ from django.utils.translation import (
 )
 
 from cms.utils import get_current_site
+from cms.utils.compat.warnings import RemovedInDjangoCMS43Warning
 from cms.utils.conf import get_cms_setting
 from cms.utils.i18n import (
     get_default_language_for_site,
     is_language_prefix_patterns_used,
 )
-from menus.base import Menu
+from cms.utils.profiling import get_render_profile, measure
+from menus.base import Menu, NodeIndex
+from menus.cache import (
+    clear_menu_cache,
+    get_menu_cache,
+    record_menu_change,
+    set_menu_cache,
+)
 from menus.exceptions import NamespaceAlreadyRegistered
-from menus.models import CacheKey
 
 logger = getLogger('menus')
 
@@ -33,6 +39,7 @@ def _build_nodes_inner_for_one_menu(nodes, menu_class_name):
     """
     done_nodes = {}  # Dict of node.id:Node
     final_nodes = []
+    seen_counts = {}  # Dict of Node:number of times it was seen
 
     # This is to prevent infinite loops - we need to compare the number of
     # times we see a specific node to "something", and for the time being,
@@ -47,7 +54,7 @@ def _build_nodes_inner_for_one_menu(nodes, menu_class_name):
         node = nodes.pop(0)
 
         # Increment the "seen" counter for this specific node.
-        node._counter = getattr(node, '_counter', 0) + 1
+        seen_counts[node] = seen_counts.get(node, 0) + 1
 
         # Implicit namespacing by menu.__name__
         if not node.namespace:
@@ -68,7 +75,7 @@ def _build_nodes_inner_for_one_menu(nodes, menu_class_name):
         elif node.parent_id:
             # We check for infinite loops here, by comparing the number of
             # times we "saw" this node to the number of nodes in the list
-            if node._counter < list_total_length:
+            if seen_counts[node] < list_total_length:
                 nodes.append(node)
             # Never add this node to the final list until it has a real
             # parent (node.parent)
@@ -115,15 +122,23 @@ class MenuRenderer:
         self.site = Site.objects.get_current(request)
         toolbar = getattr(request, "toolbar", None)
         self.edit_or_preview = toolbar.edit_mode_active or toolbar.preview_mode_active if toolbar else False
+        self._node_index = None
 
     @property
     def cache_key(self):
+        from cms.utils.page_permissions import get_page_visibility_key
+
         prefix = get_cms_setting('CACHE_PREFIX')
 
         key = f"{prefix}menu_nodes_{self.request_language}_{self.site.pk}"
 
         if self.request.user.is_authenticated:
-            key += f"_{self.request.user.pk}_user"
+            if any(getattr(menu, 'user_specific', False) for menu in self.menus.values()):
+                key += f"_{self.request.user.pk}_user"
+            else:
+                # Users who can view the same pages share their menus.
+                visibility = get_page_visibility_key(self.request.user, self.site)
+                key += f"_{visibility}_visibility"
 
         if self.edit_or_preview:
             key += ':edit'
@@ -131,14 +146,16 @@ class MenuRenderer:
             key += ':public'
         return key
 
-    @cached_property
+    @property
     def is_cached(self):
-        db_cache_key_lookup = CacheKey.objects.filter(
-            key=self.cache_key,
-            language=self.request_language,
-            site=self.site.pk,
+        warnings.warn(
+            "MenuRenderer.is_cached is deprecated, the menu cache no longer uses "
+            "the CacheKey table. Use menus.cache.get_menu_cache() instead.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
         )
-        return db_cache_key_lookup.exists()
+        cached_nodes, changes, versions = get_menu_cache(self.cache_key, self.site.pk, self.request_language)
+        return cached_nodes is not None
 
     def _build_nodes(self):
         """
@@ -159,56 +176,131 @@ class MenuRenderer:
         """
         key = self.cache_key
 
-        cached_nodes = cache.get(key, None)
+        # The cached nodes are only returned if they were built
+        # after the last invalidation of the menus of this site
+        # and language.
+        cached_nodes, changes, versions = get_menu_cache(key, self.site.pk, self.request_language)
+        profile = get_render_profile(self.request)
+
+        if cached_nodes is not None and changes:
+            # Some nodes changed since the menu was cached.
+            cached_nodes = self._update_nodes(cached_nodes, changes)
 
-        if cached_nodes and self.is_cached:
-            # Only use the cache if the key is present in the database.
-            # This prevents a condition where keys which have been removed
-            # from the database due to a change in content, are still used.
+            if cached_nodes is not None:
+                set_menu_cache(key, cached_nodes, versions)
+
+        if cached_nodes is not None:
+            if profile is not None:
+                profile.record_cache('menu', hit=True)
             return cached_nodes
 
+        if profile is not None:
+            profile.record_cache('menu', hit=False)
+
         final_nodes = []
-        toolbar = getattr(self.request, 'toolbar', None)
 
         for menu_class_name in self.menus:
-            menu = self.get_menu(menu_class_name)
-
-            try:
-                nodes = menu.get_nodes(self.request)
-            except NoReverseMatch:
-                # Apps might raise NoReverseMatch if an apphook does not yet
-                # exist, skip them instead of crashing
-                nodes = []
-                if toolbar and toolbar.is_staff:
-                    messages.error(
-                        self.request,
-                        _('Menu %s cannot be loaded. Please, make sure all its urls exist and can be resolved.') %
-                        menu_class_name
-                    )
-                logger.error("Menu %s could not be loaded." % menu_class_name, exc_info=True)
             # nodes is a list of navigation nodes (page tree in cms + others)
+            nodes = self._get_menu_nodes(menu_class_name)
             final_nodes += _build_nodes_inner_for_one_menu(nodes, menu_class_name)
 
-        cache.set(key, final_nodes, get_cms_setting('CACHE_DURATIONS')['menus'])
-
-        if not self.is_cached:
-            # No need to invalidate the internal lookup cache,
-            # just set the value directly.
-            self.__dict__['is_cached'] = True
-            # We need to have a list of the cache keys for languages and sites that
-            # span several processes - so we follow the Django way and share through
-            # the database. It's still cheaper than recomputing every time!
-            # This way we can selectively invalidate per-site and per-language,
-            # since the cache is shared but the keys aren't
-            CacheKey.objects.create(key=key, language=self.request_language, site=self.site.pk)
+        set_menu_cache(key, final_nodes, versions)
         return final_nodes
 
-    def _mark_selected(self, nodes):
+    def _get_menu_nodes(self, menu_class_name):
+        """
+        Returns the nodes of the menu «menu_class_name», built again.
+        """
+        menu = self.get_menu(menu_class_name)
+
+        try:
+            return menu.get_nodes(self.request)
+        except NoReverseMatch:
+            # Apps might raise NoReverseMatch if an apphook does not yet
+            # exist, skip them instead of crashing
+            toolbar = getattr(self.request, 'toolbar', None)
+
+            if toolbar and toolbar.is_staff:
+                messages.error(
+                    self.request,
+                    _('Menu %s cannot be loaded. Please, make sure all its urls exist and can be resolved.') %
+                    menu_class_name
+                )
+            logger.error("Menu %s could not be loaded." % menu_class_name, exc_info=True)
+            return []
+
+    def _update_nodes(self, nodes, changes):
+        """
+        Returns the cached «nodes» updated with the (menu name, node ids,
+        clear other menus) «changes», None if all menus have to be built again.
+        """
+        node_ids_by_menu = {}
+        cleared_menus = set()
+
+        for menu_class_name, node_ids, clear_other_menus in changes:
+            node_ids_by_menu.setdefault(menu_class_name, set()).update(node_ids)
+
+            if clear_other_menus:
+                cleared_menus.update(name for name in self.menus if name != menu_class_name)
+
+        for menu_class_name, node_ids in node_ids_by_menu.items():
+            if menu_class_name not in self.menus or menu_class_name in cleared_menus:
+                continue
+
+            menu_nodes = [node for node in nodes if node.namespace == menu_class_name]
+
+            if not menu_nodes:
+                return None
+
+            position = nodes.index(menu_nodes[0])
+
+            # The tree of the menu is built again with the updated nodes.
+            for node in menu_nodes:
+                node.children = []
+                node.parent = None
+
+            try:
+                menu_nodes = self.get_menu(menu_class_name).update_nodes(self.request, menu_nodes, node_ids)
+            except NoReverseMatch:
+                menu_nodes = None
+
+            if menu_nodes is None:
+                return None
+            nodes = [node for node in nodes if node.namespace != menu_class_name]
+            nodes[position:position] = _build_nodes_inner_for_one_menu(menu_nodes, menu_class_name)
+
+        if not cleared_menus:
+            return nodes
+
+        nodes_by_menu = {menu_class_name: [] for menu_class_name in self.menus}
+
         for node in nodes:
-            node.selected = node.is_selected(self.request)
+            if node.namespace not in nodes_by_menu:
+                # The menu this node belongs to is unknown.
+                return None
+            nodes_by_menu[node.namespace].append(node)
+
+        for menu_class_name in cleared_menus:
+            menu_nodes = self._get_menu_nodes(menu_class_name)
+            nodes_by_menu[menu_class_name] = _build_nodes_inner_for_one_menu(menu_nodes, menu_class_name)
+        return [node for menu_nodes in nodes_by_menu.values() for node in menu_nodes]
+
+    def _mark_selected(self, nodes):
+        self.get_node_index(nodes).select(self.request)
         return nodes
 
+    def get_node_index(self, nodes):
+        """
+        Returns the NodeIndex of «nodes». The modifiers share the index built
+        by apply_modifiers(), which indexes the nodes each one returns.
+        """
+        if self._node_index is None or self._node_index.nodes is not nodes:
+            return NodeIndex(nodes)
+        return self._node_index
+
     def apply_modifiers(self, nodes, namespace=None, root_id=None, post_cut=False, breadcrumb=False):
+        self._node_index = NodeIndex(nodes)
+
         if not post_cut:
             nodes = self._mark_selected(nodes)
 
@@ -216,13 +308,16 @@ class MenuRenderer:
         # We can do this because unlike menu classes,
         # modifiers can't change on a request basis.
         for cls in self.pool.get_registered_modifiers():
+            # The previous modifier may have changed the tree.
+            self._node_index.update(nodes)
             inst = cls(renderer=self)
             nodes = inst.modify(
                 self.request, nodes, namespace, root_id, post_cut, breadcrumb)
         return nodes
 
     def get_nodes(self, namespace=None, root_id=None, breadcrumb=False):
-        nodes = self._build_nodes()
+        with measure(get_render_profile(self.request), 'menu', 'build nodes'):
+            nodes = self._build_nodes()
         nodes = self.apply_modifiers(
             nodes=nodes,
             namespace=namespace,
@@ -314,15 +409,19 @@ class MenuPool:
         This invalidates the cache for a given menu (site_id and language)
         """
         if all:
-            cache_keys = CacheKey.objects.get_keys()
+            clear_menu_cache()
         else:
-            cache_keys = CacheKey.objects.get_keys(site_id, language)
-
-        to_be_deleted = cache_keys.distinct().values_list('key', flat=True)
+            clear_menu_cache(site_id, language)
 
-        if to_be_deleted:
-            cache.delete_many(to_be_deleted)
-            cache_keys.delete()
+    def clear_nodes(self, site_id, menu_class_name, node_ids, clear_other_menus=False):
+        """
+        This invalidates the nodes «node_ids» of a menu on a site. The cached
+        menus of the site are updated when they're next used, if the menu
+        supports it, and built again otherwise. If «clear_other_menus» is True,
+        the other menus of the site are built again, e.g. because they might
+        depend on the changed nodes.
+        """
+        record_menu_change(site_id, menu_class_name, node_ids, clear_other_menus)
 
     def register_menu(self, menu_cls):
         from menus.base import Menu
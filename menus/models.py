@@ -1,5 +1,9 @@
+import warnings
+
 from django.db import models
 
+from cms.utils.compat.warnings import RemovedInDjangoCMS43Warning
+
 
 class CacheKeyManager(models.Manager):
     def get_keys(self, site_id=None, language=None):
@@ -13,6 +17,12 @@ class CacheKeyManager(models.Manager):
          Returns:
              QuerySet: A queryset of CacheKey instances based on the provided site ID and language.
          """
+        warnings.warn(
+            "The CacheKey model is deprecated and will be removed in django CMS 4.3, "
+            "the menu cache no longer uses it.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
+        )
         if not site_id and not language:
             # Both site and language are None - return everything
             ret = self.all()
@@ -31,6 +41,11 @@ class CacheKey(models.Model):
     This model stores a set of cache keys accessible by multiple processes/machines.
     Multiple Django instances will then share the keys, allowing selective invalidation
     of menu trees (per site, per language) in the cache.
+
+    .. deprecated:: 4.1.5
+        The menu cache is now invalidated using versions stored in the cache
+        itself (see :mod:`menus.cache`), this model is no longer used. It will
+        be removed, along with its table, in django CMS 4.3.
     """
     language = models.CharField(max_length=255)
     site = models.PositiveIntegerField()
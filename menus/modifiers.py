@@ -1,3 +1,6 @@
+import warnings
+
+from cms.utils.compat.warnings import RemovedInDjangoCMS43Warning
 from menus.base import Modifier
 from menus.menu_pool import menu_pool
 
@@ -29,55 +32,47 @@ class Marker(Modifier):
         """"""
         if post_cut or breadcrumb:
             return nodes
-        selected = None
-        root_nodes = []
-        for node in nodes:
-            if not hasattr(node, "descendant"):
-                node.descendant = False
-            if not hasattr(node, "ancestor"):
-                node.ancestor = False
-            if not node.parent:
-                if selected and not selected.parent:
-                    node.sibling = True
-                root_nodes.append(node)
-            if node.selected:
-                if node.parent:
-                    newnode = node
-                    while newnode.parent:
-                        newnode = newnode.parent
-                        newnode.ancestor = True
-                    for sibling in node.parent.children:
-                        if not sibling.selected:
-                            sibling.sibling = True
-                else:
-                    for root_node in root_nodes:
-                        if not root_node.selected:
-                            root_node.sibling = True
-                if node.children:
-                    self.mark_descendants(node.children)
-                selected = node
-            if node.children:
-                node.is_leaf_node = False
+        index = self.renderer.get_node_index(nodes)
+
+        for node in index.selected:
+            if node.parent:
+                ancestor = node.parent
+                while ancestor:
+                    ancestor.ancestor = True
+                    ancestor = ancestor.parent
+                siblings = node.parent.children
             else:
-                node.is_leaf_node = True
+                siblings = index.roots
+            for sibling in siblings:
+                if not sibling.selected:
+                    sibling.sibling = True
+            for descendant in node.get_descendants():
+                descendant.descendant = True
+        for node in nodes:
+            node.is_leaf_node = not node.children
         return nodes
 
     def mark_descendants(self, nodes):
         """
-        Mark the descendants of the given nodes.
+        Mark the given nodes and their descendants as descendants.
+
+        .. deprecated:: 4.1.5
+            :meth:`modify` no longer uses this method, it will be removed
+            in django CMS 4.3.
 
         Args:
             nodes (list): A list of nodes to mark their descendants.
-
-        Returns:
-            None
-
-        Raises:
-            None
         """
+        warnings.warn(
+            "Marker.mark_descendants() is deprecated and will be removed in django CMS 4.3.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
+        )
         for node in nodes:
             node.descendant = True
-            self.mark_descendants(node.children)
+
+            for descendant in node.get_descendants():
+                descendant.descendant = True
 
 
 class Level(Modifier):
@@ -105,37 +100,48 @@ class Level(Modifier):
         """"""
         if breadcrumb:
             return nodes
-        for node in nodes:
-
-            if not node.parent:
-                if post_cut:
-                    node.menu_level = 0
-                else:
-                    node.level = 0
-                self.mark_levels(node, post_cut)
-
+        attribute = 'menu_level' if post_cut else 'level'
+        level = 0
+        level_nodes = self.renderer.get_node_index(nodes).roots
+
+        while level_nodes:
+            children = []
+            for node in level_nodes:
+                setattr(node, attribute, level)
+                children.extend(node.children)
+            level_nodes = children
+            level += 1
         return nodes
 
     def mark_levels(self, node, post_cut):
         """
-        Mark the levels of menu items.
+        Mark the levels of the descendants of «node», starting from the
+        level of «node».
+
+        .. deprecated:: 4.1.5
+            :meth:`modify` no longer uses this method, it will be removed
+            in django CMS 4.3.
 
         Args:
             node (Node): The root node of the menu hierarchy.
             post_cut (bool): Flag indicating whether the function is called after a cut is made.
-
-        Returns:
-            None
-
-        Raises:
-            None
         """
-        for child in node.children:
-            if post_cut:
-                child.menu_level = node.menu_level + 1
-            else:
-                child.level = node.level + 1
-            self.mark_levels(child, post_cut)
+        warnings.warn(
+            "Level.mark_levels() is deprecated and will be removed in django CMS 4.3.",
+            RemovedInDjangoCMS43Warning,
+            stacklevel=2,
+        )
+        attribute = 'menu_level' if post_cut else 'level'
+        level = getattr(node, attribute) + 1
+        level_nodes = node.children
+
+        while level_nodes:
+            children = []
+            for child in level_nodes:
+                setattr(child, attribute, level)
+                children.extend(child.children)
+            level_nodes = children
+            level += 1
 
 
 class AuthVisibility(Modifier):
@@ -162,12 +168,18 @@ class AuthVisibility(Modifier):
         if post_cut or breadcrumb:
             return nodes
         final = []
+        removed = set()
+        visible_key = 'visible_for_authenticated' if request.user.is_authenticated else 'visible_for_anonymous'
+
         for node in nodes:
-            if (node.attr.get('visible_for_authenticated', True) and request.user.is_authenticated) or \
-                    (node.attr.get('visible_for_anonymous', True) and not request.user.is_authenticated):
+            if node.attr.get(visible_key, True):
                 final.append(node)
-            elif node.parent and node in node.parent.children:
-                node.parent.children.remove(node)
+            elif node.parent:
+                removed.add(node)
+
+        # Each parent's children are filtered once.
+        for parent in {node.parent for node in removed}:
+            parent.children = [child for child in parent.children if child not in removed]
         return final
 
 